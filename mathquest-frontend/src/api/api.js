@@ -2,13 +2,29 @@ import { v4 as uuidv4 } from 'uuid';
 
 const API_BASE = "http://127.0.0.1:8000/api";
 
-export async function fetchLessons() {
-  const res = await fetch(`${API_BASE}/lessons/`);
+// After a write the server pins us to the primary database for a few seconds
+// (X-MQ-Primary-Pin), so our next reads see it; the API is cross-origin, so the pin
+// is echoed back as a header rather than relying on its cookie.
+let primaryUntil = 0;
+
+function readHeaders() {
+  return Date.now() < primaryUntil ? { "X-MQ-Primary": "1" } : {};
+}
+
+function notePin(res) {
+  const seconds = Number(res.headers.get("X-MQ-Primary-Pin"));
+  if (seconds > 0) primaryUntil = Date.now() + seconds * 1000;
+}
+
+// One page of lesson summaries: { results: [{ id, title, problem_count }], next }
+export async function fetchLessons(cursor = null) {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${API_BASE}/lessons/${query}`, { headers: readHeaders() });
   return res.json();
 }
 
 export async function fetchLesson(id) {
-  const res = await fetch(`${API_BASE}/lessons/${id}/`);
+  const res = await fetch(`${API_BASE}/lessons/${id}/`, { headers: readHeaders() });
   return res.json();
 }
 
@@ -19,10 +35,11 @@ export async function submitLesson(id, answers, attemptId = null) {
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ attempt_id: attemptId, answers })
   });
+  notePin(res);
   return res.json();
 }
 
 export async function fetchProfile() {
-  const res = await fetch(`${API_BASE}/profile`);
+  const res = await fetch(`${API_BASE}/profile`, { headers: readHeaders() });
   return res.json();
 }
@@ -4,18 +4,26 @@ import { Link } from "react-router-dom";
 
 export default function LessonList() {
   const [lessons, setLessons] = useState([]);
+  const [next, setNext] = useState(null);
   const [loading, setLoading] = useState(true);
   const [err, setErr] = useState(null);
 
-  useEffect(() => {
+  const loadPage = (cursor) => {
     setLoading(true);
-    fetchLessons()
-      .then(setLessons)
+    fetchLessons(cursor)
+      .then(page => {
+        setLessons(prev => (cursor ? [...prev, ...page.results] : page.results));
+        setNext(page.next);
+      })
       .catch(e => setErr(e.message || "Failed to load"))
       .finally(() => setLoading(false));
+  };
+
+  useEffect(() => {
+    loadPage(null);
   }, []);
 
-  if (loading) return <div className="p-4">Loading…</div>;
+  if (loading && lessons.length === 0) return <div className="p-4">Loading…</div>;
   if (err) return <div className="p-4 text-red-600">Error: {err}</div>;
 
   return (
@@ -30,7 +38,7 @@ export default function LessonList() {
                 <div>
                   <div className="text-gray-900 font-semibold">{lesson.title}</div>
                   <div className="mt-1 text-xs text-gray-500">
-                    {lesson.problems?.length || 0} questions
+                    {lesson.problem_count || 0} questions
                   </div>
                 </div>
                 <Link
@@ -43,6 +51,16 @@ export default function LessonList() {
             </li>
           ))}
         </ul>
+
+        {next && (
+          <button
+            onClick={() => loadPage(next)}
+            disabled={loading}
+            className="w-full px-4 py-2 rounded-xl text-blue-700 font-semibold bg-blue-50 hover:bg-blue-100 disabled:opacity-50 transition"
+          >
+            {loading ? "Loading…" : "Load more"}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -32,7 +32,19 @@ export default function Profile() {
             <dt className="text-xs text-gray-500">Best Streak</dt>
             <dd className="text-lg font-semibold">{profile.best_streak}</dd>
           </div>
-          <div className="col-span-2">
+          <div>
+            <dt className="text-xs text-gray-500">Lessons Completed</dt>
+            <dd className="text-lg font-semibold">{profile.lessons_completed ?? 0}</dd>
+          </div>
+          <div>
+            <dt className="text-xs text-gray-500">Problems Solved</dt>
+            <dd className="text-lg font-semibold">{profile.problems_solved ?? 0}</dd>
+          </div>
+          <div>
+            <dt className="text-xs text-gray-500">XP (last 7 days)</dt>
+            <dd className="text-lg font-semibold text-blue-700">{profile.recent_xp ?? 0}</dd>
+          </div>
+          <div>
             <dt className="text-xs text-gray-500">Last Activity</dt>
             <dd className="text-sm">{profile.last_activity_date || "—"}</dd>
           </div>
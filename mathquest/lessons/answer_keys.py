@@ -0,0 +1,118 @@
+# lessons/answer_keys.py
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from django.conf import settings
+
+from .matchers import compile_answer_spec, is_plain_number
+from .models import Lesson, Problem
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerKey(NamedTuple):
+    # correct_option_id is only set when the option really belongs to the problem,
+    # so option answers can be graded without re-checking ownership.
+    correct_option_id: Optional[int]
+    correct_value: Optional[float]
+    # Compiled Problem.answer_spec; None means grade value answers against correct_value
+    matcher: Optional[Callable] = None
+
+
+class AnswerKeyCache:
+    """
+    Per-process LRU cache of answer keys: {lesson_id: (version, {problem_id: AnswerKey})}.
+
+    Entries are tagged with Lesson.content_version. Local writes evict through the
+    Problem/ProblemOption signals; other workers notice the bumped version on the
+    Lesson row they already load for the request and reload the key.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is None:
+            return getattr(settings, "ANSWER_KEY_CACHE_SIZE", 512)
+        return self._max_size
+
+    def get(self, lesson: Lesson) -> dict:
+        with self._lock:
+            entry = self._entries.get(lesson.pk)
+            if entry is not None and entry[0] >= lesson.content_version:
+                self._entries.move_to_end(lesson.pk)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        key = self._load(lesson)
+        with self._lock:
+            self._entries[lesson.pk] = (lesson.content_version, key)
+            self._entries.move_to_end(lesson.pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return key
+
+    def invalidate(self, lesson_id: int):
+        with self._lock:
+            self._entries.pop(lesson_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    @staticmethod
+    def _load(lesson: Lesson) -> dict:
+        rows = Problem.objects.filter(lesson=lesson).values_list(
+            "id", "correct_option_id", "correct_value", "correct_option__problem_id", "answer_spec"
+        )
+        key = {}
+        for pid, opt_id, value, opt_problem_id, spec in rows:
+            matcher = None
+            if spec is not None:
+                if is_plain_number(spec):
+                    value = float(spec["value"])
+                else:
+                    matcher = _compile(pid, spec)
+            key[pid] = AnswerKey(
+                correct_option_id=opt_id if opt_problem_id == pid else None,
+                correct_value=value,
+                matcher=matcher,
+            )
+        return key
+
+
+def _never(submitted) -> bool:
+    return False
+
+
+def _compile(problem_id, spec):
+    try:
+        return compile_answer_spec(spec)
+    except ValueError:
+        # Specs are validated on save/import; a bad row must not break the whole lesson
+        logger.warning("Invalid answer_spec on problem %s; value answers will be graded wrong", problem_id)
+        return _never
+
+
+answer_key_cache = AnswerKeyCache()
@@ -0,0 +1,55 @@
+# lessons/async_views.py
+"""
+Async-native catalog views, routed instead of the DRF views when ASYNC_VIEWS is on
+(the default under mathquest.asgi). They return the same cached bodies and headers.
+Django 4.2's method decorators are sync-only, so methods are checked inline.
+"""
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+
+from .catalog import (
+    FULL_FIELDSET,
+    alesson_detail_payload,
+    alesson_detail_slice,
+    alesson_list_payload,
+    cached_json_response,
+)
+from .progress import alesson_list_progress_payload
+from .serializers import LessonDetailQuerySerializer, LessonListQuerySerializer
+
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+async def lesson_list(request):
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    query = LessonListQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return JsonResponse({"error": "Validation", "message": query.errors}, status=400)
+    params = query.validated_data
+    try:
+        if params["include_progress"]:
+            payload = await alesson_list_progress_payload(1, params.get("cursor"), params["limit"])
+        else:
+            payload = await alesson_list_payload(params.get("cursor"), params["limit"])
+    except ValueError:
+        return JsonResponse({"error": "Validation", "message": "cursor is invalid"}, status=400)
+    return cached_json_response(request, payload)
+
+
+async def lesson_detail(request, pk):
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    if LessonDetailQuerySerializer.requested(request.GET):
+        query = LessonDetailQuerySerializer(data=request.GET)
+        if not query.is_valid():
+            return JsonResponse({"error": "Validation", "message": query.errors}, status=400)
+        params = query.validated_data
+        payload = await alesson_detail_slice(
+            pk, params.get("fields", FULL_FIELDSET), params["problems_offset"], params.get("problems_limit"),
+        )
+    else:
+        payload = await alesson_detail_payload(pk)
+    if payload is None:
+        raise Http404
+    return cached_json_response(request, payload)
@@ -0,0 +1,127 @@
+# lessons/bench.py
+"""Helpers shared by the bench_* management commands (dataset seeding, stats, reports)."""
+import json
+import math
+import random
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+from .catalog import invalidate_lessons
+from .models import Lesson, Problem, ProblemOption
+
+BENCH_TITLE_PREFIX = "[bench]"
+
+
+def percentile(sorted_samples, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def latency_summary(seconds) -> dict:
+    """p50/p95/p99/mean/max in milliseconds."""
+    samples = sorted(s * 1000.0 for s in seconds)
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "mean": round(sum(samples) / len(samples), 3),
+        "max": round(samples[-1], 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def add_output_argument(parser):
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+
+
+def write_report(command, options, meta: dict, **sections):
+    """
+    Emit a bench report: {"meta": {timestamp, git_revision, **meta}, **sections} as JSON,
+    to options["output"] if given, else the command's stdout.
+    """
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            **meta,
+        },
+        **sections,
+    }
+    out = json.dumps(report, indent=2)
+    if options["output"]:
+        with open(options["output"], "w") as fh:
+            fh.write(out + "\n")
+    else:
+        command.stdout.write(out)
+
+
+def seed_bench_lessons(lessons: int, problems: int, options: int, numeric_ratio: float = 0.25, seed: int = 0):
+    """
+    Bulk-create a synthetic catalog tagged with BENCH_TITLE_PREFIX.
+    Returns {lesson_id: [(problem_id, correct_option_id or None, correct_value or None), ...]}.
+    """
+    rng = random.Random(seed)
+    lesson_objs = Lesson.objects.bulk_create(
+        [Lesson(title=f"{BENCH_TITLE_PREFIX} Lesson {i}", problem_count=problems) for i in range(lessons)]
+    )
+
+    dataset = {}
+    for lesson in lesson_objs:
+        problem_objs = []
+        for j in range(problems):
+            numeric = rng.random() < numeric_ratio
+            problem_objs.append(Problem(
+                lesson=lesson,
+                question_text=f"Question {j}",
+                correct_value=float(rng.randint(0, 100)) if numeric else None,
+            ))
+        Problem.objects.bulk_create(problem_objs)
+
+        option_objs = [
+            ProblemOption(problem=p, text=f"Option {k}")
+            for p in problem_objs if p.correct_value is None
+            for k in range(options)
+        ]
+        ProblemOption.objects.bulk_create(option_objs)
+
+        by_problem = {}
+        for opt in option_objs:
+            by_problem.setdefault(opt.problem_id, []).append(opt)
+        for p in problem_objs:
+            if p.correct_value is None:
+                p.correct_option = rng.choice(by_problem[p.id])
+        Problem.objects.bulk_update([p for p in problem_objs if p.correct_value is None], ["correct_option"])
+
+        dataset[lesson.id] = [(p.id, p.correct_option_id, p.correct_value) for p in problem_objs]
+
+    invalidate_lessons(list(dataset))  # bulk_create bypasses the content signals
+    return dataset
+
+
+def delete_bench_lessons() -> int:
+    # XP events outlive their lesson (no FK constraint); bench XP should not
+    from submissions.models import XPEvent
+
+    XPEvent.objects.filter(lesson__title__startswith=BENCH_TITLE_PREFIX).delete()
+    deleted, _ = Lesson.objects.filter(title__startswith=BENCH_TITLE_PREFIX).delete()
+    return deleted
@@ -0,0 +1,346 @@
+# lessons/catalog.py
+import hashlib
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from mathquest.db_routers import fill_reads, replica_lag_window
+from mathquest.pagination import akeyset_page, decode_cursor, keyset_page
+from mathquest.renderers import render_json
+
+from .models import Lesson, Problem, ProblemOption
+
+# Bodies are cached under a version (the list's, or each lesson's); invalidation drops
+# the version key, so every list page goes stale at once without enumerating cursors,
+# and a fill that read the old rows before the edit committed can only store its body
+# under the dropped version, which nobody reads again. Only pages of LIST_PAGE_SIZE are
+# cached, so clients cannot multiply the entries by varying ?limit.
+LIST_VERSION_KEY = "lessons:list:version"
+# time.time() of the last catalog change, so fills know whether replicas have caught up
+CHANGED_AT_KEY = "lessons:changed_at"
+LIST_PAGE_SIZE = 20
+
+
+def detail_version_key(lesson_id) -> str:
+    return f"lessons:detail:version:{lesson_id}"
+
+
+def detail_cache_key(lesson_id, version) -> str:
+    return f"lessons:detail:{lesson_id}:{version}"
+
+
+def list_page_key(version, after_id) -> str:
+    return f"lessons:list:{version}:{after_id}"
+
+
+class RenderedPayload(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def render_payload(data, last_modified=None) -> RenderedPayload:
+    body = render_json(data)
+    etag = '"%s"' % hashlib.md5(body).hexdigest()
+    return RenderedPayload(body, etag, last_modified)
+
+
+def lesson_tree_queryset():
+    """Lessons with the full problem -> option tree loaded in three queries, in pk order."""
+    return Lesson.objects.order_by("pk").prefetch_related(
+        Prefetch("problems", queryset=Problem.objects.order_by("pk")),
+        Prefetch("problems__options", queryset=ProblemOption.objects.order_by("pk")),
+    )
+
+
+def lesson_summary_rows():
+    """The list representation: one row per lesson, problems counted by the maintained counter."""
+    return Lesson.objects.values("id", "title", "problem_count")
+
+
+def lesson_tree_rows(lesson_id=None):
+    """
+    values_list() querysets for the catalog tree, each in pk order:
+    (lessons (id, title, updated_at), problems (id, lesson_id, question_text),
+    options (id, problem_id, text)); limited to one lesson when lesson_id is given.
+    """
+    lessons = Lesson.objects.order_by("pk")
+    problems = Problem.objects.order_by("pk")
+    options = ProblemOption.objects.order_by("pk")
+    if lesson_id is not None:
+        lessons = lessons.filter(pk=lesson_id)
+        problems = problems.filter(lesson_id=lesson_id)
+        options = options.filter(problem__lesson_id=lesson_id)
+    return (
+        lessons.values_list("id", "title", "updated_at"),
+        problems.values_list("id", "lesson_id", "question_text"),
+        options.values_list("id", "problem_id", "text"),
+    )
+
+
+def build_lesson_tree(lessons, problems, options) -> list:
+    """
+    Nest lesson_tree_rows() rows into plain dicts with exactly LessonSerializer's
+    output shape, without a serializer per row (large lessons have thousands).
+    """
+    options_by_problem = defaultdict(list)
+    for option_id, problem_id, text in options:
+        options_by_problem[problem_id].append({"id": option_id, "text": text})
+    problems_by_lesson = defaultdict(list)
+    for problem_id, lesson_id, question_text in problems:
+        problems_by_lesson[lesson_id].append(
+            {"id": problem_id, "question_text": question_text, "options": options_by_problem.get(problem_id, [])}
+        )
+    return [
+        {"id": lesson_id, "title": title, "problems": problems_by_lesson.get(lesson_id, [])}
+        for lesson_id, title, _ in lessons
+    ]
+
+
+def _list_page(rows, next_cursor) -> dict:
+    return {"results": rows, "next": next_cursor}
+
+
+def _after_id(cursor) -> int:
+    """The lesson id a cursor points past (0 for the first page); ValueError if malformed."""
+    if not cursor:
+        return 0
+    after_id = decode_cursor(cursor, 1)[0]
+    if type(after_id) is not int:
+        raise ValueError("InvalidCursor")
+    return after_id
+
+
+def _new_version() -> int:
+    return time.time_ns()
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), settings.LESSON_CACHE_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+async def _aversion(key):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), settings.LESSON_CACHE_TIMEOUT)
+        version = await cache.aget(key)
+    return version
+
+
+def _detail_payload(lessons, problems, options) -> RenderedPayload:
+    return render_payload(build_lesson_tree(lessons, problems, options)[0], lessons[0][2])
+
+
+# Cache fills follow the replica router, except shortly after a catalog change: a body is
+# shared by every client until the next invalidation, so it must not be built from a
+# replica that has not replayed the edit yet (see fill_reads).
+
+def lesson_list_payload(cursor=None, limit=LIST_PAGE_SIZE) -> RenderedPayload:
+    """One page of lesson summaries; raises ValueError for an invalid cursor."""
+    if limit != LIST_PAGE_SIZE:
+        return render_payload(_list_page(*keyset_page(lesson_summary_rows(), ("id",), cursor, limit)))
+    key = list_page_key(_version(LIST_VERSION_KEY), _after_id(cursor))
+    payload = cache.get(key)
+    if payload is None:
+        with fill_reads(cache.get(CHANGED_AT_KEY)):
+            payload = render_payload(_list_page(*keyset_page(lesson_summary_rows(), ("id",), cursor, limit)))
+        cache.set(key, payload, settings.LESSON_CACHE_TIMEOUT)
+    return payload
+
+
+def lesson_detail_payload(lesson_id) -> Optional[RenderedPayload]:
+    """Returns None when the lesson does not exist (misses are not cached)."""
+    key = detail_cache_key(lesson_id, _version(detail_version_key(lesson_id)))
+    payload = cache.get(key)
+    if payload is None:
+        lessons, problems, options = lesson_tree_rows(lesson_id)
+        with fill_reads(cache.get(CHANGED_AT_KEY)):
+            lessons = list(lessons)
+            if not lessons:
+                return None
+            payload = _detail_payload(lessons, list(problems), list(options))
+        cache.set(key, payload, settings.LESSON_CACHE_TIMEOUT)
+    return payload
+
+
+async def alesson_list_payload(cursor=None, limit=LIST_PAGE_SIZE) -> RenderedPayload:
+    """Async variant of lesson_list_payload for the ASGI read path."""
+    if limit != LIST_PAGE_SIZE:
+        return render_payload(_list_page(*await akeyset_page(lesson_summary_rows(), ("id",), cursor, limit)))
+    key = list_page_key(await _aversion(LIST_VERSION_KEY), _after_id(cursor))
+    payload = await cache.aget(key)
+    if payload is None:
+        with fill_reads(await cache.aget(CHANGED_AT_KEY)):
+            payload = render_payload(_list_page(*await akeyset_page(lesson_summary_rows(), ("id",), cursor, limit)))
+        await cache.aset(key, payload, settings.LESSON_CACHE_TIMEOUT)
+    return payload
+
+
+async def alesson_detail_payload(lesson_id) -> Optional[RenderedPayload]:
+    """Async variant of lesson_detail_payload for the ASGI read path."""
+    key = detail_cache_key(lesson_id, await _aversion(detail_version_key(lesson_id)))
+    payload = await cache.aget(key)
+    if payload is None:
+        lessons, problems, options = lesson_tree_rows(lesson_id)
+        with fill_reads(await cache.aget(CHANGED_AT_KEY)):
+            lessons = [row async for row in lessons]
+            if not lessons:
+                return None
+            payload = _detail_payload(lessons, [row async for row in problems], [row async for row in options])
+        await cache.aset(key, payload, settings.LESSON_CACHE_TIMEOUT)
+    return payload
+
+
+# Detail slices (?fields= / ?problems_offset= / ?problems_limit=) are not cached: they
+# load only the requested columns and problem rows, at most three small queries, and
+# validate with the lesson's Last-Modified like the full body.
+
+LESSON_FIELDS = ("id", "title", "problems")
+PROBLEM_FIELDS = ("id", "question_text", "options")
+
+
+class Fieldset(NamedTuple):
+    lesson: frozenset
+    problem: frozenset
+
+
+FULL_FIELDSET = Fieldset(frozenset(LESSON_FIELDS), frozenset(PROBLEM_FIELDS))
+
+
+def parse_fieldset(value: str) -> Fieldset:
+    """
+    "title,problems.question_text" -> Fieldset. "problems" alone selects every problem
+    field; "problems.<f>" selects only those. Raises ValueError naming an unknown field.
+    """
+    lesson, problem = set(), set()
+    for name in filter(None, (part.strip() for part in value.split(","))):
+        top, _, sub = name.partition(".")
+        if top not in LESSON_FIELDS or (sub and (top != "problems" or sub not in PROBLEM_FIELDS)):
+            raise ValueError(name)
+        lesson.add(top)
+        if top == "problems":
+            problem.update([sub] if sub else PROBLEM_FIELDS)
+    return Fieldset(frozenset(lesson), frozenset(problem))
+
+
+def _slice_rows(lesson_id, fieldset: Fieldset, problems_offset, problems_limit):
+    """values_list() querysets for a slice: (lesson (updated_at, ...), problems (id, ...))."""
+    lesson = Lesson.objects.filter(pk=lesson_id).values_list(
+        "updated_at", *[f for f in ("id", "title") if f in fieldset.lesson]
+    )
+    problems = Problem.objects.filter(lesson_id=lesson_id, pk__gt=problems_offset).order_by("pk").values_list(
+        "id", *[f for f in ("question_text",) if f in fieldset.problem]
+    )
+    if problems_limit is not None:
+        problems = problems[: problems_limit + 1]  # one extra row tells whether a next page exists
+    return lesson, problems
+
+
+def _slice_options(problem_ids):
+    return ProblemOption.objects.filter(problem_id__in=problem_ids).order_by("pk").values_list("id", "problem_id", "text")
+
+
+def _slice_payload(lesson, problems, options, fieldset: Fieldset, problems_limit) -> RenderedPayload:
+    updated_at, *values = lesson
+    data = dict(zip([f for f in ("id", "title") if f in fieldset.lesson], values))
+    if "problems" in fieldset.lesson:
+        next_offset = None
+        if problems_limit is not None and len(problems) > problems_limit:
+            problems = problems[:problems_limit]
+            next_offset = problems[-1][0]
+        options_by_problem = defaultdict(list)
+        for option_id, problem_id, text in options:
+            options_by_problem[problem_id].append({"id": option_id, "text": text})
+        items = []
+        for problem_id, *columns in problems:
+            item = {"id": problem_id} if "id" in fieldset.problem else {}
+            if "question_text" in fieldset.problem:
+                item["question_text"] = columns[0]
+            if "options" in fieldset.problem:
+                item["options"] = options_by_problem.get(problem_id, [])
+            items.append(item)
+        data["problems"] = items
+        if problems_limit is not None:
+            data["problems_next"] = next_offset
+    return render_payload(data, updated_at)
+
+
+def _page_ids(problems, problems_limit):
+    return [row[0] for row in (problems if problems_limit is None else problems[:problems_limit])]
+
+
+def lesson_detail_slice(lesson_id, fieldset=FULL_FIELDSET, problems_offset=0, problems_limit=None):
+    """
+    Part of a lesson detail body: the fields in `fieldset`, and with problems_limit set,
+    at most that many problems with id > problems_offset plus `problems_next` (the
+    problems_offset of the next page, null on the last). None if the lesson does not exist.
+    """
+    lesson_rows, problem_rows = _slice_rows(lesson_id, fieldset, problems_offset, problems_limit)
+    lesson = lesson_rows.first()
+    if lesson is None:
+        return None
+    problems, options = [], []
+    if "problems" in fieldset.lesson:
+        problems = list(problem_rows)
+        if "options" in fieldset.problem and problems:
+            options = list(_slice_options(_page_ids(problems, problems_limit)))
+    return _slice_payload(lesson, problems, options, fieldset, problems_limit)
+
+
+async def alesson_detail_slice(lesson_id, fieldset=FULL_FIELDSET, problems_offset=0, problems_limit=None):
+    """Async variant of lesson_detail_slice for the ASGI read path."""
+    lesson_rows, problem_rows = _slice_rows(lesson_id, fieldset, problems_offset, problems_limit)
+    lesson = await lesson_rows.afirst()
+    if lesson is None:
+        return None
+    problems, options = [], []
+    if "problems" in fieldset.lesson:
+        problems = [row async for row in problem_rows]
+        if "options" in fieldset.problem and problems:
+            options = [row async for row in _slice_options(_page_ids(problems, problems_limit))]
+    return _slice_payload(lesson, problems, options, fieldset, problems_limit)
+
+
+def cached_json_response(request, payload: RenderedPayload) -> HttpResponse:
+    """Serve a pre-rendered body, answering If-None-Match/If-Modified-Since with 304."""
+    last_modified = payload.last_modified.timestamp() if payload.last_modified else None
+    response = get_conditional_response(
+        request, etag=payload.etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(payload.body, content_type="application/json")
+    response["ETag"] = payload.etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def invalidate_lesson(lesson_id):
+    invalidate_lessons([lesson_id])
+
+
+def invalidate_lessons(lesson_ids):
+    """
+    Drop the versions of these lessons' bodies and of the list. Runs now and again on
+    commit, so readers racing the writing transaction cannot re-cache the old content.
+    """
+    keys = [detail_version_key(lesson_id) for lesson_id in lesson_ids] + [LIST_VERSION_KEY]
+
+    def _delete():
+        cache.delete_many(keys)
+        cache.set(CHANGED_AT_KEY, time.time(), replica_lag_window() + 1)
+
+    _delete()
+    transaction.on_commit(_delete)
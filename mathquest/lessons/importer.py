@@ -0,0 +1,197 @@
+# lessons/importer.py
+"""
+Streaming bulk loader for lesson catalogs (JSON Lines, CSV or synthetic).
+
+Lesson dicts look like:
+  {"title": str, "problems": [
+      {"question_text": str, "options": [str, ...], "correct_option": int | None,
+       "correct_value": float | None, "answer_spec": dict | None}, ...]}
+where correct_option is an index into options and answer_spec is a lessons.matchers spec.
+
+Rows are written with bulk_create in chunks; Problem.correct_option is filled in
+afterwards with one UPDATE ... FROM (VALUES ...) per batch. Only one chunk is held
+in memory at a time. Bulk inserts bypass the content signals, so problem_count is
+set directly and cached catalog bodies are invalidated per chunk.
+"""
+import csv
+import json
+import random
+import time
+from itertools import groupby, islice
+
+from django.db import connection, transaction
+
+from .catalog import invalidate_lessons
+from .matchers import compile_answer_spec
+from .models import Lesson, Problem, ProblemOption
+
+CSV_COLUMNS = ("lesson_title", "question_text", "options", "correct_option", "correct_value", "answer_spec")
+CSV_OPTION_SEPARATOR = "|"
+
+
+def check_lesson(lesson):
+    """Raise ValueError unless `lesson` has the shape in the module docstring."""
+    if not isinstance(lesson, dict) or not isinstance(lesson.get("title"), str):
+        raise ValueError("a lesson must be an object with a string title")
+    problems = lesson.get("problems") or []
+    if not isinstance(problems, list):
+        raise ValueError("problems must be a list")
+    for i, problem in enumerate(problems):
+        if not isinstance(problem, dict) or not isinstance(problem.get("question_text"), str):
+            raise ValueError(f"problem {i}: question_text is required")
+        options = problem.get("options") or []
+        if not isinstance(options, list) or not all(isinstance(text, str) for text in options):
+            raise ValueError(f"problem {i}: options must be a list of strings")
+        correct = problem.get("correct_option")
+        if correct is not None and type(correct) is not int:
+            raise ValueError(f"problem {i}: correct_option must be an integer index")
+
+
+def iter_jsonl(fh):
+    for line_no, line in enumerate(fh, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            lesson = json.loads(line)
+            check_lesson(lesson)
+        except ValueError as e:
+            raise ValueError(f"line {line_no}: {e}") from e
+        yield lesson
+
+
+def _csv_problem(row):
+    options = [o for o in (row.get("options") or "").split(CSV_OPTION_SEPARATOR) if o]
+    correct_option = row.get("correct_option") or None
+    correct_value = row.get("correct_value") or None
+    answer_spec = row.get("answer_spec") or None
+    return {
+        "question_text": row["question_text"],
+        "options": options,
+        "correct_option": int(correct_option) if correct_option is not None else None,
+        "correct_value": float(correct_value) if correct_value is not None else None,
+        "answer_spec": json.loads(answer_spec) if answer_spec is not None else None,
+    }
+
+
+def iter_csv(fh):
+    """One row per problem (see CSV_COLUMNS); consecutive rows with the same lesson_title form a lesson."""
+    reader = csv.DictReader(fh)
+    missing = {"lesson_title", "question_text"} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"missing CSV columns: {', '.join(sorted(missing))}")
+    for title, problems in groupby(_csv_problems(reader), key=lambda item: item[0]):
+        yield {"title": title, "problems": [problem for _, problem in problems]}
+
+
+def _csv_problems(reader):
+    for row in reader:
+        try:
+            yield row["lesson_title"], _csv_problem(row)
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError(f"line {reader.line_num}: {e!r}") from e
+
+
+def iter_synthetic(lessons, problems, options, seed=0, numeric_ratio=0.25):
+    rng = random.Random(seed)
+    for i in range(lessons):
+        items = []
+        for j in range(problems):
+            a, b = rng.randint(0, 99), rng.randint(0, 99)
+            if rng.random() < numeric_ratio:
+                items.append({"question_text": f"{a} + {b} = ?", "options": [], "correct_option": None,
+                              "correct_value": float(a + b)})
+            else:
+                choices = [str(a * b + k) for k in range(options)]
+                items.append({"question_text": f"{a} x {b} = ?", "options": choices,
+                              "correct_option": 0, "correct_value": None})
+        yield {"title": f"Synthetic Lesson {i}", "problems": items}
+
+
+class LessonImporter:
+    def __init__(self, chunk_size=5000, fixup_batch_size=1000):
+        self.chunk_size = chunk_size  # problems per transaction
+        self.fixup_batch_size = fixup_batch_size
+        self.lessons = 0
+        self.problems = 0
+        self.options = 0
+
+    def run(self, lessons_iter) -> dict:
+        started = time.perf_counter()
+        chunk, chunk_problems = [], 0
+        for lesson in lessons_iter:
+            chunk.append(lesson)
+            chunk_problems += len(lesson.get("problems") or ())
+            if chunk_problems >= self.chunk_size:
+                self._flush_checked(chunk)
+                chunk, chunk_problems = [], 0
+        if chunk:
+            self._flush_checked(chunk)
+        return {
+            "lessons": self.lessons,
+            "problems": self.problems,
+            "options": self.options,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _flush_checked(self, chunk):
+        # iter_jsonl/iter_csv check shapes per line; this covers lessons from any other source
+        try:
+            self._flush(chunk)
+        except (TypeError, KeyError) as e:
+            raise ValueError(f"malformed lesson data: {e!r}") from e
+
+    @transaction.atomic
+    def _flush(self, chunk):
+        lesson_objs = Lesson.objects.bulk_create(
+            [Lesson(title=item["title"], problem_count=len(item.get("problems") or ())) for item in chunk],
+            batch_size=self.chunk_size,
+        )
+
+        problem_objs, specs = [], []
+        for lesson, item in zip(lesson_objs, chunk):
+            for spec in item.get("problems") or ():
+                answer_spec = spec.get("answer_spec")
+                if answer_spec is not None:
+                    try:
+                        compile_answer_spec(answer_spec)
+                    except ValueError as e:
+                        raise ValueError(f"{spec['question_text']!r}: invalid answer_spec") from e
+                problem_objs.append(Problem(
+                    lesson=lesson,
+                    question_text=spec["question_text"],
+                    correct_value=spec.get("correct_value"),
+                    answer_spec=answer_spec,
+                ))
+                specs.append(spec)
+        Problem.objects.bulk_create(problem_objs, batch_size=self.chunk_size)
+
+        option_objs, correct_index = [], []  # correct_index: (problem_id, position in option_objs)
+        for problem, spec in zip(problem_objs, specs):
+            options = spec.get("options") or ()
+            correct = spec.get("correct_option")
+            if correct is not None:
+                if not 0 <= correct < len(options):
+                    raise ValueError(f"{problem.question_text!r}: correct_option {correct} out of range")
+                correct_index.append((problem.pk, len(option_objs) + correct))
+            option_objs.extend(ProblemOption(problem=problem, text=text) for text in options)
+        ProblemOption.objects.bulk_create(option_objs, batch_size=self.chunk_size)
+
+        self._set_correct_options([(pid, option_objs[i].pk) for pid, i in correct_index])
+        invalidate_lessons([lesson.pk for lesson in lesson_objs])
+
+        self.lessons += len(lesson_objs)
+        self.problems += len(problem_objs)
+        self.options += len(option_objs)
+
+    def _set_correct_options(self, pairs):
+        table = connection.ops.quote_name(Problem._meta.db_table)
+        it = iter(pairs)
+        with connection.cursor() as cursor:
+            while batch := list(islice(it, self.fixup_batch_size)):
+                values = ", ".join(["(%s, %s)"] * len(batch))
+                cursor.execute(
+                    f"UPDATE {table} AS p SET correct_option_id = v.option_id "
+                    f"FROM (VALUES {values}) AS v(id, option_id) WHERE p.id = v.id",
+                    [x for pair in batch for x in pair],
+                )
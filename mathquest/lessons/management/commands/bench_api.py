@@ -0,0 +1,150 @@
+# lessons/management/commands/bench_api.py
+import random
+import threading
+import time
+import uuid
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from lessons.bench import add_output_argument, delete_bench_lessons, latency_summary, seed_bench_lessons, write_report
+
+ENDPOINTS = ("lessons-list", "lesson-detail", "profile", "lesson-submit")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog into the configured (local!) database, drive the API "
+        "endpoints in-process with N concurrent clients and print latency/throughput/query "
+        "stats as JSON. Seeded lessons are removed and the demo user's XP/streak restored afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=20)
+        parser.add_argument("--problems", type=int, default=20, help="problems per lesson")
+        parser.add_argument("--options", type=int, default=4, help="options per multiple-choice problem")
+        parser.add_argument("--answers", type=int, default=10, help="answers per /submit request")
+        parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma separated subset of %s" % (ENDPOINTS,))
+        parser.add_argument("--seed", type=int, default=0)
+        add_output_argument(parser)
+        parser.add_argument("--keep-data", action="store_true", help="keep the seeded lessons")
+
+    def handle(self, *args, **options):
+        endpoints = [e for e in options["endpoints"].split(",") if e]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            self.stderr.write(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            return
+
+        user, _ = User.objects.get_or_create(pk=1, defaults={"username": "demo_user"})
+        saved_user = {f: getattr(user, f) for f in ("total_xp", "current_streak", "best_streak", "last_activity_date")}
+
+        started = time.perf_counter()
+        dataset = seed_bench_lessons(options["lessons"], options["problems"], options["options"], seed=options["seed"])
+        seed_seconds = time.perf_counter() - started
+        self.rng = random.Random(options["seed"])
+        self.dataset = dataset
+        self.lesson_ids = list(dataset)
+        self.answers_per_submit = options["answers"]
+
+        try:
+            results = {}
+            for name in endpoints:
+                self._drive(name, options["warmup"], options["concurrency"])
+                results[name] = self._drive(name, options["requests"], options["concurrency"])
+        finally:
+            if not options["keep_data"]:
+                delete_bench_lessons()
+                User.objects.filter(pk=user.pk).update(**saved_user)
+
+        write_report(self, options, {
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "dataset": {
+                "lessons": options["lessons"],
+                "problems_per_lesson": options["problems"],
+                "options_per_problem": options["options"],
+                "answers_per_submit": options["answers"],
+                "seed_seconds": round(seed_seconds, 3),
+            },
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+        }, endpoints=results)
+
+    def _request(self, client, name, rng):
+        if name == "lessons-list":
+            return client.get("/api/lessons/")
+        if name == "profile":
+            return client.get("/api/profile")
+        lesson_id = rng.choice(self.lesson_ids)
+        if name == "lesson-detail":
+            return client.get(f"/api/lessons/{lesson_id}/")
+
+        problems = self.dataset[lesson_id]
+        answers = []
+        for pid, correct_option_id, correct_value in rng.sample(problems, min(self.answers_per_submit, len(problems))):
+            right = rng.random() < 0.7
+            if correct_value is not None:
+                answers.append({"problem_id": pid, "value": correct_value if right else correct_value + 1})
+            else:
+                answers.append({"problem_id": pid, "option_id": correct_option_id if right else -1})
+        body = {"attempt_id": str(uuid.uuid4()), "answers": answers}
+        return client.post(f"/api/lessons/{lesson_id}/submit", data=body, content_type="application/json")
+
+    def _drive(self, name, total, concurrency):
+        """Issue `total` requests to one endpoint from `concurrency` client threads."""
+        latencies, query_counts, errors = [], [], []
+        lock = threading.Lock()
+        remaining = [total]
+
+        def worker(worker_id):
+            rng = random.Random(self.rng.random() + worker_id)
+            client = Client(HTTP_HOST="localhost")
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    with CaptureQueriesContext(connection) as queries:
+                        t0 = time.perf_counter()
+                        response = self._request(client, name, rng)
+                        elapsed = time.perf_counter() - t0
+                    with lock:
+                        latencies.append(elapsed)
+                        query_counts.append(len(queries.captured_queries))
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+            finally:
+                if threading.current_thread() is not threading.main_thread():
+                    close_old_connections()
+                    connection.close()
+
+        started = time.perf_counter()
+        if concurrency <= 1:
+            worker(0)
+        else:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        wall = time.perf_counter() - started
+
+        return {
+            "requests": len(latencies),
+            "errors": len(errors),
+            "requests_per_sec": round(len(latencies) / wall, 2) if wall else 0.0,
+            "latency_ms": latency_summary(latencies),
+            "queries": {
+                "mean": round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+                "max": max(query_counts, default=0),
+            },
+        }
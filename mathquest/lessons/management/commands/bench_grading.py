@@ -0,0 +1,95 @@
+# lessons/management/commands/bench_grading.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from lessons.answer_keys import AnswerKey
+from lessons.bench import add_output_argument, write_report
+from lessons.matchers import _compile_cached, _submitted_values, compile_answer_spec
+from lessons.services import grade_against_key
+
+
+def _plain(rng):
+    value = float(rng.randint(0, 200))
+    return AnswerKey(None, value), [value, str(value), value + 1]
+
+
+def _tolerance(rng):
+    value = rng.uniform(0, 100)
+    spec = {"type": "number", "value": value, "abs_tol": 0.01, "rel_tol": 0.001}
+    return AnswerKey(None, None, compile_answer_spec(spec)), [value, str(round(value, 3)), value + 1]
+
+
+def _fraction(rng):
+    a, b = rng.randint(1, 9), rng.randint(10, 19)
+    spec = {"type": "fraction", "value": f"{a}/{b}"}
+    return AnswerKey(None, None, compile_answer_spec(spec)), [f"{a}/{b}", f"{2 * a}/{2 * b}", f"{a + 1}/{b}"]
+
+
+def _expression(rng):
+    a, b = rng.randint(2, 9), rng.randint(1, 9)
+    spec = {"type": "expression", "value": [f"{a}x+{b}", f"{b}+{a}x"], "variables": ["x"]}
+    return AnswerKey(None, None, compile_answer_spec(spec)), [f"{a}x + {b}", f"{b} + {a}*x", f"{a}x - {b}"]
+
+
+TYPES = {"plain_number": _plain, "number_tolerance": _tolerance, "fraction": _fraction, "expression": _expression}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure in-memory grading throughput per answer type (plain number fast path, "
+        "number with tolerance, fraction, expression) and the one-off spec compile cost. "
+        "No database access; prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--problems", type=int, default=200, help="problems per answer type")
+        parser.add_argument("--answers", type=int, default=10, help="answers per simulated submit")
+        parser.add_argument("--submits", type=int, default=20000, help="measured submits per answer type")
+        parser.add_argument("--seed", type=int, default=0)
+        add_output_argument(parser)
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, make in TYPES.items():
+            rng = random.Random(options["seed"])
+            _compile_cached.cache_clear()
+            t0 = time.perf_counter()
+            problems = [make(rng) for _ in range(options["problems"])]
+            compile_seconds = time.perf_counter() - t0
+
+            key = {pid: answer_key for pid, (answer_key, _) in enumerate(problems, start=1)}
+            submits = []
+            for _ in range(options["submits"]):
+                pids = rng.sample(range(1, len(problems) + 1), min(options["answers"], len(problems)))
+                submits.append([{"problem_id": pid, "value": rng.choice(problems[pid - 1][1])} for pid in pids])
+
+            results[name] = {
+                "compile_us_per_problem": round(compile_seconds / len(problems) * 1e6, 2),
+                # cold: submitted-expression cache emptied before every submit
+                "cold": self._measure(key, submits[: max(1, len(submits) // 20)], clear=True),
+                "warm": self._measure(key, submits),
+            }
+
+        write_report(self, options, {
+            "problems_per_type": options["problems"],
+            "answers_per_submit": options["answers"],
+            "submits": options["submits"],
+        }, types=results)
+
+    @staticmethod
+    def _measure(key, submits, clear=False):
+        answers = sum(len(s) for s in submits)
+        elapsed = 0.0
+        for answer_list in submits:
+            if clear:
+                _submitted_values.cache_clear()
+            t0 = time.perf_counter()
+            grade_against_key(key, answer_list)
+            elapsed += time.perf_counter() - t0
+        return {
+            "answers": answers,
+            "answers_per_sec": round(answers / elapsed) if elapsed else 0,
+            "us_per_answer": round(elapsed / answers * 1e6, 3) if answers else 0.0,
+        }
@@ -0,0 +1,76 @@
+# lessons/management/commands/bench_serializers.py
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from lessons.bench import add_output_argument, delete_bench_lessons, latency_summary, seed_bench_lessons, write_report
+from lessons.catalog import build_lesson_tree, lesson_tree_queryset, lesson_tree_rows
+from lessons.serializers import LessonSerializer
+from mathquest.renderers import orjson, render_json
+
+
+def _serializer_body(lesson_id):
+    lesson = lesson_tree_queryset().get(pk=lesson_id)
+    return JSONRenderer().render(LessonSerializer(lesson).data)
+
+
+def _fast_body(lesson_id):
+    lessons, problems, options = (list(rows) for rows in lesson_tree_rows(lesson_id))
+    return render_json(build_lesson_tree(lessons, problems, options)[0])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the lesson detail body built by LessonSerializer + JSONRenderer with the "
+        "values() tree + render_json path on synthetic lessons of several sizes. Seeds the "
+        "local database (bench lessons are deleted afterwards); prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,100,1000", help="problems per lesson, comma-separated")
+        parser.add_argument("--options", type=int, default=4, help="options per multiple-choice problem")
+        parser.add_argument("--repeat", type=int, default=50, help="measured renders per path and size")
+        parser.add_argument("--seed", type=int, default=0)
+        add_output_argument(parser)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        results = {}
+        try:
+            for size in sizes:
+                dataset = seed_bench_lessons(1, size, options["options"], seed=options["seed"])
+                lesson_id = next(iter(dataset))
+                serializer_body = _serializer_body(lesson_id)
+                fast_body = _fast_body(lesson_id)
+
+                lesson = lesson_tree_queryset().get(pk=lesson_id)
+                data = LessonSerializer(lesson).data
+                results[str(size)] = {
+                    "bytes": len(fast_body),
+                    "identical": fast_body == serializer_body,
+                    # query + build + encode, as on a cache miss
+                    "serializer": self._measure(_serializer_body, lesson_id, options["repeat"]),
+                    "fast": self._measure(_fast_body, lesson_id, options["repeat"]),
+                    # encoding alone, same dict
+                    "encode_jsonrenderer": self._measure(JSONRenderer().render, data, options["repeat"]),
+                    "encode_render_json": self._measure(render_json, data, options["repeat"]),
+                }
+                delete_bench_lessons()
+        finally:
+            delete_bench_lessons()
+
+        write_report(self, options, {
+            "orjson": getattr(orjson, "__version__", None),
+            "options_per_problem": options["options"],
+            "repeat": options["repeat"],
+        }, sizes=results)
+
+    @staticmethod
+    def _measure(fn, arg, repeat):
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(arg)
+            samples.append(time.perf_counter() - t0)
+        return latency_summary(samples)
@@ -0,0 +1,55 @@
+# lessons/management/commands/bench_startup.py
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lessons.bench import add_output_argument, latency_summary, write_report
+
+# Cold worker: load the WSGI app, serve one request (loads the URLconf and views), report
+# the elapsed time and peak RSS. Runs in a fresh interpreter per sample.
+PROBE = """
+import json, resource, time
+t0 = time.perf_counter()
+from mathquest.wsgi import application
+from django.test import RequestFactory
+response = application(RequestFactory().get("/api/metrics", HTTP_HOST="localhost").environ, lambda status, headers: None)
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker cold start (WSGI app load + first request) and peak RSS with docs mode "
+        "off and on (API_DOCS=0/1), each in fresh interpreters. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=10, help="fresh processes per mode")
+        add_output_argument(parser)
+
+    def handle(self, *args, **options):
+        modes = {}
+        for name, flag in (("docs_off", "0"), ("docs_on", "1")):
+            env = {**os.environ, "API_DOCS": flag, "DJANGO_SETTINGS_MODULE": "mathquest.settings"}
+            samples = []
+            for _ in range(options["runs"]):
+                out = subprocess.run(
+                    [sys.executable, "-c", PROBE], cwd=settings.BASE_DIR, env=env,
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                samples.append(json.loads(out.strip().splitlines()[-1]))
+            rss = sorted(s["max_rss_kb"] for s in samples)
+            modes[name] = {
+                "cold_start_ms": latency_summary([s["seconds"] for s in samples]),
+                "max_rss_mb": round(rss[len(rss) // 2] / 1024, 1),  # median
+            }
+
+        write_report(self, options, {
+            "runs": options["runs"],
+            "python": sys.version.split()[0],
+        }, modes=modes)
@@ -0,0 +1,41 @@
+# lessons/management/commands/build_openapi.py
+import os
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once (build/deploy step) into OPENAPI_SCHEMA_FILE, "
+        "which /api/schema/ serves as a static file. Needs docs mode: API_DOCS=1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="output path (default: settings.OPENAPI_SCHEMA_FILE)")
+        parser.add_argument("--check", action="store_true",
+                            help="only compare with the existing file; exit 1 if it is missing or stale")
+
+    def handle(self, *args, **options):
+        if not apps.is_installed("drf_spectacular"):
+            raise CommandError("drf-spectacular is only loaded in docs mode; run with API_DOCS=1")
+        from drf_spectacular.generators import SchemaGenerator
+        from drf_spectacular.renderers import OpenApiJsonRenderer
+
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        body = OpenApiJsonRenderer().render(schema, renderer_context={})
+        path = Path(options["file"] or settings.OPENAPI_SCHEMA_FILE)
+
+        if options["check"]:
+            if not path.exists() or path.read_bytes() != body:
+                raise CommandError(f"{path} is missing or out of date; run `manage.py build_openapi`")
+            self.stdout.write(f"{path} is up to date.")
+            return
+
+        # write-then-rename so running workers never read a half-written file
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        self.stdout.write(f"Wrote {len(body)} bytes to {path}.")
@@ -0,0 +1,48 @@
+# lessons/management/commands/import_lessons.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from lessons.importer import LessonImporter, iter_csv, iter_jsonl, iter_synthetic
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load lessons from JSON Lines or CSV (use '-' for stdin), or generate a synthetic "
+        "catalog with --synthetic LESSONS. Streams input and writes in chunks of --chunk-size problems."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", help="input file (.jsonl/.ndjson or .csv), '-' for stdin")
+        parser.add_argument("--format", choices=("jsonl", "csv"), help="defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="problems per transaction")
+        parser.add_argument("--synthetic", type=int, metavar="LESSONS", help="generate this many lessons instead")
+        parser.add_argument("--problems", type=int, default=50, help="problems per synthetic lesson")
+        parser.add_argument("--options", type=int, default=4, help="options per synthetic multiple-choice problem")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        importer = LessonImporter(chunk_size=options["chunk_size"])
+
+        if options["synthetic"]:
+            result = importer.run(iter_synthetic(
+                options["synthetic"], options["problems"], options["options"], seed=options["seed"]
+            ))
+        else:
+            path = options["path"]
+            if not path:
+                raise CommandError("give an input path or --synthetic LESSONS")
+            fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+            reader = iter_csv if fmt == "csv" else iter_jsonl
+            fh = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+            try:
+                result = importer.run(reader(fh))
+            except (ValueError, KeyError) as e:
+                raise CommandError(f"Import failed: {e!r}")
+            finally:
+                if fh is not sys.stdin:
+                    fh.close()
+
+        rate = result["problems"] / result["seconds"] if result["seconds"] else 0
+        self.stdout.write(
+            f"Imported {result['lessons']} lessons, {result['problems']} problems, "
+            f"{result['options']} options in {result['seconds']}s ({rate:,.0f} problems/s)."
+        )
@@ -0,0 +1,16 @@
+# lessons/management/commands/rebuild_lesson_progress.py
+from django.core.management.base import BaseCommand
+from lessons.services import rebuild_progress_counters
+
+class Command(BaseCommand):
+    help = "Rebuild Lesson.problem_count and per-user lesson progress counters from UserProblemProgress"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        result = rebuild_progress_counters(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Rebuilt problem counts for {result['lessons']} lessons "
+            f"and {result['progress_rows']} user/lesson progress rows."
+        )
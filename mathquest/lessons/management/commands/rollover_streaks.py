@@ -0,0 +1,19 @@
+# lessons/management/commands/rollover_streaks.py
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from lessons.services import rollover_streaks
+
+class Command(BaseCommand):
+    help = "Reset broken streaks (no activity since before yesterday, UTC) in chunked set-based updates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--today", type=date.fromisoformat, default=None,
+                            help="UTC date to roll over for (YYYY-MM-DD); defaults to today")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        reset = rollover_streaks(today=options["today"], batch_size=options["batch_size"])
+        self.stdout.write(f"Reset {reset} broken streaks in {time.perf_counter() - start:.2f}s.")
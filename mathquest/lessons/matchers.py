@@ -0,0 +1,310 @@
+# lessons/matchers.py
+"""
+Answer specs for open-answer problems, compiled once into matcher callables.
+
+Problem.answer_spec (JSON) is one of:
+  {"type": "number", "value": 0.5, "abs_tol": 1e-6, "rel_tol": 0}
+  {"type": "fraction", "value": "1/3", "reduced": false, "abs_tol": 0}
+  {"type": "expression", "value": "2x+1" | ["2x+1", ...], "variables": ["x"]}
+
+compile_answer_spec() parses the spec once (the answer-key cache keeps the result per
+problem); the matcher then only has to parse the submitted value. A plain number with
+the default tolerance compiles to None, which keeps grading on the inline float path.
+Expressions are compared by evaluating both sides at fixed sample points with a
+whitelisted AST-to-closure evaluator (nothing is eval'd).
+"""
+import ast
+import json
+import math
+import operator
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, Optional
+
+DEFAULT_ABS_TOL = 1e-6
+MAX_ANSWER_LENGTH = 200
+# Largest |exponent| accepted in "1.5e3" style strings parsed exactly: Fraction("1e5000000")
+# builds a 5-million-digit integer, which takes seconds of CPU
+MAX_EXPONENT = 30
+
+FUNCTIONS = {
+    "sqrt": math.sqrt, "abs": abs, "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "log": math.log, "ln": math.log, "exp": math.exp,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+# Per-variable sample values; avoid 0/1 and small integers so distinct expressions rarely agree
+SAMPLE_VALUES = (0.731, -1.417, 2.283, 3.659, -0.389)
+_FRACTION_RE = re.compile(r"^\s*([+-]?\d+)\s*/\s*([+-]?\d+)\s*$")
+_DECIMAL_RE = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE]([+-]?\d+))?$")
+
+
+def parse_number(value) -> Optional[float]:
+    """Float from a number or a "3", "0.5", "1/3" style string; None if it is neither."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or len(value) > MAX_ANSWER_LENGTH:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    m = _FRACTION_RE.match(value)
+    if m and int(m.group(2)) != 0:
+        return int(m.group(1)) / int(m.group(2))
+    return None
+
+
+def parse_fraction(value) -> Optional[Fraction]:
+    """Exact value of an int, a float (by its shortest repr) or a decimal/fraction string."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return Fraction(value)
+    if isinstance(value, float):
+        return Fraction(repr(value)) if math.isfinite(value) else None
+    if not isinstance(value, str) or len(value) > MAX_ANSWER_LENGTH:
+        return None
+    text = value.replace(" ", "")
+    m = _FRACTION_RE.match(text)
+    if m:
+        n, d = int(m.group(1)), int(m.group(2))
+        return Fraction(n, d) if d else None
+    m = _DECIMAL_RE.match(text)
+    if not m or (m.group(1) and abs(int(m.group(1))) > MAX_EXPONENT):
+        return None
+    return Fraction(text)
+
+
+# --- expressions -----------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"\s*(?:((?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(\*\*|[-+*/^(),]))")
+
+
+def _normalize(text: str, variables) -> str:
+    """
+    Tokenize and insert the multiplications people leave out: 2x, 2(x+1), (x+1)(x-1),
+    x(x+1), xy (when x and y are both variables). ^ means power.
+    """
+    out = []
+    prev = None  # kind of the previous token: "num", "name", "func", "(", ")", "op"
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError("InvalidExpression")
+        pos = m.end()
+        number, name, op = m.groups()
+        if name is not None and name not in FUNCTIONS and name not in CONSTANTS and name not in variables:
+            if all(ch in variables for ch in name):
+                parts = list(name)
+            else:
+                raise ValueError("InvalidExpression")
+        else:
+            parts = [number or name or op]
+        for part in parts:
+            kind = (
+                "num" if part[0].isdigit() or part[0] == "." else
+                "func" if part in FUNCTIONS else
+                "name" if part[0].isalpha() or part[0] == "_" else
+                part if part in "()" else "op"
+            )
+            if prev in ("num", "name", ")") and kind in ("num", "name", "func", "("):
+                out.append("*")
+            out.append("**" if part == "^" else part)
+            prev = kind
+    return "".join(out)
+
+
+_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+           ast.Pow: operator.pow}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _build(node, names):
+    """
+    Turn a parsed expression into nested closures over a tuple of variable values.
+    Only the node types below are accepted, so nothing else can run. Constants become
+    floats: float maths overflows quickly instead of building huge ints (9**9**9).
+    """
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op, left, right = _BINARY[type(node.op)], _build(node.left, names), _build(node.right, names)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op, operand = _UNARY[type(node.op)], _build(node.operand, names)
+        return lambda env: op(operand(env))
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return lambda env: value
+    if isinstance(node, ast.Name):
+        if node.id in names:
+            index = names.index(node.id)
+            return lambda env: env[index]
+        if node.id in CONSTANTS:
+            value = CONSTANTS[node.id]
+            return lambda env: value
+    if (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+        and len(node.args) == 1 and not node.keywords
+    ):
+        fn, arg = FUNCTIONS[node.func.id], _build(node.args[0], names)
+        return lambda env: fn(arg(env))
+    raise ValueError("InvalidExpression")
+
+
+def compile_expression(text: str, variables=()) -> Callable:
+    """Validated expression -> function of the variables (positional, in order)."""
+    if not isinstance(text, str) or len(text) > MAX_ANSWER_LENGTH:
+        raise ValueError("InvalidExpression")
+    names = tuple(variables)
+    try:
+        tree = ast.parse(_normalize(text, names), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError("InvalidExpression") from exc
+    body = _build(tree.body, names)
+    return lambda *values: body(values)
+
+
+def sample_points(variables):
+    n = len(variables)
+    return [tuple(SAMPLE_VALUES[(i + j) % len(SAMPLE_VALUES)] for j in range(n)) for i in range(len(SAMPLE_VALUES))]
+
+
+def _values_at(fn, points):
+    """Values at each point; None where the expression is undefined there."""
+    out = []
+    for point in points:
+        try:
+            value = fn(*point)
+        except (ArithmeticError, ValueError, TypeError):
+            value = None
+        if isinstance(value, complex) or (value is not None and not math.isfinite(value)):
+            value = None
+        out.append(value)
+    return out
+
+
+@lru_cache(maxsize=4096)
+def _submitted_values(text: str, variables: tuple, points: tuple):
+    # Students send the same handful of answers; parsing them once per worker is enough
+    try:
+        return tuple(_values_at(compile_expression(text, variables), points))
+    except (ValueError, RecursionError, MemoryError):
+        return None
+
+
+def _close(a, b) -> bool:
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _expression_matcher(spec) -> Callable:
+    expected = spec["value"]
+    if isinstance(expected, str):
+        expected = [expected]
+    if not expected:
+        raise ValueError("InvalidAnswerSpec")
+    variables = tuple(spec.get("variables", ()))
+    points = tuple(sample_points(variables))
+    targets = []
+    for text in expected:
+        values = _values_at(compile_expression(text, variables), points)
+        defined = [(i, v) for i, v in enumerate(values) if v is not None]
+        if not defined:
+            raise ValueError("InvalidAnswerSpec")
+        targets.append(defined)
+
+    def match(submitted) -> bool:
+        if isinstance(submitted, (int, float)) and not isinstance(submitted, bool):
+            submitted = repr(float(submitted))
+        if not isinstance(submitted, str):
+            return False
+        got = _submitted_values(submitted, variables, points)
+        if got is None:
+            return False
+        return any(
+            all(got[i] is not None and _close(got[i], v) for i, v in target)
+            for target in targets
+        )
+
+    return match
+
+
+# --- numbers and fractions ---------------------------------------------------------
+
+def _number_matcher(spec) -> Optional[Callable]:
+    expected = parse_number(spec["value"])
+    if expected is None:
+        raise ValueError("InvalidAnswerSpec")
+    abs_tol = float(spec.get("abs_tol", DEFAULT_ABS_TOL))
+    rel_tol = float(spec.get("rel_tol", 0.0))
+
+    def match(submitted) -> bool:
+        got = parse_number(submitted)
+        return got is not None and math.isclose(got, expected, rel_tol=rel_tol, abs_tol=abs_tol)
+
+    return match
+
+
+def _fraction_matcher(spec) -> Callable:
+    expected = parse_fraction(spec["value"])
+    if expected is None:
+        raise ValueError("InvalidAnswerSpec")
+    num, den = expected.numerator, expected.denominator
+    reduced = bool(spec.get("reduced", False))
+    abs_tol = float(spec.get("abs_tol", 0.0))
+
+    def match(submitted) -> bool:
+        m = _FRACTION_RE.match(submitted) if isinstance(submitted, str) else None
+        if m:
+            # "a/b" is the common case: compare by cross-multiplying, no Fraction needed
+            n, d = int(m.group(1)), int(m.group(2))
+            if d == 0 or (reduced and math.gcd(n, d) != 1):
+                return False
+            if n * den == d * num:
+                return True
+            got = Fraction(n, d)
+        else:
+            got = parse_fraction(submitted)
+            if got is None:
+                return False
+            if got == expected:
+                return True
+        return abs_tol > 0 and abs(got - expected) <= abs_tol
+
+    return match
+
+
+_COMPILERS = {"number": _number_matcher, "fraction": _fraction_matcher, "expression": _expression_matcher}
+
+
+def is_plain_number(spec) -> bool:
+    """
+    Specs the inline float comparison already grades exactly like the matcher would.
+    Malformed specs are not plain; compile_answer_spec rejects them.
+    """
+    if not isinstance(spec, dict) or spec.get("type") != "number" or not isinstance(spec.get("value"), (int, float)):
+        return False
+    try:
+        abs_tol = float(spec.get("abs_tol", DEFAULT_ABS_TOL))
+    except (TypeError, ValueError):
+        return False
+    return abs_tol == DEFAULT_ABS_TOL and not spec.get("rel_tol")
+
+
+def compile_answer_spec(spec) -> Callable:
+    """Matcher for a spec dict; raises ValueError("InvalidAnswerSpec") when malformed."""
+    if not isinstance(spec, dict) or spec.get("type") not in _COMPILERS or "value" not in spec:
+        raise ValueError("InvalidAnswerSpec")
+    return _compile_cached(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(spec_json: str) -> Callable:
+    spec = json.loads(spec_json)
+    try:
+        return _COMPILERS[spec["type"]](spec)
+    except (KeyError, TypeError) as exc:
+        raise ValueError("InvalidAnswerSpec") from exc
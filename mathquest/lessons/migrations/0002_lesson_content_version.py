@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
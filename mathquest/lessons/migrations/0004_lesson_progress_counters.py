@@ -0,0 +1,57 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Lesson = apps.get_model("lessons", "Lesson")
+    Problem = apps.get_model("lessons", "Problem")
+    UserProblemProgress = apps.get_model("lessons", "UserProblemProgress")
+    UserLessonProgress = apps.get_model("lessons", "UserLessonProgress")
+
+    counts = Problem.objects.values("lesson_id").annotate(n=models.Count("id"))
+    for row in counts:
+        Lesson.objects.filter(pk=row["lesson_id"]).update(problem_count=row["n"])
+
+    solved = (
+        UserProblemProgress.objects.filter(solved_correctly=True)
+        .values("user_id", "problem__lesson_id")
+        .annotate(n=models.Count("id"))
+    )
+    UserLessonProgress.objects.bulk_create(
+        [
+            UserLessonProgress(user_id=row["user_id"], lesson_id=row["problem__lesson_id"], solved_count=row["n"])
+            for row in solved
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('lessons', '0003_lesson_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='problem_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='UserLessonProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solved_count', models.PositiveIntegerField(default=0)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='lessons.lesson')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.user')),
+            ],
+            options={
+                'unique_together': {('user', 'lesson')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0004_lesson_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='answer_spec',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -2,6 +2,11 @@ from django.db import models
 
 class Lesson(models.Model):
     title = models.CharField(max_length=255)
+    # Bumped whenever problems/options change; used to detect stale answer-key caches
+    content_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)  # drives Last-Modified on catalog responses
+    # Maintained by Problem signals; repair with `manage.py rebuild_lesson_progress`
+    problem_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -13,6 +18,16 @@ class Problem(models.Model):
     # For open numeric problems, set correct_value instead.
     correct_option = models.ForeignKey("ProblemOption", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
     correct_value = models.FloatField(null=True, blank=True)
+    # Optional open-answer spec (fractions, tolerances, expressions); see lessons/matchers.py.
+    # When set it takes precedence over correct_value for "value" answers.
+    answer_spec = models.JSONField(null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        if self.answer_spec is not None:
+            from .matchers import compile_answer_spec
+
+            compile_answer_spec(self.answer_spec)  # reject malformed specs before they reach grading
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Problem {self.id} - {self.lesson.title}"
@@ -33,3 +48,11 @@ class UserProblemProgress(models.Model):
     class Meta:
         unique_together = ("user", "problem")
 
+class UserLessonProgress(models.Model):
+    """Denormalized count of a user's solved problems per lesson (kept in step with UserProblemProgress)."""
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE)
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
+    solved_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "lesson")
@@ -0,0 +1,186 @@
+# lessons/progress.py
+"""
+Per-user lesson progress for the catalog list (GET /api/lessons/?include_progress=1).
+
+Each worker keeps an LRU index of recently active users' solved counts: two parallel
+arrays per user (lesson ids ascending, solved counts), about 16 bytes per started
+lesson, looked up by bisection. A miss reads that user's UserLessonProgress counter
+rows in one indexed query; the counters are already aggregated per (user, lesson).
+
+Entries are tagged with a per-user version and a global generation kept in the shared
+cache (one get_many per request). Once an add_solved() commits, the user's version is
+bumped and this worker's entry dropped, so every worker reloads that user on its next
+read. Entries are never patched in place: a concurrent load may already have read the
+committed rows under the old version. Bulk counter rewrites (rebuild, problem deletion)
+bump the generation.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from mathquest.db_routers import use_primary
+from mathquest.renderers import load_json
+
+from .catalog import LIST_PAGE_SIZE, RenderedPayload, alesson_list_payload, lesson_list_payload, render_payload
+from .models import UserLessonProgress
+
+GENERATION_KEY = "progress:generation"
+
+
+def version_key(user_id) -> str:
+    return f"progress:version:{user_id}"
+
+
+def progress_ratio(solved: int, total: int) -> float:
+    if total == 0:
+        return 0.0
+    return round(min(1.0, solved / total), 3)
+
+
+class SolvedCounts:
+    """One user's solved count per lesson; lessons without solves are absent."""
+
+    __slots__ = ("lesson_ids", "counts", "version")
+
+    def __init__(self, rows, version):
+        # rows: (lesson_id, solved_count) in lesson_id order
+        self.lesson_ids = array("q", [row[0] for row in rows])
+        self.counts = array("q", [row[1] for row in rows])
+        self.version = version
+
+    def get(self, lesson_id) -> int:
+        i = bisect_left(self.lesson_ids, lesson_id)
+        if i < len(self.lesson_ids) and self.lesson_ids[i] == lesson_id:
+            return self.counts[i]
+        return 0
+
+
+def _rows(user_id):
+    return UserLessonProgress.objects.filter(user_id=user_id).order_by("lesson_id").values_list(
+        "lesson_id", "solved_count"
+    )
+
+
+class ProgressIndex:
+    """Per-process LRU of {user_id: SolvedCounts}, checked against the shared versions."""
+
+    def __init__(self, max_users: Optional[int] = None):
+        self._max_users = max_users
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_users(self) -> int:
+        if self._max_users is None:
+            return getattr(settings, "PROGRESS_INDEX_USERS", 10000)
+        return self._max_users
+
+    @staticmethod
+    def _version(found: dict, user_id) -> tuple:
+        return found.get(version_key(user_id), 0), found.get(GENERATION_KEY, 0)
+
+    def _cached(self, user_id, version) -> Optional[SolvedCounts]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return None
+
+    def _store(self, user_id, entry: SolvedCounts):
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    # Loads read from the primary: the version just read may belong to a commit a
+    # lagging replica has not replayed yet.
+
+    def get(self, user_id) -> SolvedCounts:
+        version = self._version(cache.get_many([version_key(user_id), GENERATION_KEY]), user_id)
+        entry = self._cached(user_id, version)
+        if entry is None:
+            with use_primary():
+                entry = SolvedCounts(list(_rows(user_id)), version)
+            self._store(user_id, entry)
+        return entry
+
+    async def aget(self, user_id) -> SolvedCounts:
+        """Async variant of get for the ASGI read path."""
+        version = self._version(await cache.aget_many([version_key(user_id), GENERATION_KEY]), user_id)
+        entry = self._cached(user_id, version)
+        if entry is None:
+            with use_primary():
+                entry = SolvedCounts([row async for row in _rows(user_id)], version)
+            self._store(user_id, entry)
+        return entry
+
+    def record(self, user_id):
+        """A committed solved-counter change: every worker reloads this user on the next read."""
+        key = version_key(user_id)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted between add() and incr(); absent reads as 0, so restart at 1
+            cache.set(key, 1, timeout=None)
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate_all(self):
+        """After counters were rewritten in bulk: every worker reloads every user."""
+        cache.add(GENERATION_KEY, 0, timeout=None)
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, timeout=None)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+progress_index = ProgressIndex()
+
+
+def record_solved(user_id):
+    """Invalidate the user's index entries once the transaction that bumped a counter commits."""
+    transaction.on_commit(lambda: progress_index.record(user_id))
+
+
+# Pages are shared by everyone; the per-user variant decodes the cached page (a few
+# summaries) and adds one "progress" field per lesson.
+
+def _with_progress(payload: RenderedPayload, counts: SolvedCounts) -> RenderedPayload:
+    page = load_json(payload.body)
+    page["results"] = [
+        {**lesson, "progress": progress_ratio(counts.get(lesson["id"]), lesson["problem_count"])}
+        for lesson in page["results"]
+    ]
+    return render_payload(page)
+
+
+def lesson_list_progress_payload(user_id, cursor=None, limit=LIST_PAGE_SIZE) -> RenderedPayload:
+    """A lesson list page with each lesson's progress for this user."""
+    return _with_progress(lesson_list_payload(cursor, limit), progress_index.get(user_id))
+
+
+async def alesson_list_progress_payload(user_id, cursor=None, limit=LIST_PAGE_SIZE) -> RenderedPayload:
+    """Async variant of lesson_list_progress_payload for the ASGI read path."""
+    return _with_progress(await alesson_list_payload(cursor, limit), await progress_index.aget(user_id))
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .catalog import parse_fieldset
 from .models import Lesson, Problem, ProblemOption
 
 class ProblemOptionSerializer(serializers.ModelSerializer):
@@ -20,3 +21,32 @@ class LessonSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = ("id", "title", "problems")
+
+class LessonSummarySerializer(serializers.ModelSerializer):
+    """List representation; the problem tree is only on the detail endpoint."""
+    class Meta:
+        model = Lesson
+        fields = ("id", "title", "problem_count")
+
+class LessonListQuerySerializer(serializers.Serializer):
+    include_progress = serializers.BooleanField(default=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    cursor = serializers.CharField(required=False)
+
+class LessonDetailQuerySerializer(serializers.Serializer):
+    fields = serializers.CharField(required=False)
+    problems_offset = serializers.IntegerField(min_value=0, default=0)
+    problems_limit = serializers.IntegerField(min_value=1, max_value=500, required=False)
+
+    PARAMS = ("fields", "problems_offset", "problems_limit")
+
+    @classmethod
+    def requested(cls, query_params) -> bool:
+        """Whether the request asks for a slice; other parameters (cache busters etc.) are ignored."""
+        return any(name in query_params for name in cls.PARAMS)
+
+    def validate_fields(self, value):
+        try:
+            return parse_fieldset(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(f"Unknown field: {exc}")
@@ -1,13 +1,24 @@
 # lessons/services.py
 from datetime import datetime, timezone, timedelta
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone as dj_timezone
+from submissions.ledger import lock_user_xp, pending_xp_expression, record_xp
+from users.leaderboard import leaderboard
 from users.models import User
-from .models import Lesson, Problem, ProblemOption
+from users.profile import invalidate_profiles
+from .models import Lesson, Problem
 from .models import UserProblemProgress  # <-- make sure this model exists (unique per user/problem)
+from .models import UserLessonProgress
+from .answer_keys import answer_key_cache
+from .progress import progress_index, progress_ratio, record_solved
+from .matchers import parse_number
 
 XP_PER_CORRECT = 10  # XP awarded once per problem when it becomes correct
 
 
-def evaluate_answers(user: User, lesson: Lesson, answers):
+def evaluate_answers(user: User, lesson: Lesson, answers, attempt_id=None):
     """
     answers: list of dicts like:
       - {"problem_id": int, "option_id": int}
@@ -17,37 +28,64 @@ def evaluate_answers(user: User, lesson: Lesson, answers):
       - correct_count: number correct in THIS submission
       - earned_xp: XP granted ONLY for problems that transitioned to correct (first time)
       - details: {problem_id: bool_is_correct}
+
+    Answer keys come from the per-process answer_key_cache, so on a warm worker
+    grading itself reads nothing from the DB; one upsert both records the solves
+    and reports which were new, and the XP for those is appended to the ledger
+    (submissions/ledger.py) rather than written to the user row.
     """
+    correct_count, details, correct_pids = grade_answers(lesson, answers)
+
+    # Award XP only for problems that become correct for the first time for this user
+    newly_correct = mark_solved(user, correct_pids)
+    if newly_correct:
+        add_solved(user, lesson.pk, len(newly_correct))
+        record_xp(user.pk, [(lesson.pk, attempt_id, pid, XP_PER_CORRECT) for pid in sorted(newly_correct)])
+
+    earned_xp = len(newly_correct) * XP_PER_CORRECT
+    return correct_count, earned_xp, details
+
+
+def grade_answers(lesson: Lesson, answers):
+    """
+    Grade answers in memory against the cached answer key (no progress reads/writes).
+    Returns: (correct_count, details, correct_pids); raises ValueError like evaluate_answers.
+    """
+    return grade_against_key(answer_key_cache.get(lesson), answers)
+
+
+def grade_against_key(key: dict, answers):
+    """grade_answers for an already loaded {problem_id: AnswerKey}."""
     correct_count = 0
-    earned_xp = 0
     details = {}
+    correct_pids = []
 
     for a in answers:
         pid = a.get("problem_id")
         if pid is None:
             raise ValueError("InvalidAnswerFormat")
 
-        try:
-            problem = Problem.objects.get(pk=pid, lesson=lesson)
-        except Problem.DoesNotExist:
+        problem = key.get(pid)
+        if problem is None:
             raise ValueError(f"InvalidProblem:{pid}")
 
         # Determine correctness for this submission
         if "option_id" in a:
-            try:
-                opt = ProblemOption.objects.get(pk=a["option_id"], problem=problem)
-                is_correct = (problem.correct_option_id == opt.id)
-            except ProblemOption.DoesNotExist:
-                is_correct = False
+            is_correct = (
+                problem.correct_option_id is not None
+                and problem.correct_option_id == a["option_id"]
+            )
         elif "value" in a:
-            try:
-                submitted = float(a["value"])
+            if problem.matcher is not None:
+                is_correct = problem.matcher(a["value"])
+            else:
+                # fast path: plain numeric answer
+                submitted = parse_number(a["value"])
                 is_correct = (
-                    problem.correct_value is not None
+                    submitted is not None
+                    and problem.correct_value is not None
                     and abs(problem.correct_value - submitted) < 1e-6
                 )
-            except Exception:
-                is_correct = False
         else:
             raise ValueError("InvalidAnswerFormat")
 
@@ -55,27 +93,106 @@ def evaluate_answers(user: User, lesson: Lesson, answers):
 
         if is_correct:
             correct_count += 1
-            # Award XP only if this problem becomes correct for the first time for this user
-            progress, created = UserProblemProgress.objects.get_or_create(
-                user=user, problem=problem, defaults={"solved_correctly": True}
-            )
-            if created or not progress.solved_correctly:
-                # First ever correct (created) OR was previously incorrect and now correct
-                earned_xp += XP_PER_CORRECT
-                if not progress.solved_correctly:
-                    progress.solved_correctly = True
-                    progress.save()
+            correct_pids.append(pid)
 
-    return correct_count, earned_xp, details
+    return correct_count, details, correct_pids
+
+
+def mark_solved(user: User, problem_ids) -> set:
+    """
+    Record problem_ids as solved in one upsert (first-ever solves are inserted,
+    previously-incorrect rows flipped) and return the ones that were not solved before.
+    The row locks the upsert takes make concurrent submits for the same problem agree
+    on which of them solved it first.
+    """
+    problem_ids = sorted(set(problem_ids))  # fixed lock order between concurrent submits
+    if not problem_ids:
+        return set()
+    table = connection.ops.quote_name(UserProblemProgress._meta.db_table)
+    now = dj_timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, problem_id, solved_correctly, solved_at) "
+            f"VALUES {', '.join(['(%s, %s, true, %s)'] * len(problem_ids))} "
+            "ON CONFLICT (user_id, problem_id) DO UPDATE SET solved_correctly = true "
+            f"WHERE NOT {table}.solved_correctly RETURNING problem_id",
+            [value for pid in problem_ids for value in (user.pk, pid, now)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def add_solved(user: User, lesson_id: int, delta: int):
+    """Bump the per-(user, lesson) solved counter with one upsert."""
+    table = connection.ops.quote_name(UserLessonProgress._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, lesson_id, solved_count) VALUES (%s, %s, %s) "
+            "ON CONFLICT (user_id, lesson_id) DO UPDATE "
+            f"SET solved_count = {table}.solved_count + EXCLUDED.solved_count",
+            [user.pk, lesson_id, delta],
+        )
+    record_solved(user.pk)
+
+
+def compute_lesson_progress(user: User, lesson: Lesson) -> float:
+    """
+    Progress = (# problems solved_correctly for this lesson) / (total problems)
+    Rounded to 3 decimals. Reads the maintained counters: one indexed lookup.
+    """
+    if lesson.problem_count == 0:
+        return 0.0
+    solved = (
+        UserLessonProgress.objects.filter(user=user, lesson=lesson)
+        .values_list("solved_count", flat=True)
+        .first()
+    ) or 0
+    return progress_ratio(solved, lesson.problem_count)
 
 
-def compute_streak_and_update(user: User, earned_xp: int, commit: bool = False):
+def rebuild_progress_counters(batch_size: int = 1000) -> dict:
+    """
+    Recompute Lesson.problem_count and UserLessonProgress from the source tables.
+    Used for backfills and to repair drift (e.g. bulk loads or queryset updates that bypass the signals).
+    """
+    with transaction.atomic():
+        problem_counts = (
+            Problem.objects.filter(lesson=OuterRef("pk"))
+            .values("lesson")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        lessons = Lesson.objects.update(problem_count=Coalesce(Subquery(problem_counts), 0))
+
+        UserLessonProgress.objects.all().delete()
+        solved = (
+            UserProblemProgress.objects.filter(solved_correctly=True)
+            .values_list("user_id", "problem__lesson_id")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+        rows = 0
+        batch = []
+        for user_id, lesson_id, n in solved.iterator(chunk_size=batch_size):
+            batch.append(UserLessonProgress(user_id=user_id, lesson_id=lesson_id, solved_count=n))
+            if len(batch) >= batch_size:
+                UserLessonProgress.objects.bulk_create(batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            UserLessonProgress.objects.bulk_create(batch)
+            rows += len(batch)
+
+    progress_index.invalidate_all()
+    return {"lessons": lessons, "progress_rows": rows}
+
+
+def compute_streak_and_update(user: User, earned_xp: int, today=None):
     """
     Computes streak transitions based on UTC day and adds earned_xp to user.total_xp.
-    If commit=True, persists changes on user.
+    Pure: record_activity() persists the result.
     Returns dict: {"current", "best", "new_total_xp", "prev_last_activity_date"}
     """
-    today = datetime.now(timezone.utc).date()
+    today = today or datetime.now(timezone.utc).date()
     last = user.last_activity_date
     yesterday = today - timedelta(days=1)
 
@@ -91,16 +208,73 @@ def compute_streak_and_update(user: User, earned_xp: int, commit: bool = False):
     new_total_xp = user.total_xp + earned_xp
     new_best = max(user.best_streak, new_streak)
 
-    if commit:
-        user.total_xp = new_total_xp
-        user.current_streak = new_streak
-        user.best_streak = new_best
-        user.last_activity_date = today
-        user.save()
-
     return {
         "current": new_streak,
         "best": new_best,
         "new_total_xp": new_total_xp,
         "prev_last_activity_date": last,
     }
+
+
+def record_activity(user_id: int, earned_xp: int):
+    """
+    Apply today's activity to the user's streak and return compute_streak_and_update()'s
+    dict, with new_total_xp being the current XP (snapshot + pending ledger events,
+    including this submit's). Call after the submit's XP is recorded, in its transaction:
+    it takes the user's XP lock (lock_user_xp) first, so the total also covers every
+    concurrent submit that committed before this one.
+
+    Only the first submit of a UTC day writes the user row, with a conditional UPDATE
+    that re-checks last_activity_date; if a concurrent submit got there first, the row
+    is re-read. Raises User.DoesNotExist.
+    """
+    today = datetime.now(timezone.utc).date()
+    lock_user_xp(user_id)
+    users = User.objects.filter(pk=user_id).annotate(pending_xp=pending_xp_expression())
+    while True:
+        user = users.get()
+        info = compute_streak_and_update(user, user.pending_xp, today=today)
+        last = info["prev_last_activity_date"]
+        if last == today:
+            break
+        unchanged = Q(last_activity_date__isnull=True) if last is None else Q(last_activity_date=last)
+        if User.objects.filter(unchanged, pk=user_id).update(
+            current_streak=info["current"], best_streak=info["best"], last_activity_date=today
+        ):
+            break
+
+    def _after_commit():
+        leaderboard.record(user_id, earned_xp)
+        invalidate_profiles([user_id])
+
+    transaction.on_commit(_after_commit)
+    return info
+
+
+def rollover_streaks(today=None, batch_size: int = 5000) -> int:
+    """
+    Reset current_streak to 0 for users whose last activity is before yesterday (UTC),
+    i.e. streaks compute_streak_and_update would restart on their next submit.
+    For each stale last_activity_date, walks the partial (last_activity_date, id) index
+    batch_size ids at a time; each chunk is a short UPDATE in its own transaction, so
+    locks are held one chunk at a time. Safe to re-run: rows already reset no longer
+    match. Returns the number of users reset.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    broken = User.objects.filter(current_streak__gt=0, last_activity_date__lt=today - timedelta(days=1))
+    days = list(broken.order_by("last_activity_date").values_list("last_activity_date", flat=True).distinct())
+    total = 0
+    for day in days:
+        last_pk = 0
+        while True:
+            pks = list(
+                broken.filter(last_activity_date=day, pk__gt=last_pk)
+                .order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            # re-check the predicate so a submit that committed meanwhile is left alone
+            total += broken.filter(pk__in=pks).update(current_streak=0)
+            invalidate_profiles(pks)
+            last_pk = pks[-1]
+    return total
@@ -0,0 +1,96 @@
+# lessons/signals.py
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .answer_keys import answer_key_cache
+from .catalog import invalidate_lesson
+from .models import Lesson, Problem, ProblemOption, UserLessonProgress, UserProblemProgress
+from .progress import progress_index
+
+
+def bump_lesson_version(lesson_id, problem_delta=0):
+    """Mark lesson content as changed for every worker, apply a problem_count delta and drop local caches."""
+    Lesson.objects.filter(pk=lesson_id).update(
+        content_version=F("content_version") + 1,
+        updated_at=timezone.now(),
+        problem_count=Greatest(F("problem_count") + problem_delta, 0),
+    )
+    answer_key_cache.invalidate(lesson_id)
+    invalidate_lesson(lesson_id)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    invalidate_lesson(instance.pk)
+
+
+@receiver(pre_save, sender=Problem)
+def problem_saving(sender, instance, update_fields=None, **kwargs):
+    # Remember the stored lesson so post_save can tell a move between lessons from an edit
+    instance._previous_lesson_id = None
+    if instance.pk is not None and (update_fields is None or "lesson" in update_fields):
+        instance._previous_lesson_id = (
+            Problem.objects.filter(pk=instance.pk).values_list("lesson_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Problem)
+def problem_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_lesson_id", None)
+    if not created and previous is not None and previous != instance.lesson_id:
+        move_solved_counts(instance.pk, previous, instance.lesson_id)
+        bump_lesson_version(previous, problem_delta=-1)
+        bump_lesson_version(instance.lesson_id, problem_delta=1)
+        return
+    bump_lesson_version(instance.lesson_id, problem_delta=1 if created else 0)
+
+
+def move_solved_counts(problem_id, from_lesson_id, to_lesson_id):
+    """A problem changed lessons: its solvers' counts move from the old lesson to the new one."""
+    solvers = UserProblemProgress.objects.filter(problem_id=problem_id, solved_correctly=True).values("user_id")
+    UserLessonProgress.objects.filter(lesson_id=from_lesson_id, user_id__in=solvers).update(
+        solved_count=Greatest(F("solved_count") - 1, 0)
+    )
+    table = connection.ops.quote_name(UserLessonProgress._meta.db_table)
+    source = connection.ops.quote_name(UserProblemProgress._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, lesson_id, solved_count) "
+            f"SELECT user_id, %s, 1 FROM {source} WHERE problem_id = %s AND solved_correctly "
+            "ON CONFLICT (user_id, lesson_id) DO UPDATE "
+            f"SET solved_count = {table}.solved_count + 1",
+            [to_lesson_id, problem_id],
+        )
+    transaction.on_commit(progress_index.invalidate_all)
+
+
+@receiver(pre_delete, sender=Problem)
+def problem_deleting(sender, instance, **kwargs):
+    # Progress rows cascade away with the problem, so uncount them while they still exist
+    solvers = UserProblemProgress.objects.filter(problem=instance, solved_correctly=True).values("user_id")
+    UserLessonProgress.objects.filter(lesson_id=instance.lesson_id, user_id__in=solvers).update(
+        solved_count=Greatest(F("solved_count") - 1, 0)
+    )
+    transaction.on_commit(progress_index.invalidate_all)
+
+
+@receiver(post_delete, sender=Problem)
+def problem_deleted(sender, instance, **kwargs):
+    bump_lesson_version(instance.lesson_id, problem_delta=-1)
+
+
+@receiver(post_save, sender=ProblemOption)
+@receiver(post_delete, sender=ProblemOption)
+def option_changed(sender, instance, **kwargs):
+    lesson_id = (
+        Problem.objects.filter(pk=instance.problem_id)
+        .values_list("lesson_id", flat=True)
+        .first()
+    )
+    if lesson_id is not None:
+        bump_lesson_version(lesson_id)
@@ -0,0 +1,67 @@
+from django.test import TestCase
+
+from lessons.answer_keys import AnswerKeyCache, answer_key_cache
+from lessons.models import Lesson, Problem, ProblemOption
+
+
+class AnswerKeyCacheTests(TestCase):
+    """Covers answer-key loading, hit/miss accounting, LRU cap and signal-driven invalidation."""
+
+    def setUp(self):
+        answer_key_cache.clear()
+        self.lesson = Lesson.objects.create(title="Keys")
+        self.p1 = Problem.objects.create(lesson=self.lesson, question_text="1 + 1 = ?")
+        self.o1 = ProblemOption.objects.create(problem=self.p1, text="2")
+        self.o2 = ProblemOption.objects.create(problem=self.p1, text="3")
+        self.p1.correct_option = self.o1
+        self.p1.save()
+        self.p2 = Problem.objects.create(lesson=self.lesson, question_text="4 / 2 = ?", correct_value=2.0)
+
+    def test_warm_lookup_does_not_touch_db(self):
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        key = answer_key_cache.get(lesson)
+        self.assertEqual(key[self.p1.id].correct_option_id, self.o1.id)
+        self.assertEqual(key[self.p2.id].correct_value, 2.0)
+        with self.assertNumQueries(0):
+            answer_key_cache.get(lesson)
+        self.assertEqual(answer_key_cache.stats()["hits"], 1)
+        self.assertEqual(answer_key_cache.stats()["misses"], 1)
+
+    def test_option_change_bumps_version_and_reloads(self):
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        answer_key_cache.get(lesson)
+
+        self.p1.correct_option = self.o2
+        self.p1.save()
+
+        lesson.refresh_from_db()
+        self.assertEqual(answer_key_cache.get(lesson)[self.p1.id].correct_option_id, self.o2.id)
+
+    def test_foreign_correct_option_is_not_accepted(self):
+        other = Problem.objects.create(lesson=self.lesson, question_text="?")
+        other.correct_option = self.o1  # belongs to p1, not to `other`
+        other.save()
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        self.assertIsNone(answer_key_cache.get(lesson)[other.id].correct_option_id)
+
+    def test_malformed_specs_grade_wrong_without_breaking_the_lesson(self):
+        bad = [
+            Problem.objects.create(lesson=self.lesson, question_text=f"bad {i}", correct_value=1) for i in range(3)
+        ]
+        for problem, spec in zip(bad, (["number", 1], {"type": "number", "value": 1, "abs_tol": "wide"},
+                                       {"type": "number", "value": 1, "abs_tol": [1]})):
+            Problem.objects.filter(pk=problem.pk).update(answer_spec=spec)  # bypasses save() validation
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        with self.assertLogs("lessons.answer_keys", "WARNING"):
+            key = answer_key_cache.get(lesson)
+        self.assertEqual(key[self.p2.id].correct_value, 2.0)
+        for problem in bad:
+            self.assertFalse(key[problem.id].matcher("1"))
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = AnswerKeyCache(max_size=1)
+        second = Lesson.objects.create(title="Other")
+        cache.get(self.lesson)
+        cache.get(second)
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
@@ -0,0 +1,107 @@
+import time
+import uuid
+from django.test import SimpleTestCase, TestCase
+
+from users.models import User
+from lessons.answer_keys import answer_key_cache
+from lessons.matchers import compile_answer_spec, compile_expression
+from lessons.models import Lesson, Problem
+
+
+class AnswerMatcherTests(SimpleTestCase):
+    """Covers number/fraction/expression specs and the expression sandbox."""
+
+    def test_number_with_tolerances(self):
+        match = compile_answer_spec({"type": "number", "value": 9.81, "abs_tol": 0.01})
+        self.assertTrue(match(9.805))
+        self.assertTrue(match("9.81"))
+        self.assertFalse(match(9.9))
+        rel = compile_answer_spec({"type": "number", "value": 1000, "rel_tol": 0.01, "abs_tol": 0})
+        self.assertTrue(match("981/100"))
+        self.assertTrue(rel(1009))
+        self.assertFalse(rel(1011))
+
+    def test_fraction_exact_and_reduced(self):
+        third = compile_answer_spec({"type": "fraction", "value": "1/3"})
+        self.assertTrue(third("1/3"))
+        self.assertTrue(third("2/6"))
+        self.assertFalse(third(0.3333333))
+        self.assertFalse(third("1/0"))
+        half = compile_answer_spec({"type": "fraction", "value": "1/2", "reduced": True})
+        self.assertTrue(half("1/2"))
+        self.assertTrue(half(0.5))
+        self.assertFalse(half("2/4"))
+
+    def test_fraction_rejects_huge_exponents_quickly(self):
+        big = compile_answer_spec({"type": "fraction", "value": "1500", "abs_tol": 1})
+        self.assertTrue(big("1.5e3"))
+        start = time.perf_counter()
+        for answer in ("1e5000000", "1e10000000", "-9.9E-9999999", "1e31"):
+            self.assertFalse(big(answer))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_expression_equivalence_sets(self):
+        match = compile_answer_spec({"type": "expression", "value": "2x+1", "variables": ["x"]})
+        for ok in ("2x+1", "1 + 2*x", "x + x + 1", "2(x + 1/2)"):
+            self.assertTrue(match(ok), ok)
+        for wrong in ("2x-1", "x^2+1", "2y+1", "", "2x+", 3):
+            self.assertFalse(match(wrong), wrong)
+
+        factored = compile_answer_spec({
+            "type": "expression", "value": ["(x+1)(x-1)", "x^2-1"], "variables": ["x"],
+        })
+        self.assertTrue(factored("x^2 - 1"))
+        self.assertTrue(factored("(x-1)(x+1)"))
+        numeric = compile_answer_spec({"type": "expression", "value": "sqrt(2)/2"})
+        self.assertTrue(numeric("1/sqrt(2)"))
+        self.assertTrue(numeric(0.7071067811865476))
+
+    def test_expression_sandbox_rejects_code(self):
+        for text in ("__import__('os')", "x.real", "[1, 2]", "lambda: 1", "open('f')", "9**9**9**9"):
+            with self.subTest(text=text):
+                try:
+                    fn = compile_expression(text, ["x"])
+                except ValueError:
+                    continue
+                with self.assertRaises(OverflowError):  # only the huge power compiles, as float maths
+                    fn(1.0)
+
+    def test_malformed_specs_are_rejected(self):
+        for spec in ({"type": "bogus", "value": 1}, {"type": "fraction"}, {"type": "fraction", "value": "x"},
+                     {"type": "expression", "value": "2z", "variables": ["x"]}, {"type": "expression", "value": []}):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                compile_answer_spec(spec)
+
+
+class AnswerSpecSubmitTests(TestCase):
+    """String answers through /submit against problems with answer specs."""
+
+    def setUp(self):
+        answer_key_cache.clear()
+        User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Fractions & Algebra")
+        self.frac = Problem.objects.create(lesson=self.lesson, question_text="1 / 3 = ?",
+                                           answer_spec={"type": "fraction", "value": "1/3"})
+        self.expr = Problem.objects.create(lesson=self.lesson, question_text="Simplify x + x + 1",
+                                           answer_spec={"type": "expression", "value": "2x+1", "variables": ["x"]})
+        self.plain = Problem.objects.create(lesson=self.lesson, question_text="6 / 2 = ?", correct_value=3.0)
+
+    def test_string_answers_are_graded(self):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": [
+            {"problem_id": self.frac.id, "value": "2/6"},
+            {"problem_id": self.expr.id, "value": "1+2x"},
+            {"problem_id": self.plain.id, "value": "3"},
+        ]}
+        r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["correct_count"], 3)
+
+    def test_answer_value_type_is_validated(self):
+        for value in (True, [1], {"a": 1}, "x" * 500):
+            body = {"attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": self.plain.id, "value": value}]}
+            r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+            self.assertEqual(r.status_code, 400, value)
+
+    def test_invalid_spec_is_rejected_on_save(self):
+        with self.assertRaises(ValueError):
+            Problem.objects.create(lesson=self.lesson, question_text="?", answer_spec={"type": "fraction"})
@@ -0,0 +1,68 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase
+
+from users.models import User
+from lessons import async_views
+from lessons.models import Lesson, Problem, ProblemOption
+from users import async_views as user_async_views
+from submissions import async_views as submit_async_views
+from submissions.ledger import current_total_xp
+
+
+class AsyncReadViewTests(TestCase):
+    """The ASGI read path must return the same bodies as the DRF views."""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create(pk=1, username="demo", total_xp=30)
+        self.lesson = Lesson.objects.create(title="Async")
+        problem = Problem.objects.create(lesson=self.lesson, question_text="2 x 2 = ?")
+        ProblemOption.objects.create(problem=problem, text="4")
+        self.factory = AsyncRequestFactory()
+
+    async def test_catalog_matches_sync_views(self):
+        sync_list = await self.async_client.get("/api/lessons/")
+        sync_detail = await self.async_client.get(f"/api/lessons/{self.lesson.id}/")
+        await cache.aclear()
+
+        r = await async_views.lesson_list(self.factory.get("/api/lessons/"))
+        self.assertEqual(r.content, sync_list.content)
+        r = await async_views.lesson_detail(self.factory.get("/"), pk=self.lesson.id)
+        self.assertEqual(r.content, sync_detail.content)
+        self.assertEqual(r["ETag"], sync_detail["ETag"])
+
+        query = "?fields=title,problems.options&problems_limit=1"
+        sync_slice = await self.async_client.get(f"/api/lessons/{self.lesson.id}/{query}")
+        r = await async_views.lesson_detail(self.factory.get(query), pk=self.lesson.id)
+        self.assertEqual(r.content, sync_slice.content)
+
+    async def test_profile_matches_sync_view(self):
+        sync_profile = await self.async_client.get("/api/profile")
+        r = await user_async_views.profile(self.factory.get("/api/profile"))
+        self.assertEqual(r.content, sync_profile.content)
+
+    async def test_write_methods_rejected(self):
+        r = await async_views.lesson_list(self.factory.post("/api/lessons/"))
+        self.assertEqual(r.status_code, 405)
+
+
+class PooledSubmitTests(TransactionTestCase):
+    """Submissions routed through the bounded pool behave like the sync view."""
+
+    def setUp(self):
+        User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Pool")
+        self.problem = Problem.objects.create(lesson=self.lesson, question_text="9 / 3 = ?", correct_value=3)
+
+    async def test_submit_runs_on_pool(self):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": self.problem.id, "value": 3}]}
+        request = AsyncRequestFactory().post(
+            f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json"
+        )
+        r = await submit_async_views.lesson_submit(request, id=self.lesson.id)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn(b'"earned_xp":10', r.content)
+        self.assertEqual(await sync_to_async(current_total_xp)(1), 10)
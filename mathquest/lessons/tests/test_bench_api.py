@@ -0,0 +1,43 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from lessons.models import Lesson
+from submissions.ledger import current_total_xp
+from users.models import User
+
+
+class BenchApiCommandTests(TestCase):
+    """Smoke test: bench_api reports per-endpoint stats and cleans up after itself."""
+
+    def test_reports_json_and_cleans_up(self):
+        User.objects.create(pk=1, username="demo", total_xp=5)
+        out = io.StringIO()
+        call_command(
+            "bench_api", "--lessons=2", "--problems=3", "--requests=3", "--warmup=1",
+            "--concurrency=1", stdout=out,
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(set(report["endpoints"]), {"lessons-list", "lesson-detail", "profile", "lesson-submit"})
+        submit = report["endpoints"]["lesson-submit"]
+        self.assertEqual(submit["requests"], 3)
+        self.assertEqual(submit["errors"], 0)
+        self.assertGreater(submit["queries"]["mean"], 0)
+        self.assertEqual(set(submit["latency_ms"]), {"p50", "p95", "p99", "mean", "max"})
+
+        self.assertFalse(Lesson.objects.exists())
+        self.assertEqual(current_total_xp(1), 5)
+
+
+class BenchSerializersCommandTests(TestCase):
+    def test_fast_path_matches_serializer_and_cleans_up(self):
+        out = io.StringIO()
+        call_command("bench_serializers", "--sizes=3,5", "--repeat=2", stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(set(report["sizes"]), {"3", "5"})
+        self.assertTrue(all(size["identical"] for size in report["sizes"].values()))
+        self.assertFalse(Lesson.objects.exists())
@@ -0,0 +1,223 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from lessons.models import Lesson, Problem, ProblemOption
+
+
+class CatalogCacheTests(TestCase):
+    """Covers cached list/detail bodies, conditional GETs and invalidation on content edits."""
+
+    def setUp(self):
+        cache.clear()
+        self.lesson = Lesson.objects.create(title="Catalog")
+        self.problem = Problem.objects.create(lesson=self.lesson, question_text="1 + 2 = ?")
+        ProblemOption.objects.create(problem=self.problem, text="3")
+        self.url = f"/api/lessons/{self.lesson.id}/"
+
+    def test_detail_shape_and_warm_hit_without_queries(self):
+        r1 = self.client.get(self.url)
+        self.assertEqual(r1.status_code, 200)
+        data = r1.json()
+        self.assertEqual(data["title"], "Catalog")
+        self.assertEqual(data["problems"][0]["question_text"], "1 + 2 = ?")
+        self.assertEqual([o["text"] for o in data["problems"][0]["options"]], ["3"])
+        self.assertIn("ETag", r1)
+        self.assertIn("Last-Modified", r1)
+
+        with self.assertNumQueries(0):
+            r2 = self.client.get(self.url)
+        self.assertEqual(r2.content, r1.content)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get("/api/lessons/")["ETag"]
+        r = self.client.get("/api/lessons/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.content, b"")
+
+    def test_content_change_invalidates_cached_body(self):
+        etag = self.client.get(self.url)["ETag"]
+        ProblemOption.objects.create(problem=self.problem, text="4")
+
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()["problems"][0]["options"]), 2)
+
+    def test_fill_racing_an_edit_is_not_served(self):
+        from unittest import mock
+        from lessons import catalog
+
+        build = catalog._detail_payload
+
+        def edit_commits_mid_fill(*rows):
+            payload = build(*rows)  # built from the rows read before the edit
+            Lesson.objects.filter(pk=self.lesson.pk).update(title="Edited")
+            catalog.invalidate_lessons([self.lesson.pk])
+            return payload
+
+        with mock.patch.object(catalog, "_detail_payload", edit_commits_mid_fill):
+            self.assertEqual(self.client.get(self.url).json()["title"], "Catalog")
+        self.assertEqual(self.client.get(self.url).json()["title"], "Edited")
+
+    def test_missing_lesson_is_404(self):
+        self.assertEqual(self.client.get("/api/lessons/999999/").status_code, 404)
+
+
+class CatalogListPaginationTests(TestCase):
+    """The list is lesson summaries, keyset-paginated by id, one cached body per page."""
+
+    def setUp(self):
+        cache.clear()
+        self.lessons = [Lesson.objects.create(title=f"L{i}") for i in range(5)]
+        for i in range(3):
+            Problem.objects.create(lesson=self.lessons[0], question_text=f"{i} = ?")
+
+    def test_summary_shape(self):
+        data = self.client.get("/api/lessons/").json()
+        self.assertEqual(data["next"], None)
+        self.assertEqual(data["results"][0], {"id": self.lessons[0].id, "title": "L0", "problem_count": 3})
+        self.assertEqual([lesson["problem_count"] for lesson in data["results"][1:]], [0, 0, 0, 0])
+
+    def test_cursor_walks_every_lesson_once(self):
+        seen, cursor = [], None
+        while True:
+            url = "/api/lessons/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data["results"]), 2)
+            seen += [lesson["id"] for lesson in data["results"]]
+            cursor = data["next"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [lesson.id for lesson in self.lessons])
+
+    def test_pages_cached_and_invalidated_together(self):
+        Lesson.objects.bulk_create([Lesson(title=f"M{i}") for i in range(20)])  # a second default page
+        page2 = self.client.get("/api/lessons/").json()["next"]
+        url = f"/api/lessons/?cursor={page2}"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+            self.client.get(f"{url}&limit=20")
+        Problem.objects.create(lesson=Lesson.objects.order_by("pk").last(), question_text="new")
+        self.assertEqual(self.client.get(url).json()["results"][-1]["problem_count"], 1)
+
+    def test_other_page_sizes_are_not_cached(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(len(self.client.get("/api/lessons/?limit=2").json()["results"]), 2)
+
+    def test_bad_params_are_400(self):
+        for query in ("cursor=!!", "cursor=WyJ4Il0", "limit=0", "limit=101"):
+            r = self.client.get(f"/api/lessons/?{query}")
+            self.assertEqual(r.status_code, 400, query)
+            self.assertEqual(r.json()["error"], "Validation")
+
+
+class DetailSliceTests(TestCase):
+    """Covers ?fields= and ?problems_offset=/problems_limit= on the detail endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.lesson = Lesson.objects.create(title="Big")
+        self.problems = [Problem.objects.create(lesson=self.lesson, question_text=f"Q{i}") for i in range(5)]
+        for problem in self.problems:
+            ProblemOption.objects.create(problem=problem, text=f"o{problem.pk}")
+        self.url = f"/api/lessons/{self.lesson.id}/"
+
+    def test_full_fieldset_matches_cached_body(self):
+        full = self.client.get(self.url)
+        sliced = self.client.get(self.url + "?problems_offset=0")
+        self.assertEqual(sliced.content, full.content)
+        self.assertEqual(sliced["Last-Modified"], full["Last-Modified"])
+
+    def test_unknown_params_use_cached_body(self):
+        full = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            r = self.client.get(self.url, {"_": "1700000000", "utm_source": "mail"})
+        self.assertEqual(r.content, full.content)
+
+    async def test_async_unknown_params_use_cached_body(self):
+        from unittest import mock
+        from django.test import AsyncRequestFactory
+        from lessons import async_views
+
+        full = await self.async_client.get(self.url)
+        with mock.patch.object(async_views, "alesson_detail_slice") as sliced:
+            r = await async_views.lesson_detail(AsyncRequestFactory().get(self.url, {"_": "1"}), pk=self.lesson.id)
+        sliced.assert_not_called()
+        self.assertEqual(r.content, full.content)
+        self.assertEqual(r["ETag"], full["ETag"])
+
+    def test_pages_walk_problems_by_id(self):
+        full = self.client.get(self.url).json()["problems"]
+        seen, offset = [], 0
+        while offset is not None:
+            data = self.client.get(self.url, {"problems_offset": offset, "problems_limit": 2}).json()
+            self.assertLessEqual(len(data["problems"]), 2)
+            seen += data["problems"]
+            offset = data["problems_next"]
+        self.assertEqual(seen, full)
+
+    def test_sparse_fields_skip_unrequested_queries(self):
+        with self.assertNumQueries(1):
+            r = self.client.get(self.url, {"fields": "title"})
+        self.assertEqual(r.json(), {"title": "Big"})
+        with self.assertNumQueries(2):
+            r = self.client.get(self.url, {"fields": "problems.question_text", "problems_limit": 1})
+        self.assertEqual(r.json(), {"problems": [{"question_text": "Q0"}], "problems_next": self.problems[0].pk})
+        with self.assertNumQueries(3):
+            r = self.client.get(self.url, {"fields": "id,problems.id,problems.options", "problems_limit": 1})
+        self.assertEqual(r.json()["problems"], [{"id": self.problems[0].pk, "options": [
+            {"id": self.problems[0].options.get().pk, "text": f"o{self.problems[0].pk}"},
+        ]}])
+
+    def test_bad_params_are_400_and_missing_lesson_404(self):
+        for query in ("fields=secret", "fields=problems.correct_value", "problems_limit=0", "problems_offset=-1"):
+            r = self.client.get(f"{self.url}?{query}")
+            self.assertEqual(r.status_code, 400, query)
+            self.assertEqual(r.json()["error"], "Validation")
+        self.assertEqual(self.client.get("/api/lessons/999999/?fields=title").status_code, 404)
+
+
+class FastCatalogRenderTests(TestCase):
+    """The values()-built tree rendered with render_json must match the DRF serializer byte for byte."""
+
+    def setUp(self):
+        cache.clear()
+        self.lesson = Lesson.objects.create(title='Brüche "½" \u2028 line')
+        for i in range(3):
+            problem = Problem.objects.create(lesson=self.lesson, question_text=f"Q{i}\t\x01 ∑ \u2029 \\ 🙂")
+            for text in ("a", "é", "</script>"):
+                ProblemOption.objects.create(problem=problem, text=text)
+        Problem.objects.create(lesson=self.lesson, question_text="no options")
+        Lesson.objects.create(title="Empty")
+
+    def test_bodies_match_serializer(self):
+        from rest_framework.renderers import JSONRenderer
+        from lessons.catalog import lesson_tree_queryset
+        from lessons.serializers import LessonSerializer, LessonSummarySerializer
+
+        lessons = list(lesson_tree_queryset().order_by("pk"))
+        self.assertEqual(
+            self.client.get("/api/lessons/").content,
+            JSONRenderer().render({"results": LessonSummarySerializer(lessons, many=True).data, "next": None}),
+        )
+        self.assertEqual(
+            self.client.get(f"/api/lessons/{self.lesson.id}/").content,
+            JSONRenderer().render(LessonSerializer(lessons[0]).data),
+        )
+
+    def test_render_json_falls_back_for_values_orjson_renders_differently(self):
+        from datetime import datetime, timezone
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from mathquest.renderers import render_json
+
+        for data in (
+            {"at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)},
+            {"n": Decimal("1.50")},
+            {1: "int key"},
+            None,
+        ):
+            self.assertEqual(render_json(data), JSONRenderer().render(data))
+        with self.assertRaises(ValueError):
+            render_json({"x": float("nan")})
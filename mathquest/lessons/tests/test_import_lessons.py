@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from lessons.answer_keys import answer_key_cache
+from lessons.importer import LessonImporter, iter_csv, iter_jsonl
+from lessons.models import Lesson, Problem
+
+
+class ImportLessonsTests(TestCase):
+    """Covers JSONL/CSV/synthetic bulk import, correct_option fix-up and chunking."""
+
+    def test_jsonl_import_sets_correct_options_and_counts(self):
+        lines = [
+            {"title": "Adding", "problems": [
+                {"question_text": "1 + 1 = ?", "options": ["1", "2", "3"], "correct_option": 1},
+                {"question_text": "2 + 2 = ?", "correct_value": 4},
+            ]},
+            {"title": "Empty", "problems": []},
+        ]
+        fh = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n\n")
+        result = LessonImporter(chunk_size=1).run(iter_jsonl(fh))
+
+        self.assertEqual((result["lessons"], result["problems"], result["options"]), (2, 2, 3))
+        lesson = Lesson.objects.get(title="Adding")
+        self.assertEqual(lesson.problem_count, 2)
+        mcq = Problem.objects.get(question_text="1 + 1 = ?")
+        self.assertEqual(mcq.correct_option.text, "2")
+        self.assertEqual(mcq.correct_option.problem_id, mcq.id)
+
+        key = answer_key_cache.get(lesson)
+        self.assertEqual(key[mcq.id].correct_option_id, mcq.correct_option_id)
+
+    def test_csv_import_groups_rows_by_lesson(self):
+        fh = io.StringIO(
+            "lesson_title,question_text,options,correct_option,correct_value\n"
+            "Mult,3 x 3 = ?,6|9,1,\n"
+            "Mult,4 x 0 = ?,,,0\n"
+            "Div,8 / 2 = ?,,,4\n"
+        )
+        LessonImporter().run(iter_csv(fh))
+        self.assertEqual(Lesson.objects.get(title="Mult").problem_count, 2)
+        self.assertEqual(Problem.objects.get(question_text="3 x 3 = ?").correct_option.text, "9")
+        self.assertEqual(Problem.objects.get(question_text="4 x 0 = ?").correct_value, 0.0)
+
+    def test_out_of_range_correct_option_rejected(self):
+        fh = io.StringIO(json.dumps({"title": "Bad", "problems": [
+            {"question_text": "?", "options": ["a"], "correct_option": 3}]}))
+        with self.assertRaises(ValueError):
+            LessonImporter().run(iter_jsonl(fh))
+        self.assertFalse(Lesson.objects.filter(title="Bad").exists())
+
+    def test_malformed_records_are_reported_with_their_line(self):
+        good = json.dumps({"title": "Good", "problems": []})
+        for record in (
+            {"title": "Bad", "problems": [{"question_text": "?", "options": ["a"], "correct_option": [0]}]},
+            {"title": "Bad", "problems": [{"options": ["a"]}]},
+            ["not", "a", "lesson"],
+        ):
+            with self.assertRaisesRegex(ValueError, "^line 3: "):
+                LessonImporter().run(iter_jsonl(io.StringIO(f"{good}\n\n{json.dumps(record)}\n")))
+        with self.assertRaisesRegex(ValueError, "^line 3: "):
+            LessonImporter().run(iter_csv(io.StringIO(
+                "lesson_title,question_text,options,correct_option\nA,?,a|b,1\nA,?,a|b,first\n"
+            )))
+        with self.assertRaisesRegex(ValueError, "malformed lesson data"):
+            LessonImporter().run([{"problems": []}])
+        with self.assertRaisesRegex(CommandError, "line 1: problem 0: question_text"):
+            with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as fh:
+                fh.write(json.dumps({"title": "Bad", "problems": [{}]}) + "\n")
+            self.addCleanup(os.unlink, fh.name)
+            call_command("import_lessons", fh.name, stdout=io.StringIO())
+
+    def test_command_synthetic_and_file(self):
+        out = io.StringIO()
+        call_command("import_lessons", "--synthetic=3", "--problems=4", "--options=3", "--chunk-size=5", stdout=out)
+        self.assertEqual(Lesson.objects.count(), 3)
+        self.assertEqual(Problem.objects.count(), 12)
+        self.assertEqual(
+            Problem.objects.filter(correct_value__isnull=True, correct_option__isnull=True).count(), 0
+        )
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as fh:
+            fh.write(json.dumps({"title": "From file", "problems": [{"question_text": "?", "correct_value": 1}]}))
+        try:
+            call_command("import_lessons", fh.name, stdout=out)
+        finally:
+            os.unlink(fh.name)
+        self.assertTrue(Lesson.objects.filter(title="From file", problem_count=1).exists())
+        self.assertIn("Imported 1 lessons", out.getvalue())
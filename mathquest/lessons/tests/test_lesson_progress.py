@@ -0,0 +1,101 @@
+import uuid
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+
+from users.models import User
+from lessons import async_views
+from lessons.models import Lesson, Problem, UserLessonProgress
+from lessons.progress import ProgressIndex, progress_index
+from lessons.services import rebuild_progress_counters
+
+URL = "/api/lessons/?include_progress=1"
+
+
+class LessonListProgressTests(TestCase):
+    """Covers ?include_progress=1: shape, query counts and freshness after submits."""
+
+    def setUp(self):
+        cache.clear()
+        progress_index.clear()
+        User.objects.create(pk=1, username="demo")
+        self.lessons = [Lesson.objects.create(title=f"L{i}") for i in range(3)]
+        self.problems = [
+            Problem.objects.create(lesson=lesson, question_text=f"{i} + 1 = ?", correct_value=i + 1)
+            for lesson in self.lessons[:2] for i in range(2)
+        ]
+
+    def _submit(self, problem):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": problem.id, "value": problem.correct_value}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/lessons/{problem.lesson_id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+
+    def _progress(self):
+        return [lesson["progress"] for lesson in self.client.get(URL).json()["results"]]
+
+    def test_default_list_has_no_progress(self):
+        self.assertNotIn("progress", self.client.get("/api/lessons/").json()["results"][0])
+
+    def test_progress_per_lesson(self):
+        self._submit(self.problems[0])
+        data = self.client.get(URL).json()["results"]
+        self.assertEqual([lesson["title"] for lesson in data], ["L0", "L1", "L2"])
+        self.assertEqual([lesson["progress"] for lesson in data], [0.5, 0.0, 0.0])
+        self.assertEqual(data[0]["problem_count"], 2)
+
+    def test_one_query_cold_none_warm(self):
+        self.client.get("/api/lessons/")  # warm the shared catalog page
+        with self.assertNumQueries(1):
+            self.client.get(URL)
+        with self.assertNumQueries(0):
+            r = self.client.get(URL)
+        self.assertEqual(r.status_code, 200)
+
+    def test_submit_reloads_user_once(self):
+        self.assertEqual(self._progress(), [0.0, 0.0, 0.0])
+        self._submit(self.problems[0])
+        self._submit(self.problems[3])
+        with self.assertNumQueries(1):
+            self.assertEqual(self._progress(), [0.5, 0.5, 0.0])
+        with self.assertNumQueries(0):
+            self._progress()
+
+    def test_load_racing_a_commit_is_not_patched_twice(self):
+        # a read loads rows that already include the solve, under the pre-commit version
+        UserLessonProgress.objects.create(user_id=1, lesson=self.lessons[0], solved_count=1)
+        self.assertEqual(progress_index.get(1).get(self.lessons[0].pk), 1)
+        progress_index.record(1)  # the submit's on_commit hook runs afterwards
+        self.assertEqual(progress_index.get(1).get(self.lessons[0].pk), 1)
+
+    def test_other_worker_sees_version_bump(self):
+        other = ProgressIndex()
+        self.assertEqual(other.get(1).get(self.lessons[0].pk), 0)
+        self._submit(self.problems[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(other.get(1).get(self.lessons[0].pk), 1)
+
+    def test_rebuild_invalidates_every_worker(self):
+        self._submit(self.problems[0])
+        self._progress()
+        UserLessonProgress.objects.all().delete()  # drift the rebuild repairs
+        rebuild_progress_counters()
+        self.assertEqual(self._progress(), [0.5, 0.0, 0.0])
+
+    def test_etag_changes_with_progress(self):
+        etag = self.client.get(URL)["ETag"]
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self._submit(self.problems[1])
+        r = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("Last-Modified", r)
+
+    def test_invalid_flag_is_400(self):
+        r = self.client.get("/api/lessons/?include_progress=maybe")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["error"], "Validation")
+
+    async def test_async_view_matches_sync(self):
+        sync_list = await self.async_client.get(URL)
+        r = await async_views.lesson_list(AsyncRequestFactory().get(URL))
+        self.assertEqual(r.content, sync_list.content)
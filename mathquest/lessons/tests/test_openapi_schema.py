@@ -0,0 +1,43 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class PrebuiltSchemaTests(SimpleTestCase):
+    """/api/schema/ serves the file build_openapi writes, with conditional GET support."""
+
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = self.dir / "openapi.json"
+        override = override_settings(OPENAPI_SCHEMA_FILE=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_missing_schema_is_404(self):
+        r = self.client.get("/api/schema/")
+        self.assertEqual(r.status_code, 404)
+        self.assertEqual(r.json()["error"], "NotFound")
+
+    def test_build_then_serve_with_etag(self):
+        call_command("build_openapi", stdout=io.StringIO(), stderr=io.StringIO())
+        call_command("build_openapi", "--check", stdout=io.StringIO(), stderr=io.StringIO())
+
+        r = self.client.get("/api/schema/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertEqual(r.content, self.path.read_bytes())
+        self.assertIn("/api/lessons/{id}/submit", r.json()["paths"])
+
+        r2 = self.client.get("/api/schema/", HTTP_IF_NONE_MATCH=r["ETag"])
+        self.assertEqual(r2.status_code, 304)
+        self.assertEqual(self.client.post("/api/schema/").status_code, 405)
+
+    def test_check_fails_on_stale_file(self):
+        self.path.write_bytes(b"{}")
+        with self.assertRaises(CommandError):
+            call_command("build_openapi", "--check", stdout=io.StringIO(), stderr=io.StringIO())
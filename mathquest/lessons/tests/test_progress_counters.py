@@ -0,0 +1,74 @@
+import io
+import uuid
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from users.models import User
+from lessons.models import Lesson, Problem, ProblemOption, UserLessonProgress
+
+
+class ProgressCounterTests(TestCase):
+    """Covers maintained problem/solved counters, problem removal and the rebuild command."""
+
+    def setUp(self):
+        self.user = User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Counters")
+        self.p1 = Problem.objects.create(lesson=self.lesson, question_text="1 + 1 = ?", correct_value=2)
+        self.p2 = Problem.objects.create(lesson=self.lesson, question_text="2 + 2 = ?", correct_value=4)
+        p3 = Problem.objects.create(lesson=self.lesson, question_text="pick")
+        p3.correct_option = ProblemOption.objects.create(problem=p3, text="x")
+        p3.save()
+        self.p3 = p3
+
+    def _submit(self, answers):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": answers}
+        return self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+
+    def _solved(self):
+        return UserLessonProgress.objects.get(user=self.user, lesson=self.lesson).solved_count
+
+    def test_counters_follow_submissions(self):
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.problem_count, 3)
+
+        r = self._submit([{"problem_id": self.p1.id, "value": 2}])
+        self.assertEqual(r.json()["lesson_progress"], 0.333)
+        r = self._submit([{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}])
+        self.assertEqual(r.json()["lesson_progress"], 0.667)
+        self.assertEqual(self._solved(), 2)
+
+    def test_deleting_a_solved_problem_keeps_counters_consistent(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}])
+        self.p1.delete()
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.problem_count, 2)
+        self.assertEqual(self._solved(), 1)
+
+    def test_moving_a_solved_problem_moves_its_counts(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}])
+        other = Lesson.objects.create(title="Other")
+        self.p1.lesson = other
+        self.p1.save()
+
+        self.lesson.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.lesson.problem_count, other.problem_count), (2, 1))
+        self.assertEqual(self._solved(), 1)
+        self.assertEqual(UserLessonProgress.objects.get(user=self.user, lesson=other).solved_count, 1)
+
+        self.p1.question_text = "edited"
+        self.p1.save()  # an edit in place moves nothing
+        other.refresh_from_db()
+        self.assertEqual(other.problem_count, 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}])
+        UserLessonProgress.objects.update(solved_count=7)
+        Lesson.objects.update(problem_count=0)
+
+        call_command("rebuild_lesson_progress", stdout=io.StringIO())
+
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.problem_count, 3)
+        self.assertEqual(self._solved(), 1)
@@ -6,6 +6,7 @@ from django.utils import timezone
 
 from users.models import User
 from lessons.models import Lesson, Problem, ProblemOption
+from submissions.ledger import current_total_xp
 from submissions.models import SubmissionResult
 
 
@@ -71,7 +72,7 @@ class ScoringLogicTests(TestCase):
         self.assertTrue(data2.get("duplicate", False))
         # total XP stays the same
         self.assertEqual(data2["new_total_xp"], total_after_first)
-        self.assertEqual(User.objects.get(pk=1).total_xp, total_after_first)
+        self.assertEqual(current_total_xp(1), total_after_first)
 
     def test_xp_upgrade_when_fixing_wrong_answer(self):
         """
@@ -87,7 +88,7 @@ class ScoringLogicTests(TestCase):
         r1 = self._submit(a1)
         self.assertEqual(r1.status_code, 200)
         self.assertEqual(r1.json()["earned_xp"], 20)
-        self.assertEqual(User.objects.get(pk=1).total_xp, 20)
+        self.assertEqual(current_total_xp(1), 20)
 
         # Attempt 2 (fix P2 to correct) => +10 XP only
         a2 = [
@@ -99,7 +100,7 @@ class ScoringLogicTests(TestCase):
         self.assertEqual(r2.status_code, 200)
         data2 = r2.json()
         self.assertEqual(data2["earned_xp"], 10)
-        self.assertEqual(User.objects.get(pk=1).total_xp, 30)
+        self.assertEqual(current_total_xp(1), 30)
 
     def test_streak_transitions_same_day_then_next_day_then_skip(self):
         """
@@ -144,3 +145,24 @@ class ScoringLogicTests(TestCase):
         ])
         u.refresh_from_db()
         self.assertEqual(u.current_streak, 1)
+
+    def test_grading_query_count_does_not_grow_with_answers(self):
+        """Grading loads answer keys/progress in bulk: same query count for 1 or 3 answers."""
+        from lessons.answer_keys import answer_key_cache
+        from lessons.services import evaluate_answers
+
+        answer_key_cache.clear()
+        other = User.objects.create(pk=2, username="other")
+        # cold answer key + solved upsert + lesson counter upsert + XP event insert
+        with self.assertNumQueries(4):
+            evaluate_answers(self.user, self.lesson, [
+                {"problem_id": self.p1.id, "option_id": self.o12_id},
+            ])
+        with self.assertNumQueries(3):  # warm answer key
+            correct, xp, details = evaluate_answers(other, self.lesson, [
+                {"problem_id": self.p1.id, "option_id": self.o12_id},
+                {"problem_id": self.p2.id, "option_id": self.o22_id},
+                {"problem_id": self.p3.id, "value": 5},
+            ])
+        self.assertEqual((correct, xp), (3, 30))
+        self.assertEqual(details, {self.p1.id: True, self.p2.id: True, self.p3.id: True})
@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from users.models import User
+from lessons.services import compute_streak_and_update, rollover_streaks
+
+
+class StreakRolloverTests(TestCase):
+    """Covers the set-based reset of broken streaks and its agreement with compute_streak_and_update."""
+
+    def setUp(self):
+        self.today = date(2026, 3, 10)
+        days = {"today": 0, "yesterday": 1, "two_days": 2, "month": 30}
+        for pk, (name, ago) in enumerate(days.items(), start=1):
+            User.objects.create(pk=pk, username=name, current_streak=4, best_streak=6,
+                                last_activity_date=self.today - timedelta(days=ago))
+        User.objects.create(pk=5, username="never")
+
+    def streaks(self):
+        return dict(User.objects.values_list("username", "current_streak"))
+
+    def test_resets_only_broken_streaks_in_chunks(self):
+        self.assertEqual(rollover_streaks(today=self.today, batch_size=1), 2)
+        self.assertEqual(self.streaks(), {"today": 4, "yesterday": 4, "two_days": 0, "month": 0, "never": 0})
+        self.assertEqual(User.objects.get(username="month").best_streak, 6)
+        # re-running is a no-op
+        self.assertEqual(rollover_streaks(today=self.today), 0)
+
+    def test_next_submit_after_rollover_restarts_at_one(self):
+        rollover_streaks()
+        user = User.objects.get(username="month")
+        self.assertEqual(user.current_streak, 0)
+        self.assertEqual(compute_streak_and_update(user, 0)["current"], 1)
+
+    def test_command_reports_count(self):
+        out = StringIO()
+        call_command("rollover_streaks", "--today", "2026-03-10", "--batch-size", "1", stdout=out)
+        self.assertIn("Reset 2 broken streaks", out.getvalue())
@@ -1,9 +1,27 @@
+from django.conf import settings
 from django.urls import path
+from mathquest.db_routers import replica_readable
 from .views import LessonListView, LessonDetailView
+from submissions.admission import admitted
 from submissions.views import LessonSubmitView
 
+list_view = LessonListView.as_view()
+detail_view = LessonDetailView.as_view()
+submit_view = admitted(LessonSubmitView.as_view())
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    from submissions import async_views as submit_async_views
+
+    list_view = async_views.lesson_list
+    detail_view = async_views.lesson_detail
+    submit_view = submit_async_views.lesson_submit
+
+list_view = replica_readable(list_view)
+detail_view = replica_readable(detail_view)
+
 urlpatterns = [
-    path("", LessonListView.as_view(), name="lessons-list"),
-    path("<int:pk>/", LessonDetailView.as_view(), name="lesson-detail"),
-    path("<int:id>/submit", LessonSubmitView.as_view(), name="lesson-submit"),
+    path("", list_view, name="lessons-list"),
+    path("<int:pk>/", detail_view, name="lesson-detail"),
+    path("<int:id>/submit", submit_view, name="lesson-submit"),
 ]
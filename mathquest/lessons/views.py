@@ -1,11 +1,71 @@
+from django.http import Http404
 from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.response import Response
+from .catalog import (
+    FULL_FIELDSET,
+    cached_json_response,
+    lesson_detail_payload,
+    lesson_detail_slice,
+    lesson_list_payload,
+)
 from .models import Lesson
-from .serializers import LessonSerializer
+from .progress import lesson_list_progress_payload
+from .serializers import (
+    LessonDetailQuerySerializer,
+    LessonListQuerySerializer,
+    LessonSerializer,
+    LessonSummarySerializer,
+)
 
 class LessonListView(ListAPIView):
-    queryset = Lesson.objects.all()
-    serializer_class = LessonSerializer
+    """
+    GET /api/lessons/?limit=20&cursor=&include_progress=0
+    - Lesson summaries (id, title, problem_count) in id order, keyset-paginated;
+      pass back `next` as cursor. The problem tree is only on the detail endpoint.
+    - Pages are cached, pre-rendered bodies with ETag support
+    - include_progress=1 adds the demo user's "progress" (0..1) to every lesson
+    """
+    queryset = Lesson.objects.order_by("pk")
+    serializer_class = LessonSummarySerializer
+
+    def list(self, request, *args, **kwargs):
+        query = LessonListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": "Validation", "message": query.errors}, status=400)
+        params = query.validated_data
+        try:
+            if params["include_progress"]:
+                payload = lesson_list_progress_payload(1, params.get("cursor"), params["limit"])
+            else:
+                payload = lesson_list_payload(params.get("cursor"), params["limit"])
+        except ValueError:
+            return Response({"error": "Validation", "message": "cursor is invalid"}, status=400)
+        return cached_json_response(request, payload)
 
 class LessonDetailView(RetrieveAPIView):
-    queryset = Lesson.objects.all()
+    """
+    GET /api/lessons/{id}/?fields=&problems_offset=0&problems_limit=
+    - Without parameters: the full tree from a cached, pre-rendered body (ETag/Last-Modified)
+    - fields: comma-separated subset of id, title, problems, problems.id,
+      problems.question_text, problems.options
+    - problems_limit: at most that many problems with id > problems_offset, plus
+      `problems_next` to pass back as problems_offset (null on the last page)
+    """
+    queryset = Lesson.objects.all()  # schema introspection only; retrieve() reads the catalog
     serializer_class = LessonSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        if LessonDetailQuerySerializer.requested(request.query_params):
+            query = LessonDetailQuerySerializer(data=request.query_params)
+            if not query.is_valid():
+                return Response({"error": "Validation", "message": query.errors}, status=400)
+            params = query.validated_data
+            payload = lesson_detail_slice(
+                kwargs["pk"], params.get("fields", FULL_FIELDSET),
+                params["problems_offset"], params.get("problems_limit"),
+            )
+        else:
+            payload = lesson_detail_payload(kwargs["pk"])
+        if payload is None:
+            raise Http404
+        return cached_json_response(request, payload)
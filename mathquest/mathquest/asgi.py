@@ -2,6 +2,10 @@
 ASGI config for mathquest project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Catalog/profile reads are served by async-native views here (ASYNC_VIEWS=1) and
+submissions run on a bounded thread pool, e.g.:
+
+    uvicorn mathquest.asgi:application --workers 2
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mathquest.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
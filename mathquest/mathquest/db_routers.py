@@ -0,0 +1,157 @@
+# mathquest/db_routers.py
+"""
+Primary/replica routing.
+
+Reads go to a replica only while `replica_reads` is set, which the views wrapped with
+replica_readable() (the lesson list/detail and profile) do for safe requests from
+clients ReplicaRoutingMiddleware has not pinned to the primary after a write.
+Everything else (writes, other views, reads inside a transaction on the primary,
+management commands, the shell) stays on "default". Replicas that are unreachable or lag by more than
+REPLICA_MAX_LAG_SECONDS are skipped until the next check.
+"""
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = "default"
+
+replica_reads = ContextVar("replica_reads", default=False)
+
+LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@contextmanager
+def use_primary():
+    """Route reads in this block to the primary, e.g. to fill a shared cache."""
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def replica_lag_window() -> int:
+    """
+    Seconds after a commit within which a replica the router may still pick can miss it:
+    lag is allowed up to REPLICA_MAX_LAG_SECONDS and checked every REPLICA_CHECK_SECONDS.
+    """
+    return math.ceil(settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_CHECK_SECONDS)
+
+
+def replicas_caught_up(changed_at) -> bool:
+    """Whether a write committed at `changed_at` (time.time(), or None if unknown/long ago) is on every usable replica."""
+    return changed_at is None or time.time() - changed_at > replica_lag_window()
+
+
+@contextmanager
+def fill_reads(changed_at):
+    """
+    Reads that fill a shared cache after an invalidation at `changed_at`. They follow the
+    router (replicas for unpinned safe requests) unless the data changed too recently
+    for a replica to be trusted with it; a stale fill would be served to everyone.
+    """
+    if replicas_caught_up(changed_at):
+        yield
+    else:
+        with use_primary():
+            yield
+
+
+@contextmanager
+def allow_replica_reads():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def replica_readable(view):
+    """
+    Let a read-only view (sync or async) read from replicas for safe requests that are
+    not pinned to the primary (request.primary_pinned, set by ReplicaRoutingMiddleware;
+    pinned when the middleware did not run).
+    """
+
+    def allowed(request) -> bool:
+        return request.method in ("GET", "HEAD", "OPTIONS") and not getattr(request, "primary_pinned", True)
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def replica_view(request, *args, **kwargs):
+            if not allowed(request):
+                return await view(request, *args, **kwargs)
+            with allow_replica_reads():
+                return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def replica_view(request, *args, **kwargs):
+            if not allowed(request):
+                return view(request, *args, **kwargs)
+            with allow_replica_reads():
+                return view(request, *args, **kwargs)
+
+    return replica_view
+
+
+class ReplicaHealth:
+    """Per-process cache of replica lag checks: {alias: (checked_at, healthy)}."""
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def healthy(self, alias: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._checked.get(alias)
+        if entry is not None and now - entry[0] < settings.REPLICA_CHECK_SECONDS:
+            return entry[1]
+        try:
+            healthy = self.lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+        except DatabaseError:
+            healthy = False
+        with self._lock:
+            self._checked[alias] = (now, healthy)
+        return healthy
+
+    def lag(self, alias: str) -> float:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+
+    def clear(self):
+        with self._lock:
+            self._checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        healthy = [alias for alias in settings.DATABASE_REPLICA_ALIASES if replica_health.healthy(alias)]
+        return random.choice(healthy) if healthy else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
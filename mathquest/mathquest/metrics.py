@@ -0,0 +1,172 @@
+"""
+In-process request metrics: per-view latency/DB histograms, named phases inside views
+and a Prometheus text endpoint. Every worker process keeps (and exposes) its own numbers.
+"""
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for label_values, series in items:
+                labels = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, label_values))
+                sep = "," if labels else ""
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+request_seconds = Histogram(
+    "mathquest_request_duration_seconds", "Total request time per view.", LATENCY_BUCKETS, ("view",)
+)
+request_db_seconds = Histogram(
+    "mathquest_request_db_seconds", "Time spent in DB queries per request.", LATENCY_BUCKETS, ("view",)
+)
+request_queries = Histogram(
+    "mathquest_request_queries", "DB queries issued per request.", QUERY_BUCKETS, ("view",)
+)
+phase_seconds = Histogram(
+    "mathquest_phase_duration_seconds", "Named phases inside views (e.g. submit lock wait).",
+    LATENCY_BUCKETS, ("view", "phase"),
+)
+HISTOGRAMS = (request_seconds, request_db_seconds, request_queries, phase_seconds)
+
+
+class RequestTimings:
+    """Per-request accumulator; installed by RequestMetricsMiddleware."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = []  # [(name, seconds)]
+        self.view = None
+
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    # Installed on every connection; the context var follows the request into
+    # sync_to_async/executor threads, so one hook covers sync and async views.
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - start
+        timings.queries += 1
+
+
+def instrument_connection(connection, **kwargs):
+    """connection_created receiver (also called directly for already-open connections)."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def phase(name):
+    """Time a named phase; it shows up in Server-Timing and the phase histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = current_timings.get()
+        if timings is not None:
+            timings.phases.append((name, elapsed))
+        phase_seconds.observe(elapsed, timings.view if timings and timings.view else "none", name)
+
+
+def server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    parts = [
+        f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"',
+        *(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.phases),
+        f"total;dur={total_seconds * 1000:.2f}",
+    ]
+    return ", ".join(parts)
+
+
+def record_request(timings: RequestTimings, total_seconds: float):
+    view = timings.view or "unmatched"
+    request_seconds.observe(total_seconds, view)
+    request_db_seconds.observe(timings.db_seconds, view)
+    request_queries.observe(timings.queries, view)
+
+
+def render_prometheus() -> str:
+    from lessons.answer_keys import answer_key_cache
+    from submissions.admission import submit_admission
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    stats = answer_key_cache.stats()
+    for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        name = f"mathquest_answer_key_cache_{key}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {stats[key]}")
+
+    stats = submit_admission.stats()
+    lines.append("# TYPE mathquest_submit_inflight gauge")
+    lines.append(f"mathquest_submit_inflight {stats['inflight']}")
+    lines.append("# TYPE mathquest_submit_rejected_total counter")
+    for reason in ("overloaded", "concurrency", "rate"):
+        lines.append(f'mathquest_submit_rejected_total{{reason="{reason}"}} {stats[f"rejected_{reason}"]}')
+    return "\n".join(lines) + "\n"
+
+
+def metrics_allowed(request) -> bool:
+    """Staff sessions, or scrapers sending `Authorization: Bearer <METRICS_TOKEN>`."""
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """GET /api/metrics: Prometheus text exposition of this process's metrics (see metrics_allowed)."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden("metrics need a staff session or METRICS_TOKEN\n", content_type="text/plain")
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
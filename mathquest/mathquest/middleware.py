@@ -0,0 +1,102 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import RequestTimings, current_timings, instrument_connection, record_request, server_timing
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts DB queries/time and total time per request, adds a Server-Timing header and
+    feeds the per-view histograms served at /api/metrics. Views can add named phases
+    with mathquest.metrics.phase().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(instrument_connection, dispatch_uid="mathquest.metrics")
+        for conn in connections.all(initialized_only=True):
+            instrument_connection(conn)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(response, timings, time.perf_counter() - start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.view = request.resolver_match.url_name
+
+    def _finish(self, response, timings, total_seconds):
+        response["Server-Timing"] = server_timing(timings, total_seconds)
+        record_request(timings, total_seconds)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pins clients that just wrote to the primary, so a student who just submitted reads
+    their own XP/progress. Any unsafe request (re)sets the pin for REPLICA_PIN_SECONDS:
+    as the mq_primary cookie for same-origin clients, and as the X-MQ-Primary-Pin
+    response header, which cross-origin clients (the frontend) echo back as X-MQ-Primary
+    while it lasts. Views opt in to replicas with db_routers.replica_readable.
+    """
+
+    sync_capable = True
+    async_capable = True
+    COOKIE = "mq_primary"
+    PIN_HEADER = "X-MQ-Primary-Pin"
+    PINNED_HEADER = "X-MQ-Primary"
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._pin_state(request)
+        return self._finish(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        self._pin_state(request)
+        return self._finish(request, await self.get_response(request))
+
+    def _pin_state(self, request):
+        request.primary_pinned = self.COOKIE in request.COOKIES or self.PINNED_HEADER in request.headers
+
+    def _finish(self, request, response):
+        if request.method not in self.SAFE_METHODS:
+            response.set_cookie(
+                self.COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax"
+            )
+            response[self.PIN_HEADER] = str(settings.REPLICA_PIN_SECONDS)
+        return response
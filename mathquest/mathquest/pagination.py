@@ -0,0 +1,81 @@
+# mathquest/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on a page, so fetching the next page is an
+index range scan that starts where the previous one stopped; page N costs the same
+as page 1, unlike OFFSET.
+"""
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values) -> str:
+    values = [v if isinstance(v, (int, float)) else v.isoformat() if hasattr(v, "isoformat") else str(v) for v in values]
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("InvalidCursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("InvalidCursor")
+    return values
+
+
+def keyset_filter(qs, fields, values, descending=False):
+    """
+    Rows strictly after `values` in (fields...) order. The leading field also gets a
+    non-strict bound so the planner can use it as an index range condition.
+    """
+    op = "lt" if descending else "gt"
+    branches = []
+    for i, field in enumerate(fields):
+        equal = {f: v for f, v in zip(fields[:i], values[:i])}
+        branches.append(Q(**equal, **{f"{field}__{op}": values[i]}))
+    return qs.filter(**{f"{fields[0]}__{op}e": values[0]}).filter(reduce(or_, branches))
+
+
+def _page_query(qs, fields, cursor, descending):
+    ordering = [f"-{f}" if descending else f for f in fields]
+    if cursor:
+        qs = keyset_filter(qs, fields, decode_cursor(cursor, len(fields)), descending)
+    return qs.order_by(*ordering)
+
+
+def _split_page(rows, fields, limit):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][f] for f in fields)
+
+
+def keyset_page(qs, fields, cursor=None, limit=20, descending=False):
+    """
+    One page of `qs` (a values() queryset containing `fields`) ordered by fields.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for an invalid cursor.
+    """
+    try:
+        rows = list(_page_query(qs, fields, cursor, descending)[: limit + 1])
+    except ValidationError as exc:  # cursor values that don't fit the field types
+        raise ValueError("InvalidCursor") from exc
+    return _split_page(rows, fields, limit)
+
+
+async def akeyset_page(qs, fields, cursor=None, limit=20, descending=False):
+    """Async variant of keyset_page."""
+    try:
+        rows = [row async for row in _page_query(qs, fields, cursor, descending)[: limit + 1]]
+    except ValidationError as exc:
+        raise ValueError("InvalidCursor") from exc
+    return _split_page(rows, fields, limit)
@@ -0,0 +1,59 @@
+# mathquest/renderers.py
+"""
+Fast JSON encoding for pre-rendered response bodies.
+
+render_json() produces the same bytes as DRF's JSONRenderer with this project's
+settings (compact separators, UTF-8, U+2028/U+2029 escaped), using orjson when it
+is installed. Data orjson cannot encode identically (datetimes, Decimals, lazy
+strings, NaN, huge ints, ...) goes through JSONRenderer instead.
+"""
+import json
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: everything still works through JSONRenderer
+    orjson = None
+
+# datetimes/dataclasses reach default(), which rejects them -> JSONRenderer handles them
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+def _unsupported(obj):
+    raise TypeError
+
+
+def _fast(data):
+    body = orjson.dumps(data, default=_unsupported, option=_ORJSON_OPTIONS)
+    # orjson writes NaN/Infinity as null, where JSONRenderer refuses them
+    if b"null" in body and _has_non_finite(data):
+        raise TypeError
+    return body.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+def _has_non_finite(data) -> bool:
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(v) for v in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(v) for v in data)
+    return False
+
+
+def load_json(body: bytes):
+    """Decode a body render_json() produced."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def render_json(data) -> bytes:
+    if orjson is not None and data is not None:
+        try:
+            return _fast(data)
+        except TypeError:  # orjson.JSONEncodeError is a TypeError
+            pass
+    return JSONRenderer().render(data)
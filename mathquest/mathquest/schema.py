@@ -0,0 +1,61 @@
+# mathquest/schema.py
+"""
+OpenAPI schema served from the file `manage.py build_openapi` writes at build time,
+so workers never introspect views per request and do not need drf-spectacular
+loaded at all (it is only installed in docs mode, API_DOCS=1).
+
+The file is read once per process and re-read only when its mtime or size changes.
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from lessons.catalog import RenderedPayload, cached_json_response
+
+CONTENT_TYPE = "application/vnd.oai.openapi+json"
+
+_lock = threading.Lock()
+_loaded = None  # ((mtime_ns, size), RenderedPayload)
+
+
+def schema_payload() -> Optional[RenderedPayload]:
+    """The built schema with its ETag, or None if the file has not been built."""
+    global _loaded
+    path = settings.OPENAPI_SCHEMA_FILE
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _loaded is not None and _loaded[0] == version:
+            return _loaded[1]
+    body = path.read_bytes()
+    payload = RenderedPayload(
+        body,
+        '"%s"' % hashlib.md5(body).hexdigest(),
+        datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).replace(microsecond=0),
+    )
+    with _lock:
+        _loaded = (version, payload)
+    return payload
+
+
+@require_safe
+def schema_view(request):
+    """GET /api/schema/: the prebuilt OpenAPI document (JSON), with ETag/Last-Modified."""
+    payload = schema_payload()
+    if payload is None:
+        return JsonResponse(
+            {"error": "NotFound", "message": "OpenAPI schema has not been built; run `manage.py build_openapi`"},
+            status=404,
+        )
+    response = cached_json_response(request, payload)
+    if response.status_code == 200:
+        response["Content-Type"] = CONTENT_TYPE
+    return response
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +23,10 @@ load_dotenv(dotenv_path=BASE_DIR / ".env")
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "dev-secret-key")
 DEBUG = os.getenv("DEBUG", "1") == "1"
+# Docs mode: load drf-spectacular and serve Swagger UI / Redoc (on by default with DEBUG).
+# /api/schema/ serves the prebuilt OPENAPI_SCHEMA_FILE (`manage.py build_openapi`) either way.
+API_DOCS = os.getenv("API_DOCS", "1" if DEBUG else "0") == "1"
+OPENAPI_SCHEMA_FILE = Path(os.getenv("OPENAPI_SCHEMA_FILE", BASE_DIR / "openapi.json"))
 ALLOWED_HOSTS = [
     "http://localhost:3000",
     "localhost",
@@ -30,6 +35,10 @@ ALLOWED_HOSTS = [
 
 # Temporary for local dev
 CORS_ALLOW_ALL_ORIGINS = True
+# The frontend is cross-origin, so it cannot rely on the mq_primary cookie: it reads the
+# primary pin from this response header and echoes it back (ReplicaRoutingMiddleware)
+CORS_ALLOW_HEADERS = (*default_headers, "x-mq-primary")
+CORS_EXPOSE_HEADERS = ["X-MQ-Primary-Pin"]
 
 # Application definition
 INSTALLED_APPS = [
@@ -40,15 +49,17 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    "drf_spectacular",
-    "drf_spectacular_sidecar",
     'corsheaders',
     'lessons',
     'users',
     'submissions'
 ]
+if API_DOCS:
+    INSTALLED_APPS += ["drf_spectacular", "drf_spectacular_sidecar"]
 
 MIDDLEWARE = [
+    'mathquest.middleware.RequestMetricsMiddleware',
+    'mathquest.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -94,6 +105,21 @@ DATABASES = {
     }
 }
 
+# Read replicas as "host[:port],host[:port]" (same database name and credentials as default).
+# Safe requests to the lesson list/detail and profile read from them unless the client
+# wrote within REPLICA_PIN_SECONDS; see mathquest/db_routers.py. Point one at the primary (e.g. localhost:5432) to try it locally.
+DATABASE_REPLICA_ALIASES = []
+for _n, _replica in enumerate(filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1):
+    _host, _, _port = _replica.strip().partition(":")
+    DATABASE_REPLICA_ALIASES.append(f"replica_{_n}")
+    DATABASES[f"replica_{_n}"] = {
+        **DATABASES["default"],
+        "HOST": _host,
+        "PORT": _port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["mathquest.db_routers.PrimaryReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,8 +169,9 @@ REST_FRAMEWORK = {
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
     ],
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
+if API_DOCS:
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
 
 
 SPECTACULAR_SETTINGS = {
@@ -152,4 +179,67 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "Duolingo-style math learning API. Idempotent /submit, XP upgrade per problem, and daily streaks.",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
-}
\ No newline at end of file
+}
+
+# Max number of lessons whose answer keys are kept in memory per worker for grading
+ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "512"))
+# Max users whose per-lesson solved counts are kept in memory per worker (lesson list progress)
+PROGRESS_INDEX_USERS = int(os.getenv("PROGRESS_INDEX_USERS", "10000"))
+
+# Rendered catalog/profile bodies and the cross-worker version keys live here. Invalidation
+# only reaches every worker through a shared backend: REDIS_URL (needs redis-py) or
+# MEMCACHED_LOCATION (needs pymemcache); otherwise, with several workers (WEB_CONCURRENCY,
+# as gunicorn/uvicorn read it), the database cache table (`manage.py createcachetable`).
+# A single worker keeps the in-process LocMemCache.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+if os.getenv("REDIS_URL"):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.getenv("REDIS_URL")}}
+elif os.getenv("MEMCACHED_LOCATION"):
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": os.getenv("MEMCACHED_LOCATION"),
+    }}
+elif WEB_CONCURRENCY > 1:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "mathquest_cache"}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "mathquest"}}
+# Per-process caches cannot be invalidated from other processes, so keep bodies briefly there
+_SHARED_CACHE = CACHES["default"]["BACKEND"] != "django.core.cache.backends.locmem.LocMemCache"
+LESSON_CACHE_TIMEOUT = int(os.getenv("LESSON_CACHE_TIMEOUT", "3600" if _SHARED_CACHE else "60"))
+
+# Max attempts accepted by one POST /api/submissions/batch
+BATCH_SUBMIT_MAX_ITEMS = int(os.getenv("BATCH_SUBMIT_MAX_ITEMS", "200"))
+# Max answers in one submitted attempt; larger bodies are rejected with 400 before any DB work
+SUBMIT_MAX_ANSWERS = int(os.getenv("SUBMIT_MAX_ANSWERS", "1000"))
+
+# Submit admission control (submissions/admission.py); 0 disables a limit. Requests over
+# a limit are answered at once with 429/503 and Retry-After instead of queueing.
+# Submits running or queued in this worker (all users) before new ones get 503
+SUBMIT_MAX_INFLIGHT = int(os.getenv("SUBMIT_MAX_INFLIGHT", "64"))
+# Submits running or queued in this worker for one user before new ones get 429. Off by
+# default: without auth every request is the demo user, so this would cap the whole worker
+SUBMIT_MAX_INFLIGHT_PER_USER = int(os.getenv("SUBMIT_MAX_INFLIGHT_PER_USER", "0"))
+# Per-user token bucket: sustained submits per second and burst size (rate 0 = off)
+SUBMIT_RATE_PER_SECOND = float(os.getenv("SUBMIT_RATE_PER_SECOND", "0"))
+SUBMIT_RATE_BURST = int(os.getenv("SUBMIT_RATE_BURST", "20"))
+# Keep the token buckets in the database so the rate holds across all workers
+SUBMIT_ADMISSION_SHARED = os.getenv("SUBMIT_ADMISSION_SHARED", "0") == "1"
+
+# Route reads to async-native views (on by default when served through mathquest.asgi)
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "0") == "1"
+# Threads available to the synchronous submit path when ASYNC_VIEWS is on
+SUBMIT_THREAD_POOL_SIZE = int(os.getenv("SUBMIT_THREAD_POOL_SIZE", "8"))
+
+# Seconds before a worker rebuilds its in-memory leaderboard from the DB (picks up other workers' XP)
+LEADERBOARD_REBUILD_SECONDS = int(os.getenv("LEADERBOARD_REBUILD_SECONDS", "300"))
+
+# Seconds a client stays on the primary after a write (read-your-writes cookie/header)
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+# Replicas lagging more than this are skipped; lag is re-checked every REPLICA_CHECK_SECONDS
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+# Bearer token for Prometheus scrapes of /api/metrics (staff sessions are always allowed);
+# empty means the endpoint is closed to everyone else
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Seconds a rendered /api/profile body is cached (dropped early on every XP/streak commit)
+PROFILE_CACHE_TIMEOUT = int(os.getenv("PROFILE_CACHE_TIMEOUT", "300"))
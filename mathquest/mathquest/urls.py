@@ -14,29 +14,35 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from mathquest.metrics import metrics_view
+from mathquest.schema import schema_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/lessons/", include("lessons.urls")),
+    path("api/submissions/", include("submissions.urls")),
     path("api/", include("users.urls")),
+    path("api/metrics", metrics_view, name="metrics"),
 
-    # --- OpenAPI schema & docs ---
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),  # OpenAPI JSON
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path(
-        "api/redoc/",
-        SpectacularRedocView.as_view(url_name="schema"),
-        name="redoc",
-    ),
+    # --- OpenAPI schema (prebuilt by `manage.py build_openapi`) ---
+    path("api/schema/", schema_view, name="schema"),  # OpenAPI JSON
 ]
+
+if settings.API_DOCS:
+    from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+    urlpatterns += [
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "api/redoc/",
+            SpectacularRedocView.as_view(url_name="schema"),
+            name="redoc",
+        ),
+    ]
@@ -0,0 +1,195 @@
+# submissions/admission.py
+"""
+Admission control for the submit endpoints (single and batch).
+
+A request is admitted before it touches the database, or under ASGI before it
+queues for the submit thread pool. It is turned away with Retry-After when:
+- the worker already has SUBMIT_MAX_INFLIGHT submits running or queued: 503
+- the user already has SUBMIT_MAX_INFLIGHT_PER_USER of them: 429
+- the user's token bucket (SUBMIT_RATE_PER_SECOND, SUBMIT_RATE_BURST) is empty: 429
+
+A limit of 0 disables it. Concurrency is counted per process, since the
+threads and DB connections it protects are per process. The token bucket is
+also per process, unless SUBMIT_ADMISSION_SHARED is on. Then it is one row per
+user in SubmitRateBucket, updated by a single upsert, so the rate holds across
+workers.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+
+from .models import SubmitRateBucket
+
+# Users whose local token buckets are remembered; an evicted user starts with a full bucket
+MAX_TRACKED_USERS = 10000
+
+
+class Rejection(NamedTuple):
+    status: int
+    error: str
+    message: str
+    retry_after: int  # seconds
+
+
+def rejection_response(rejection: Rejection) -> JsonResponse:
+    response = JsonResponse({"error": rejection.error, "message": rejection.message}, status=rejection.status)
+    response["Retry-After"] = str(rejection.retry_after)
+    return response
+
+
+class SubmitAdmission:
+    """Per-process concurrency counters and token buckets; see the module docstring."""
+
+    def __init__(self, max_inflight=None, max_inflight_per_user=None, rate=None, burst=None, shared=None):
+        self._max_inflight = max_inflight
+        self._max_inflight_per_user = max_inflight_per_user
+        self._rate = rate
+        self._burst = burst
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._user_inflight = {}
+        self._buckets = OrderedDict()  # user_id -> [tokens, monotonic time of last refill]
+        self.rejected = {"overloaded": 0, "concurrency": 0, "rate": 0}
+
+    # Limits are read from settings on each use (unless given) so tests can override them.
+
+    @property
+    def max_inflight(self) -> int:
+        return self._max_inflight if self._max_inflight is not None else settings.SUBMIT_MAX_INFLIGHT
+
+    @property
+    def max_inflight_per_user(self) -> int:
+        if self._max_inflight_per_user is not None:
+            return self._max_inflight_per_user
+        return settings.SUBMIT_MAX_INFLIGHT_PER_USER
+
+    @property
+    def rate(self) -> float:
+        return self._rate if self._rate is not None else settings.SUBMIT_RATE_PER_SECOND
+
+    @property
+    def burst(self) -> int:
+        return self._burst if self._burst is not None else settings.SUBMIT_RATE_BURST
+
+    @property
+    def shared(self) -> bool:
+        return self._shared if self._shared is not None else settings.SUBMIT_ADMISSION_SHARED
+
+    def acquire(self, user_id) -> Optional[Rejection]:
+        """Take a slot for user_id, or return why not. Every admitted call needs release()."""
+        with self._lock:
+            if self.max_inflight and self._inflight >= self.max_inflight:
+                self.rejected["overloaded"] += 1
+                return Rejection(503, "Overloaded", "too many submissions in progress; retry shortly", 1)
+            if self.max_inflight_per_user and self._user_inflight.get(user_id, 0) >= self.max_inflight_per_user:
+                self.rejected["concurrency"] += 1
+                return Rejection(429, "RateLimited", "too many submissions in progress for this user", 1)
+            wait = 0.0
+            if self.rate > 0 and not self.shared:
+                wait = self._take_local(user_id)
+            if wait > 0:
+                self.rejected["rate"] += 1
+                return Rejection(429, "RateLimited", "submission rate limit exceeded", math.ceil(wait))
+            self._inflight += 1
+            self._user_inflight[user_id] = self._user_inflight.get(user_id, 0) + 1
+
+        if self.rate > 0 and self.shared:
+            wait = self._take_shared(user_id)
+            if wait > 0:
+                self.release(user_id)
+                with self._lock:
+                    self.rejected["rate"] += 1
+                return Rejection(429, "RateLimited", "submission rate limit exceeded", math.ceil(wait))
+        return None
+
+    def release(self, user_id):
+        with self._lock:
+            self._inflight -= 1
+            left = self._user_inflight[user_id] - 1
+            if left:
+                self._user_inflight[user_id] = left
+            else:
+                del self._user_inflight[user_id]
+
+    def _take_local(self, user_id) -> float:
+        """Take one token (lock held); returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = [float(self.burst), now]
+            while len(self._buckets) > MAX_TRACKED_USERS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            return (1 - bucket[0]) / self.rate
+        bucket[0] -= 1
+        return 0.0
+
+    def _take_shared(self, user_id) -> float:
+        """_take_local against the user's SubmitRateBucket row: one upsert, plus a read when empty."""
+        table = connection.ops.quote_name(SubmitRateBucket._meta.db_table)
+        refilled = f"LEAST(%(burst)s, {table}.tokens + %(rate)s * EXTRACT(EPOCH FROM now() - {table}.updated_at))"
+        params = {"user": user_id, "rate": self.rate, "burst": float(self.burst)}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, tokens, updated_at) VALUES (%(user)s, %(burst)s - 1, now()) "
+                f"ON CONFLICT (user_id) DO UPDATE SET tokens = {refilled} - 1, updated_at = now() "
+                f"WHERE {refilled} >= 1 RETURNING tokens",
+                params,
+            )
+            if cursor.fetchone() is not None:
+                return 0.0
+            cursor.execute(f"SELECT {refilled} FROM {table} WHERE user_id = %(user)s", params)
+            row = cursor.fetchone()
+        tokens = row[0] if row else 0.0
+        return max((1 - tokens) / self.rate, 1e-3)
+
+    def reset(self):
+        with self._lock:
+            self._inflight = 0
+            self._user_inflight.clear()
+            self._buckets.clear()
+            self.rejected = dict.fromkeys(self.rejected, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"inflight": self._inflight, **{f"rejected_{k}": v for k, v in self.rejected.items()}}
+
+
+submit_admission = SubmitAdmission()
+
+
+def admitted(view):
+    """Run a sync view only after submit_admission lets the (demo) user in."""
+
+    @wraps(view)
+    def admitted_view(request, *args, **kwargs):
+        user_id = 1  # demo user per spec
+        rejection = submit_admission.acquire(user_id)
+        if rejection is not None:
+            return rejection_response(rejection)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            submit_admission.release(user_id)
+
+    return admitted_view
+
+
+async def aacquire(user_id) -> Optional[Rejection]:
+    """acquire() from the event loop; the shared bucket's query runs off the loop."""
+    if submit_admission.rate > 0 and submit_admission.shared:
+        return await sync_to_async(submit_admission.acquire)(user_id)
+    return submit_admission.acquire(user_id)
@@ -0,0 +1,54 @@
+# submissions/async_views.py
+"""
+Async entry points for the write path under ASGI. The submit views stay synchronous
+(each holds a transaction and a DB connection) but run on a bounded thread pool, so
+a burst of submissions cannot occupy every thread the event loop needs for reads. Admission
+control runs before a submit joins the pool queue, so an overloaded worker answers
+429/503 at once instead of letting the queue grow.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .admission import aacquire, rejection_response, submit_admission
+from .views import BatchSubmitView, LessonSubmitView
+
+submit_executor = ThreadPoolExecutor(
+    max_workers=settings.SUBMIT_THREAD_POOL_SIZE, thread_name_prefix="submit"
+)
+
+
+def _run_sync_view(view, request, *args, **kwargs):
+    # Pool threads outlive requests, so manage their DB connections like a request would
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def _pooled(view):
+    run = sync_to_async(_run_sync_view, thread_sensitive=False, executor=submit_executor)
+
+    async def pooled_view(request, *args, **kwargs):
+        user_id = 1  # demo user per spec
+        rejection = await aacquire(user_id)
+        if rejection is not None:
+            return rejection_response(rejection)
+        try:
+            return await run(view, request, *args, **kwargs)
+        finally:
+            submit_admission.release(user_id)
+
+    # DRF views handle CSRF themselves; csrf_exempt() would wrap this coroutine in a sync function
+    pooled_view.csrf_exempt = True
+    return pooled_view
+
+
+lesson_submit = _pooled(LessonSubmitView.as_view())
+batch_submit = _pooled(BatchSubmitView.as_view())
@@ -0,0 +1,73 @@
+# submissions/export.py
+"""
+Constant-memory export of SubmissionResult rows as NDJSON or CSV.
+
+Rows come from a server-side cursor (QuerySet.iterator); details and attempt_id are
+fetched as database text, so they are copied into the output without a decode/encode
+round trip. Output is produced in blocks of `chunk_size` rows.
+"""
+import csv
+import io
+
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from .models import SubmissionResult
+
+EXPORT_COLUMNS = ("attempt_id", "user_id", "lesson_id", "correct_count", "earned_xp", "created_at", "details")
+FORMATS = ("ndjson", "csv")
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_queryset(user_id=None, lesson_id=None, since=None, until=None):
+    """Filtered rows as tuples in EXPORT_COLUMNS order; since is inclusive, until exclusive."""
+    qs = SubmissionResult.objects.all()
+    if user_id is not None:
+        qs = qs.filter(user_id=user_id)
+    if lesson_id is not None:
+        qs = qs.filter(lesson_id=lesson_id)
+    if since is not None:
+        qs = qs.filter(created_at__gte=since)
+    if until is not None:
+        qs = qs.filter(created_at__lt=until)
+    return qs.annotate(
+        attempt_text=Cast("attempt_id", TextField()), details_json=Cast("details", TextField())
+    ).values_list("attempt_text", "user_id", "lesson_id", "correct_count", "earned_xp", "created_at", "details_json")
+
+
+def iter_ndjson(rows, chunk_size=2000):
+    """Yields str blocks of newline-terminated JSON objects."""
+    block = []
+    for attempt_id, user_id, lesson_id, correct_count, earned_xp, created_at, details in rows.iterator(
+        chunk_size=chunk_size
+    ):
+        block.append(
+            f'{{"attempt_id":"{attempt_id}","user_id":{user_id},"lesson_id":{lesson_id},'
+            f'"correct_count":{correct_count},"earned_xp":{earned_xp},'
+            f'"created_at":"{created_at.isoformat()}","details":{details}}}\n'
+        )
+        if len(block) >= chunk_size:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
+
+def iter_csv(rows, chunk_size=2000):
+    """Yields str blocks of CSV (header first); details is a JSON text column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for n, row in enumerate(rows.iterator(chunk_size=chunk_size), start=1):
+        attempt_id, user_id, lesson_id, correct_count, earned_xp, created_at, details = row
+        writer.writerow((attempt_id, user_id, lesson_id, correct_count, earned_xp, created_at.isoformat(), details))
+        if n % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_export(fmt, rows, chunk_size=2000):
+    return (iter_csv if fmt == "csv" else iter_ndjson)(rows, chunk_size=chunk_size)
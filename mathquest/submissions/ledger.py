@@ -0,0 +1,111 @@
+# submissions/ledger.py
+"""
+XP ledger: every award is an append-only XPEvent row, and User.total_xp is a snapshot
+of the events already applied to it.
+
+Submits only insert events, so concurrent submissions for one user do not queue on
+the user row for XP. They queue only at the end of their transaction, on a per-user
+advisory lock (lock_user_xp), so each reported total includes every submit committed
+before it. fold_xp_events() moves pending deltas into the snapshot in
+batches (`manage.py fold_xp_ledger`); until then readers use total_xp_expression()
+(snapshot + pending, one indexed subquery), so the API never shows a stale total.
+rebuild_xp_totals() recomputes every snapshot from the full event history.
+"""
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from users.models import User
+
+from .models import XPEvent
+
+
+def _sum_per_user(events):
+    return events.filter(user=OuterRef("pk")).values("user").annotate(n=Sum("delta")).values("n")
+
+
+def pending_xp_expression():
+    """Sum of the user's unapplied events, for annotating User querysets."""
+    return Coalesce(Subquery(_sum_per_user(XPEvent.objects.filter(applied=False)), output_field=IntegerField()), 0)
+
+
+def total_xp_expression():
+    """The user's current XP: the total_xp snapshot plus pending events."""
+    return F("total_xp") + pending_xp_expression()
+
+
+def current_total_xp(user_id):
+    """Current XP for user_id, or None if there is no such user."""
+    return User.objects.filter(pk=user_id).annotate(xp=total_xp_expression()).values_list("xp", flat=True).first()
+
+
+def lock_user_xp(user_id: int):
+    """
+    Serialize this user's XP reads until the current transaction ends. Under READ
+    COMMITTED, two submits reading snapshot + pending at the same time would each miss
+    the other's uncommitted events and report a total that is too low; with the lock
+    the second one waits for the first to commit and reads its events.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [user_id])
+
+
+def record_xp(user_id: int, awards) -> int:
+    """
+    Append one pending event per award in a single INSERT.
+    awards: iterable of (lesson_id, attempt_id, problem_id, delta). Returns the XP added.
+    """
+    events = [
+        XPEvent(user_id=user_id, lesson_id=lesson_id, attempt_id=attempt_id, problem_id=problem_id, delta=delta)
+        for lesson_id, attempt_id, problem_id, delta in awards
+    ]
+    if events:
+        XPEvent.objects.bulk_create(events)
+    return sum(event.delta for event in events)
+
+
+def fold_xp_events(batch_size: int = 5000) -> int:
+    """
+    Apply up to batch_size pending events to the users' snapshots in one transaction.
+    Events another folder has locked are skipped. Returns the number of events folded.
+    """
+    with transaction.atomic():
+        events = list(
+            XPEvent.objects.filter(applied=False)
+            .select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", "user_id", "delta")[:batch_size]
+        )
+        if not events:
+            return 0
+        deltas = {}
+        for _, user_id, delta in events:
+            deltas[user_id] = deltas.get(user_id, 0) + delta
+
+        users = connection.ops.quote_name(User._meta.db_table)
+        rows = sorted(deltas.items())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {users} SET total_xp = {users}.total_xp + v.delta "
+                f"FROM (VALUES {', '.join(['(%s, %s)'] * len(rows))}) AS v(id, delta) "
+                f"WHERE {users}.id = v.id",
+                [value for row in rows for value in row],
+            )
+        XPEvent.objects.filter(pk__in=[pk for pk, _, _ in events]).update(applied=True)
+    return len(events)
+
+
+def rebuild_xp_totals() -> int:
+    """
+    Recompute every User.total_xp from all of its events and mark them applied.
+    Locks the ledger against inserts for the duration, so submits wait; returns the
+    number of users updated.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(XPEvent._meta.db_table)} IN EXCLUSIVE MODE")
+        users = User.objects.update(
+            total_xp=Coalesce(Subquery(_sum_per_user(XPEvent.objects.all()), output_field=IntegerField()), 0)
+        )
+        XPEvent.objects.filter(applied=False).update(applied=True)
+    return users
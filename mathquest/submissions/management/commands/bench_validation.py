@@ -0,0 +1,76 @@
+# submissions/management/commands/bench_validation.py
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from lessons.bench import add_output_argument, write_report
+from submissions.serializers import SubmitSerializer
+from submissions.validation import validate_submit
+
+
+def _serializer(data):
+    serializer = SubmitSerializer(data=data)
+    serializer.is_valid()
+    return serializer
+
+
+def _body(rng, answers):
+    items = []
+    for pid in range(1, answers + 1):
+        kind = rng.random()
+        if kind < 0.6:
+            items.append({"problem_id": pid, "option_id": rng.randint(1, 10_000)})
+        elif kind < 0.85:
+            items.append({"problem_id": pid, "value": rng.randint(0, 200)})
+        else:
+            items.append({"problem_id": pid, "value": f"{rng.randint(1, 9)}/{rng.randint(10, 19)}"})
+    return {"attempt_id": str(uuid.UUID(int=rng.getrandbits(128))), "answers": items}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /submit body validation cost per 1k answers: SubmitSerializer vs validate_submit, "
+        "for valid bodies and for a body with one malformed answer at the end. "
+        "No database access; prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,100,1000", help="answers per body, comma-separated")
+        parser.add_argument("--bodies", type=int, default=50, help="bodies validated per size and path")
+        parser.add_argument("--seed", type=int, default=0)
+        add_output_argument(parser)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        results = {}
+        for size in [int(s) for s in options["sizes"].split(",") if s]:
+            bodies = [_body(rng, size) for _ in range(options["bodies"])]
+            malformed = [{**body, "answers": body["answers"][:-1] + [{"problem_id": "?"}]} for body in bodies]
+            results[str(size)] = {
+                "valid": {
+                    "serializer": self._measure(_serializer, bodies),
+                    "validate_submit": self._measure(validate_submit, bodies),
+                },
+                "malformed": {
+                    "serializer": self._measure(_serializer, malformed),
+                    "validate_submit": self._measure(validate_submit, malformed),
+                },
+            }
+
+        write_report(self, options, {
+            "bodies": options["bodies"],
+        }, sizes=results)
+
+    @staticmethod
+    def _measure(fn, bodies):
+        answers = sum(len(body["answers"]) for body in bodies)
+        t0 = time.perf_counter()
+        for body in bodies:
+            fn(body)
+        elapsed = time.perf_counter() - t0
+        return {
+            "ms_per_1k_answers": round(elapsed / answers * 1e6, 3) if answers else 0.0,
+            "answers_per_sec": round(answers / elapsed) if elapsed else 0,
+        }
@@ -0,0 +1,47 @@
+# submissions/management/commands/export_submissions.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from submissions.export import FORMATS, export_queryset, iter_export
+
+class Command(BaseCommand):
+    help = "Stream SubmissionResult rows as NDJSON or CSV in constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--output", "-o", help="file to write (default: stdout)")
+        parser.add_argument("--user", type=int, help="only this user id")
+        parser.add_argument("--lesson", type=int, help="only this lesson id")
+        parser.add_argument("--since", help="ISO datetime, inclusive")
+        parser.add_argument("--until", help="ISO datetime, exclusive")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="rows fetched/written per block")
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for name in ("since", "until"):
+            if options[name]:
+                bounds[name] = parse_datetime(options[name])
+                if bounds[name] is None:
+                    raise CommandError(f"--{name}: not an ISO datetime: {options[name]!r}")
+
+        rows = export_queryset(user_id=options["user"], lesson_id=options["lesson"], **bounds)
+        out = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else None
+        write = out.write if out else (lambda block: self.stdout.write(block, ending=""))
+        started = time.perf_counter()
+        written = 0
+        try:
+            for block in iter_export(options["format"], rows, chunk_size=options["chunk_size"]):
+                write(block)
+                written += block.count("\n")
+        finally:
+            if out:
+                out.close()
+
+        if options["output"]:
+            if options["format"] == "csv":
+                written -= 1  # header
+            seconds = time.perf_counter() - started
+            rate = written / seconds if seconds else 0
+            self.stderr.write(f"Exported {written} rows in {seconds:.2f}s ({rate:,.0f} rows/s).")
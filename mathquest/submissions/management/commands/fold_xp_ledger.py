@@ -0,0 +1,40 @@
+# submissions/management/commands/fold_xp_ledger.py
+import time
+
+from django.core.management.base import BaseCommand
+from submissions.ledger import fold_xp_events, rebuild_xp_totals
+
+class Command(BaseCommand):
+    help = (
+        "Fold pending XP ledger events into User.total_xp in batches. "
+        "--loop keeps running as a background worker; --rebuild recomputes all totals from the ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--loop", action="store_true", help="keep folding until interrupted")
+        parser.add_argument("--interval", type=float, default=1.0,
+                            help="seconds to sleep when --loop finds nothing pending")
+        parser.add_argument("--rebuild", action="store_true",
+                            help="recompute every total from all events (blocks submits while it runs)")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            start = time.perf_counter()
+            users = rebuild_xp_totals()
+            self.stdout.write(f"Rebuilt XP totals for {users} users in {time.perf_counter() - start:.2f}s.")
+            return
+
+        while True:
+            start = time.perf_counter()
+            total = 0
+            while True:
+                folded = fold_xp_events(batch_size=options["batch_size"])
+                total += folded
+                if folded < options["batch_size"]:
+                    break
+            if total or not options["loop"]:
+                self.stdout.write(f"Folded {total} XP events in {time.perf_counter() - start:.2f}s.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionresult',
+            name='response',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0002_submissionresult_response'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submissionresult',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
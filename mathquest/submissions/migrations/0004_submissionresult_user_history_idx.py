@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0003_submissionresult_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submissionresult',
+            index=models.Index(fields=['user', 'created_at', 'attempt_id'], name='subresult_user_history_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def opening_balances(apps, schema_editor):
+    """XP earned before the ledger becomes one already-applied event per user."""
+    User = apps.get_model("users", "User")
+    XPEvent = apps.get_model("submissions", "XPEvent")
+    XPEvent.objects.bulk_create(
+        [
+            XPEvent(user_id=user_id, delta=total_xp, applied=True)
+            for user_id, total_xp in User.objects.exclude(total_xp=0).values_list("id", "total_xp").iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0005_problem_answer_spec'),
+        ('users', '0003_user_active_streak_idx'),
+        ('submissions', '0004_submissionresult_user_history_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_id', models.UUIDField(blank=True, null=True)),
+                ('delta', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('applied', models.BooleanField(default=False)),
+                ('lesson', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='lessons.lesson')),
+                ('problem', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='lessons.problem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.user')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('applied', False)), fields=['user'], name='xpevent_pending_idx')],
+            },
+        ),
+        migrations.RunPython(opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_active_streak_idx'),
+        ('submissions', '0005_xp_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmitRateBucket',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='users.user')),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
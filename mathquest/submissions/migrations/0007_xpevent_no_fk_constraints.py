@@ -0,0 +1,25 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0005_problem_answer_spec'),
+        ('submissions', '0006_submit_rate_bucket'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='xpevent',
+            name='lesson',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='lessons.lesson'),
+        ),
+        migrations.AlterField(
+            model_name='xpevent',
+            name='problem',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='lessons.problem'),
+        ),
+    ]
@@ -1,6 +1,52 @@
-from django.db import models
+from django.db import connections, models, router
+from django.utils import timezone
 from users.models import User
-from lessons.models import Lesson
+from lessons.models import Lesson, Problem
+
+
+class SubmissionResultManager(models.Manager):
+    def _write_connection(self):
+        # self.db resolves through db_for_read, which may pick a replica
+        return connections[self._db or router.db_for_write(self.model)]
+
+    def claim(self, attempt_id, user_id, lesson_id) -> bool:
+        """
+        Reserve attempt_id with INSERT ... ON CONFLICT DO NOTHING before grading.
+        Returns True if this caller inserted the row; a racing retry blocks until
+        the owner commits and then gets False.
+        """
+        connection = self._write_connection()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(attempt_id, user_id, lesson_id, correct_count, earned_xp, details, created_at) "
+                "VALUES (%s, %s, %s, 0, 0, '{}', %s) ON CONFLICT (attempt_id) DO NOTHING",
+                [attempt_id, user_id, lesson_id, timezone.now()],
+            )
+            return cursor.rowcount == 1
+
+    def claim_many(self, user_id, attempts) -> set:
+        """
+        claim() for many (attempt_id, lesson_id) pairs in one statement. Returns the
+        attempt_ids this caller inserted; the rest belong to requests that committed first.
+        """
+        if not attempts:
+            return set()
+        connection = self._write_connection()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        now = timezone.now()
+        rows = ", ".join(["(%s, %s, %s, 0, 0, '{}', %s)"] * len(attempts))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(attempt_id, user_id, lesson_id, correct_count, earned_xp, details, created_at) "
+                f"VALUES {rows} "
+                "ON CONFLICT (attempt_id) DO NOTHING RETURNING attempt_id",
+                [value for attempt_id, lesson_id in attempts for value in (attempt_id, user_id, lesson_id, now)],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
 
 class SubmissionResult(models.Model):
     # Store the outcome for an attempt id (idempotency)
@@ -9,6 +55,53 @@ class SubmissionResult(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
     correct_count = models.IntegerField()
     earned_xp = models.IntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     # store serialized details as JSON for returning same payload if re-submitted
     details = models.JSONField(default=dict)
+    # full /submit response as sent the first time; replays return it verbatim
+    response = models.JSONField(null=True, blank=True)
+
+    objects = SubmissionResultManager()
+
+    class Meta:
+        indexes = [
+            # per-user history pages: WHERE user_id = ? ORDER BY created_at DESC, attempt_id DESC
+            models.Index(fields=["user", "created_at", "attempt_id"], name="subresult_user_history_idx"),
+        ]
+
+
+class XPEvent(models.Model):
+    """
+    Append-only XP award (one per newly solved problem; opening balances have no problem).
+    User.total_xp is a snapshot of the applied events; pending ones are folded in by
+    `manage.py fold_xp_ledger`, and readers add them on top (submissions/ledger.py).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # lesson/problem are for auditing: no indexes or FK constraints, since inserts sit on
+    # the submit path, and events keep the ids of deleted content (nothing to cascade)
+    lesson = models.ForeignKey(
+        Lesson, null=True, blank=True, on_delete=models.DO_NOTHING, db_index=False, db_constraint=False
+    )
+    problem = models.ForeignKey(
+        Problem, null=True, blank=True, on_delete=models.DO_NOTHING, db_index=False, db_constraint=False
+    )
+    attempt_id = models.UUIDField(null=True, blank=True)
+    delta = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    applied = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # pending XP per user (read on every total) and the folder's work queue
+            models.Index(fields=["user"], condition=models.Q(applied=False), name="xpevent_pending_idx"),
+        ]
+
+
+class SubmitRateBucket(models.Model):
+    """
+    A user's submit token bucket when admission control is shared across workers
+    (SUBMIT_ADMISSION_SHARED); refilled and drawn in one upsert (submissions/admission.py).
+    """
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
@@ -1,10 +1,52 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from lessons.matchers import MAX_ANSWER_LENGTH
+
+class AnswerValueField(serializers.Field):
+    """A number, or a string such as "1/3", "0.5" or "2x+1" for problems with an answer_spec."""
+    default_error_messages = {
+        "invalid": "A valid number or answer string is required.",
+        "max_string_length": "Ensure this value has at most {max_length} characters.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, float, str)):
+            self.fail("invalid")
+        if isinstance(data, str):
+            data = data.strip()
+            if not data:
+                self.fail("invalid")
+            if len(data) > MAX_ANSWER_LENGTH:
+                self.fail("max_string_length", max_length=MAX_ANSWER_LENGTH)
+            return data
+        try:
+            return float(data)
+        except OverflowError:
+            self.fail("invalid")
+
+    def to_representation(self, value):
+        return value
+
+
 class AnswerItemSerializer(serializers.Serializer):
     problem_id = serializers.IntegerField()
     option_id = serializers.IntegerField(required=False)
-    value = serializers.FloatField(required=False)
+    value = AnswerValueField(required=False)
 
 class SubmitSerializer(serializers.Serializer):
     attempt_id = serializers.UUIDField()
-    answers = AnswerItemSerializer(many=True)
+    answers = AnswerItemSerializer(many=True, max_length=settings.SUBMIT_MAX_ANSWERS)
+
+class BatchItemSerializer(SubmitSerializer):
+    lesson_id = serializers.IntegerField()
+
+class BatchSubmitSerializer(serializers.Serializer):
+    items = BatchItemSerializer(many=True, allow_empty=False, max_length=settings.BATCH_SUBMIT_MAX_ITEMS)
+
+
+class HistoryQuerySerializer(serializers.Serializer):
+    lesson = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    compact = serializers.BooleanField(default=False)
+    cursor = serializers.CharField(required=False)
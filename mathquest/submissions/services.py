@@ -0,0 +1,170 @@
+# submissions/services.py
+from django.db import transaction
+
+from users.models import User
+from lessons.models import Lesson, UserLessonProgress
+from lessons.services import (
+    XP_PER_CORRECT,
+    add_solved,
+    compute_lesson_progress,
+    grade_answers,
+    mark_solved,
+    progress_ratio,
+    record_activity,
+)
+from .ledger import record_xp, total_xp_expression
+from .models import SubmissionResult
+
+STORED_FIELDS = ("attempt_id", "user_id", "lesson_id", "response", "correct_count", "earned_xp")
+
+
+def stored_result(attempt_id):
+    """The stored outcome for attempt_id (one primary-key read), or None."""
+    return SubmissionResult.objects.filter(pk=attempt_id).values(*STORED_FIELDS).first()
+
+
+def replay_response(prev: dict) -> dict:
+    """Response for a duplicate attempt: the snapshot, or current state for pre-snapshot rows."""
+    if prev["response"] is not None:
+        return {**prev["response"], "duplicate": True}
+
+    user = User.objects.annotate(xp=total_xp_expression()).get(pk=prev["user_id"])
+    lesson = Lesson.objects.get(pk=prev["lesson_id"])
+    return {
+        "correct_count": prev["correct_count"],
+        "earned_xp": prev["earned_xp"],
+        "new_total_xp": user.xp,  # current total (no change on duplicate)
+        "streak": {"current": user.current_streak, "best": user.best_streak},
+        "lesson_progress": compute_lesson_progress(user, lesson),
+        "duplicate": True,
+    }
+
+
+def grading_error(exc: ValueError):
+    """Map an evaluate/grade ValueError to the (status, body) returned by /submit."""
+    msg = str(exc)
+    if msg.startswith("InvalidProblem:"):
+        pid = msg.split(":")[1]
+        return 422, {"error": "InvalidProblem", "message": f"Problem {pid} not found"}
+    return 400, {"error": "Validation", "message": msg}
+
+
+def submit_batch(items, user_id: int = 1):
+    """
+    Grade and apply many offline attempts for one user in a single transaction.
+
+    items: list of {"lesson_id": int, "attempt_id": UUID, "answers": [...]}
+    Returns a list of (status, body) in input order; body matches /submit.
+
+    Known attempt_ids are found with one query and the new ones claimed with another,
+    all solves are upserted in bulk, XP events for the whole batch go to the ledger
+    in one insert, the streak is applied once, and the claimed SubmissionResult rows
+    are filled in with one bulk update.
+    """
+    lessons = Lesson.objects.in_bulk({item["lesson_id"] for item in items})
+    outcomes = [None] * len(items)
+    user = User(pk=user_id)
+
+    with transaction.atomic():
+        stored = {
+            row["attempt_id"]: row
+            for row in SubmissionResult.objects.filter(
+                pk__in=[item["attempt_id"] for item in items]
+            ).values(*STORED_FIELDS)
+        }
+
+        graded = []  # (index, item, lesson, correct_count, details, correct_pids)
+        claimed = {}  # attempt_id -> index of the copy being graded
+        for i, item in enumerate(items):
+            attempt_id = item["attempt_id"]
+            if attempt_id in stored:
+                outcomes[i] = (200, replay_response(stored[attempt_id]))
+                continue
+            if attempt_id in claimed:
+                continue  # repeated within the batch; replays the graded copy below
+            lesson = lessons.get(item["lesson_id"])
+            if lesson is None:
+                outcomes[i] = (404, {"detail": "Not found."})
+                continue
+            if not item["answers"]:
+                outcomes[i] = (400, {"error": "Validation", "message": "answers must be non-empty"})
+                continue
+            try:
+                correct_count, details, correct_pids = grade_answers(lesson, item["answers"])
+            except ValueError as e:
+                outcomes[i] = grading_error(e)
+                continue
+            claimed[attempt_id] = i
+            graded.append((i, item, lesson, correct_count, details, correct_pids))
+
+        # Claim before applying anything; attempts a concurrent request committed meanwhile replay
+        won = SubmissionResult.objects.claim_many(user.pk, [(g[1]["attempt_id"], g[2].pk) for g in graded])
+        for g in graded:
+            if g[1]["attempt_id"] not in won:
+                outcomes[g[0]] = (200, replay_response(stored_result(g[1]["attempt_id"])))
+        graded = [g for g in graded if g[1]["attempt_id"] in won]
+
+        if graded:
+            # One upsert reports which problems are new solves for this user
+            unclaimed = mark_solved(user, {pid for g in graded for pid in g[5]})
+            solved_counts = dict(
+                UserLessonProgress.objects.filter(
+                    user=user, lesson_id__in={g[2].pk for g in graded}
+                ).values_list("lesson_id", "solved_count")
+            )
+
+            # Walk attempts in order so XP goes to the first attempt that solves a problem
+            awards = []
+            lesson_deltas = {}
+            running = []  # (earned_xp, xp earned by the batch so far, lesson_progress) per graded attempt
+            total_earned = 0
+            for i, item, lesson, correct_count, details, correct_pids in graded:
+                newly = unclaimed.intersection(correct_pids)
+                unclaimed -= newly
+                awards.extend((lesson.pk, item["attempt_id"], pid, XP_PER_CORRECT) for pid in sorted(newly))
+                lesson_deltas[lesson.pk] = lesson_deltas.get(lesson.pk, 0) + len(newly)
+                solved_counts[lesson.pk] = solved_counts.get(lesson.pk, 0) + len(newly)
+
+                earned_xp = len(newly) * XP_PER_CORRECT
+                total_earned += earned_xp
+                running.append((
+                    earned_xp,
+                    total_earned,
+                    progress_ratio(solved_counts[lesson.pk], lesson.problem_count),
+                ))
+
+            for lesson_id, delta in lesson_deltas.items():
+                if delta:
+                    add_solved(user, lesson_id, delta)
+            record_xp(user.pk, awards)
+
+            # The streak is applied to the user row once for the whole batch
+            streak_info = record_activity(user.pk, total_earned)
+
+            results = []
+            # new_total_xp covers the whole batch; earlier attempts report their running total
+            base_xp = streak_info["new_total_xp"] - total_earned
+            for (i, item, lesson, correct_count, details, _), (earned_xp, earned_so_far, progress) in zip(graded, running):
+                resp = {
+                    "correct_count": correct_count,
+                    "earned_xp": earned_xp,
+                    "new_total_xp": base_xp + earned_so_far,
+                    "streak": {"current": streak_info["current"], "best": streak_info["best"]},
+                    "lesson_progress": progress,
+                }
+                outcomes[i] = (200, {**resp, "duplicate": False})
+                results.append(SubmissionResult(
+                    attempt_id=item["attempt_id"],
+                    correct_count=correct_count,
+                    earned_xp=earned_xp,
+                    details=details,
+                    response=resp,
+                ))
+            SubmissionResult.objects.bulk_update(results, ["correct_count", "earned_xp", "details", "response"])
+
+    for i, item in enumerate(items):
+        if outcomes[i] is None:
+            status, body = outcomes[claimed[item["attempt_id"]]]
+            outcomes[i] = (status, {**body, "duplicate": True})
+
+    return outcomes
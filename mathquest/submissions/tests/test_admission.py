@@ -0,0 +1,101 @@
+import uuid
+
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from users.models import User
+from lessons.models import Lesson, Problem
+from submissions import async_views
+from submissions.admission import SubmitAdmission, submit_admission
+from submissions.models import SubmitRateBucket
+
+
+class SubmitAdmissionTests(TestCase):
+    """Concurrency limits and token buckets, in-process and shared."""
+
+    def test_concurrency_limits(self):
+        gate = SubmitAdmission(max_inflight=2, max_inflight_per_user=1, rate=0)
+        self.assertIsNone(gate.acquire(1))
+        self.assertEqual(gate.acquire(1).status, 429)
+        self.assertIsNone(gate.acquire(2))
+        rejection = gate.acquire(3)
+        self.assertEqual((rejection.status, rejection.error, rejection.retry_after), (503, "Overloaded", 1))
+        gate.release(1)
+        self.assertIsNone(gate.acquire(3))
+        self.assertEqual(gate.stats(), {
+            "inflight": 2, "rejected_overloaded": 1, "rejected_concurrency": 1, "rejected_rate": 0,
+        })
+
+    def test_per_user_limit_off_by_default(self):
+        # every request is the demo user, so only the worker-wide limit applies
+        gate = SubmitAdmission(max_inflight=20)
+        for _ in range(20):
+            self.assertIsNone(gate.acquire(1))
+        self.assertEqual(gate.acquire(1).status, 503)
+
+    def test_local_token_bucket(self):
+        gate = SubmitAdmission(max_inflight=0, max_inflight_per_user=0, rate=0.5, burst=2, shared=False)
+        self.assertIsNone(gate.acquire(1))
+        self.assertIsNone(gate.acquire(1))
+        rejection = gate.acquire(1)
+        self.assertEqual((rejection.status, rejection.retry_after), (429, 2))
+        self.assertIsNone(gate.acquire(2))  # buckets are per user
+        self.assertEqual(gate.stats()["inflight"], 3)
+
+    def test_shared_token_bucket(self):
+        User.objects.create(pk=1, username="demo")
+        gate = SubmitAdmission(max_inflight=0, max_inflight_per_user=0, rate=0.5, burst=2, shared=True)
+        self.assertIsNone(gate.acquire(1))
+        self.assertIsNone(SubmitAdmission(rate=0.5, burst=2, shared=True).acquire(1))  # another worker
+        rejection = gate.acquire(1)
+        self.assertEqual((rejection.status, rejection.retry_after), (429, 2))
+        self.assertEqual(gate.stats()["inflight"], 1)  # the rejected call holds no slot
+        self.assertLess(SubmitRateBucket.objects.get(user_id=1).tokens, 1)
+
+
+class SubmitAdmissionEndpointTests(TestCase):
+    def setUp(self):
+        submit_admission.reset()
+        self.addCleanup(submit_admission.reset)
+        User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Gate")
+        self.problem = Problem.objects.create(lesson=self.lesson, question_text="1 + 1 = ?", correct_value=2)
+
+    def _body(self):
+        return {"attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": self.problem.id, "value": 2}]}
+
+    def _submit(self):
+        return self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=self._body(), content_type="application/json")
+
+    @override_settings(SUBMIT_RATE_PER_SECOND=0.1, SUBMIT_RATE_BURST=1)
+    def test_rate_limited_submit_is_429_without_queries(self):
+        self.assertEqual(self._submit().status_code, 200)
+        with self.assertNumQueries(0):
+            r = self._submit()
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(r["Retry-After"], "10")
+        self.assertEqual(r.json()["error"], "RateLimited")
+        self.assertEqual(submit_admission.stats()["inflight"], 0)
+
+    @override_settings(SUBMIT_MAX_INFLIGHT=1)
+    def test_saturated_worker_is_503_for_submit_and_batch(self):
+        self.assertIsNone(submit_admission.acquire(2))
+        r = self._submit()
+        self.assertEqual((r.status_code, r["Retry-After"]), (503, "1"))
+        r = self.client.post(
+            "/api/submissions/batch",
+            data={"items": [{"lesson_id": self.lesson.id, **self._body()}]},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 503)
+        submit_admission.release(2)
+        self.assertEqual(self._submit().status_code, 200)
+
+    @override_settings(SUBMIT_MAX_INFLIGHT=1)
+    async def test_pooled_submit_rejected_before_queueing(self):
+        self.assertIsNone(submit_admission.acquire(2))
+        request = AsyncRequestFactory().post(
+            f"/api/lessons/{self.lesson.id}/submit", data=self._body(), content_type="application/json"
+        )
+        r = await async_views.lesson_submit(request, id=self.lesson.id)
+        self.assertEqual(r.status_code, 503)
+        submit_admission.release(2)
@@ -0,0 +1,92 @@
+import uuid
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from lessons.models import Lesson, Problem, ProblemOption
+from submissions.models import SubmissionResult
+from submissions.ledger import current_total_xp
+
+
+class BatchSubmitTests(TestCase):
+    """Covers /api/submissions/batch ordering, dedupe, per-item errors and single XP/streak application."""
+
+    url = "/api/submissions/batch"
+
+    def setUp(self):
+        self.user = User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Batch Lesson")
+        self.p1 = Problem.objects.create(lesson=self.lesson, question_text="5 + 5 = ?")
+        self.o1 = ProblemOption.objects.create(problem=self.p1, text="10")
+        self.p1.correct_option = self.o1
+        self.p1.save()
+        self.p2 = Problem.objects.create(lesson=self.lesson, question_text="6 / 2 = ?", correct_value=3.0)
+
+    def _item(self, answers, attempt_id=None, lesson_id=None):
+        return {
+            "lesson_id": lesson_id or self.lesson.id,
+            "attempt_id": attempt_id or str(uuid.uuid4()),
+            "answers": answers,
+        }
+
+    def _post(self, items):
+        return self.client.post(self.url, data={"items": items}, content_type="application/json")
+
+    def test_outcomes_in_order_with_xp_awarded_once(self):
+        items = [
+            self._item([{"problem_id": self.p1.id, "option_id": self.o1.id}]),
+            self._item([{"problem_id": self.p1.id, "option_id": self.o1.id}, {"problem_id": self.p2.id, "value": 3}]),
+            self._item([{"problem_id": 999999, "value": 1}]),
+        ]
+        r = self._post(items)
+        self.assertEqual(r.status_code, 200)
+        results = r.json()["results"]
+        self.assertEqual([x["attempt_id"] for x in results], [i["attempt_id"] for i in items])
+        self.assertEqual([x["status"] for x in results], [200, 200, 422])
+        self.assertEqual(results[0]["response"]["earned_xp"], 10)
+        self.assertEqual(results[1]["response"]["earned_xp"], 10)
+        self.assertEqual(results[1]["response"]["new_total_xp"], 20)
+        self.assertEqual(results[1]["response"]["lesson_progress"], 1.0)
+        self.assertEqual(results[2]["response"]["error"], "InvalidProblem")
+
+        self.user.refresh_from_db()
+        self.assertEqual(current_total_xp(1), 20)
+        self.assertEqual(self.user.current_streak, 1)
+        self.assertEqual(SubmissionResult.objects.count(), 2)
+
+    def test_known_and_repeated_attempts_replay(self):
+        known = self._item([{"problem_id": self.p2.id, "value": 3}])
+        self._post([known])
+
+        repeated = self._item([{"problem_id": self.p1.id, "option_id": self.o1.id}])
+        r = self._post([known, repeated, repeated])
+        results = r.json()["results"]
+        self.assertTrue(results[0]["response"]["duplicate"])
+        self.assertFalse(results[1]["response"]["duplicate"])
+        self.assertTrue(results[2]["response"]["duplicate"])
+        self.assertEqual(results[2]["response"]["earned_xp"], 10)
+        self.assertEqual(current_total_xp(1), 20)
+
+    def test_replayed_batch_attempt_via_single_submit(self):
+        item = self._item([{"problem_id": self.p2.id, "value": 3}])
+        self._post([item])
+        body = {"attempt_id": item["attempt_id"], "answers": item["answers"]}
+        r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+        self.assertTrue(r.json()["duplicate"])
+        self.assertEqual(r.json()["earned_xp"], 10)
+
+    def test_query_count_does_not_grow_with_items(self):
+        def batch(n):
+            return [self._item([{"problem_id": self.p2.id, "value": 3}]) for _ in range(n)]
+
+        self._post(batch(1))  # warm answer key and counters
+        with CaptureQueriesContext(connection) as one:
+            self._post(batch(1))
+        with self.assertNumQueries(len(one.captured_queries)):
+            self._post(batch(20))
+
+    def test_empty_items_rejected(self):
+        r = self._post([])
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["error"], "Validation")
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User as AdminUser
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from lessons.models import Lesson
+from submissions.models import SubmissionResult
+
+
+class SubmissionExportTests(TestCase):
+    """Covers NDJSON/CSV export via the command and the admin-only streaming endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create(pk=1, username="demo")
+        self.other = User.objects.create(pk=2, username="other")
+        self.lesson = Lesson.objects.create(title="Export")
+        for user, xp in ((self.user, 10), (self.user, 0), (self.other, 20)):
+            SubmissionResult.objects.create(
+                attempt_id=uuid.uuid4(), user=user, lesson=self.lesson,
+                correct_count=xp // 10, earned_xp=xp, details={"7": bool(xp)},
+            )
+        old = SubmissionResult.objects.filter(user=self.user, earned_xp=0)
+        old.update(created_at=timezone.now() - timedelta(days=3))
+
+    def test_command_ndjson_with_filters(self):
+        out = io.StringIO()
+        call_command("export_submissions", "--user=1", stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({r["user_id"] for r in rows}, {1})
+        self.assertIn({"7": True}, [r["details"] for r in rows])
+
+        out = io.StringIO()
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        call_command("export_submissions", "--user=1", f"--since={since}", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+    def test_command_csv(self):
+        out = io.StringIO()
+        call_command("export_submissions", "--format=csv", "--chunk-size=1", stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(json.loads(rows[0]["details"]).keys(), {"7"})
+
+    def test_endpoint_is_admin_only_and_streams(self):
+        r = self.client.get("/api/submissions/export")
+        self.assertIn(r.status_code, (401, 403))
+
+        admin = AdminUser.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(admin)
+        r = self.client.get("/api/submissions/export", {"lesson": self.lesson.id})
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertEqual(r["Content-Type"], "application/x-ndjson")
+        lines = b"".join(r.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+        self.assertEqual(self.client.get("/api/submissions/export", {"since": "nope"}).status_code, 400)
@@ -0,0 +1,65 @@
+import uuid
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from lessons.models import Lesson
+from submissions.models import SubmissionResult
+
+
+class SubmissionHistoryTests(TestCase):
+    """Covers GET /api/submissions/ keyset pagination, lesson filter and compact mode."""
+
+    def setUp(self):
+        self.user = User.objects.create(pk=1, username="demo")
+        other = User.objects.create(pk=2, username="other")
+        self.lesson_a = Lesson.objects.create(title="A")
+        self.lesson_b = Lesson.objects.create(title="B")
+        now = timezone.now()
+        rows = []
+        for i in range(7):
+            # pairs share a timestamp so attempt_id has to break the tie
+            rows.append(SubmissionResult(
+                attempt_id=uuid.uuid4(), user=self.user, lesson=self.lesson_a if i % 2 else self.lesson_b,
+                correct_count=i, earned_xp=10 * i, details={"1": True},
+            ))
+        rows.append(SubmissionResult(attempt_id=uuid.uuid4(), user=other, lesson=self.lesson_a,
+                                     correct_count=0, earned_xp=0, details={}))
+        SubmissionResult.objects.bulk_create(rows)
+        for i, row in enumerate(rows[:7]):
+            SubmissionResult.objects.filter(pk=row.pk).update(created_at=now - timedelta(minutes=i // 2))
+
+    def walk(self, query):
+        seen, cursor = [], None
+        while True:
+            url = f"/api/submissions/?{query}" + (f"&cursor={cursor}" if cursor else "")
+            with self.assertNumQueries(1):
+                r = self.client.get(url)
+            self.assertEqual(r.status_code, 200)
+            data = r.json()
+            seen.extend(data["results"])
+            cursor = data["next"]
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_history_newest_first_without_gaps(self):
+        seen = self.walk("limit=2")
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len({r["attempt_id"] for r in seen}), 7)
+        keys = [(r["created_at"], r["attempt_id"]) for r in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(seen[0]["details"], {"1": True})
+
+    def test_lesson_filter_and_compact(self):
+        seen = self.walk(f"lesson={self.lesson_a.id}&compact=1&limit=1")
+        self.assertEqual(len(seen), 3)
+        self.assertTrue(all(r["lesson_id"] == self.lesson_a.id for r in seen))
+        self.assertNotIn("details", seen[0])
+
+    def test_invalid_cursor_is_400(self):
+        for cursor in ("not-a-cursor", "WyJ4IiwieSJd"):  # second is ["x","y"]
+            r = self.client.get(f"/api/submissions/?cursor={cursor}")
+            self.assertEqual(r.status_code, 400)
+            self.assertEqual(r.json()["error"], "Validation")
@@ -0,0 +1,49 @@
+import uuid
+from django.contrib.auth.models import User as AdminUser
+from django.test import TestCase, override_settings
+
+from users.models import User
+from lessons.models import Lesson, Problem
+from mathquest import metrics
+
+
+class RequestMetricsTests(TestCase):
+    """Covers Server-Timing headers, submit phases and the Prometheus /api/metrics endpoint."""
+
+    def setUp(self):
+        for histogram in metrics.HISTOGRAMS:
+            histogram.reset()
+        User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Metrics")
+        self.problem = Problem.objects.create(lesson=self.lesson, question_text="3 + 3 = ?", correct_value=6)
+
+    def test_submit_reports_queries_and_phases(self):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": self.problem.id, "value": 6}]}
+        r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        timing = r["Server-Timing"]
+        for name in ("db;", "lock_wait;", "grading;", "streak;", "progress;", "total;"):
+            self.assertIn(name, timing)
+        self.assertNotIn('desc="0 queries"', timing)
+
+    @override_settings(METRICS_TOKEN="scrape-me")
+    def test_metrics_endpoint_exposes_histograms_per_view(self):
+        self.client.get("/api/profile")
+        self.client.get("/api/profile")
+        r = self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer scrape-me")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r["Content-Type"].startswith("text/plain"))
+        text = r.content.decode()
+        self.assertIn('mathquest_request_duration_seconds_count{view="profile"} 2', text)
+        self.assertIn('mathquest_request_queries_bucket{view="profile",le="1"} 2', text)
+        self.assertIn("mathquest_answer_key_cache_hits_total", text)
+
+    @override_settings(METRICS_TOKEN="scrape-me")
+    def test_metrics_need_token_or_staff(self):
+        self.assertEqual(self.client.get("/api/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer guess").status_code, 403)
+        self.client.force_login(AdminUser.objects.create_user("ops", password="x", is_staff=True))
+        self.assertEqual(self.client.get("/api/metrics").status_code, 200)
+
+    def test_no_token_configured_closes_metrics_to_anonymous(self):
+        self.assertEqual(self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 403)
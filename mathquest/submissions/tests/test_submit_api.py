@@ -2,6 +2,7 @@ import uuid
 from django.test import TestCase
 
 from users.models import User
+from submissions.ledger import current_total_xp
 from lessons.models import Lesson, Problem, ProblemOption
 
 
@@ -64,8 +65,8 @@ class SubmitEndpointTests(TestCase):
         self.assertEqual(r2.status_code, 200)
         data2 = r2.json()
         self.assertTrue(data2.get("duplicate", False))
-        self.assertEqual(data2["new_total_xp"], User.objects.get(pk=1).total_xp)
-        self.assertEqual(User.objects.get(pk=1).total_xp, total1)
+        self.assertEqual(data2["new_total_xp"], current_total_xp(1))
+        self.assertEqual(current_total_xp(1), total1)
 
     def test_invalid_problem_id_returns_422(self):
         attempt = str(uuid.uuid4())
@@ -113,3 +114,43 @@ class SubmitEndpointTests(TestCase):
         self.assertEqual(r2.status_code, 200)
         self.assertEqual(r2.json()["earned_xp"], 10)
         self.assertEqual(r2.json()["new_total_xp"], total_after_1 + 10)
+
+    def test_duplicate_replay_is_single_read_of_snapshot(self):
+        url = f"/api/lessons/{self.lesson.id}/submit"
+        body = {
+            "attempt_id": str(uuid.uuid4()),
+            "answers": [{"problem_id": self.p1.id, "option_id": self.o1b_id}],
+        }
+        first = self.client.post(url, data=body, content_type="application/json").json()
+
+        with self.assertNumQueries(1):
+            r = self.client.post(url, data=body, content_type="application/json")
+        replay = r.json()
+        self.assertTrue(replay.pop("duplicate"))
+        first.pop("duplicate")
+        self.assertEqual(replay, first)
+
+    def test_pre_snapshot_replay_reports_the_attempt_owner(self):
+        from submissions.models import SubmissionResult
+        from submissions.services import replay_response, stored_result
+
+        other = User.objects.create(pk=2, username="ana", total_xp=70, current_streak=3, best_streak=4)
+        attempt = uuid.uuid4()
+        SubmissionResult.objects.create(
+            attempt_id=attempt, user=other, lesson=self.lesson, correct_count=1, earned_xp=10, details={},
+        )
+        replay = replay_response(stored_result(attempt))
+        self.assertEqual((replay["new_total_xp"], replay["streak"]), (70, {"current": 3, "best": 4}))
+        self.assertTrue(replay["duplicate"])
+
+    def test_rejected_attempt_does_not_consume_attempt_id(self):
+        url = f"/api/lessons/{self.lesson.id}/submit"
+        attempt = str(uuid.uuid4())
+        bad = {"attempt_id": attempt, "answers": [{"problem_id": 999999, "option_id": 1}]}
+        self.assertEqual(self.client.post(url, data=bad, content_type="application/json").status_code, 422)
+
+        good = {"attempt_id": attempt, "answers": [{"problem_id": self.p1.id, "option_id": self.o1b_id}]}
+        r = self.client.post(url, data=good, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(r.json()["duplicate"])
+        self.assertEqual(r.json()["earned_xp"], 10)
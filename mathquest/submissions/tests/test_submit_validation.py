@@ -0,0 +1,70 @@
+import uuid
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from submissions.serializers import SubmitSerializer
+from submissions.validation import _fast_submit, validate_submit
+
+ATTEMPT = "6f1c2a0e-5b8e-4c4e-9a37-0f3f7f2b9d11"
+
+
+def _serializer_result(data):
+    serializer = SubmitSerializer(data=data)
+    if serializer.is_valid():
+        return serializer.validated_data, None
+    return None, serializer.errors
+
+
+class ValidateSubmitTests(SimpleTestCase):
+    """validate_submit() must agree with SubmitSerializer on every input, valid or not."""
+
+    CASES = [
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "option_id": 2}, {"problem_id": 3, "value": 4}]},
+        {"attempt_id": ATTEMPT.upper(), "answers": [{"problem_id": 1, "value": " 1/3 ", "extra": True}]},
+        {"attempt_id": "{%s}" % ATTEMPT, "answers": []},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": "7", "value": 2.5}]},  # string id: serializer path
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1.0, "option_id": 2}]},
+        {"attempt_id": int(uuid.UUID(ATTEMPT)), "answers": [{"problem_id": 1}]},
+        {"attempt_id": "not-a-uuid", "answers": [{"problem_id": 1, "option_id": 2}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": True, "option_id": 2}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "value": True}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "value": "   "}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "value": "x" * 201}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "value": 10 ** 400}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "value": None}]},
+        {"attempt_id": ATTEMPT, "answers": [{"problem_id": 1, "option_id": None}]},
+        {"attempt_id": ATTEMPT, "answers": [{"option_id": 2}, "oops"]},
+        {"attempt_id": ATTEMPT, "answers": {"problem_id": 1}},
+        {"attempt_id": ATTEMPT},
+        [ATTEMPT],
+    ]
+
+    def test_agrees_with_serializer(self):
+        for data in self.CASES:
+            with self.subTest(data=str(data)[:80]):
+                self.assertEqual(validate_submit(data), _serializer_result(data))
+
+    def test_common_shapes_skip_the_serializer(self):
+        for data in self.CASES[:3]:
+            self.assertIsNotNone(_fast_submit(data))
+
+    def test_oversized_answers_rejected(self):
+        answers = [{"problem_id": i, "option_id": 1} for i in range(settings.SUBMIT_MAX_ANSWERS + 1)]
+        validated, errors = validate_submit({"attempt_id": ATTEMPT, "answers": answers})
+        self.assertIsNone(validated)
+        self.assertEqual(errors, {"answers": {"non_field_errors": [
+            f"Ensure this field has no more than {settings.SUBMIT_MAX_ANSWERS} elements."
+        ]}})
+
+
+class SubmitValidationEndpointTests(TestCase):
+    def test_malformed_body_is_400_without_queries(self):
+        body = {"attempt_id": ATTEMPT, "answers": [{"problem_id": "x", "option_id": 2}]}
+        with self.assertNumQueries(0):
+            r = self.client.post("/api/lessons/1/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json(), {
+            "error": "Validation",
+            "message": {"answers": [{"problem_id": ["A valid integer is required."]}]},
+        })
@@ -0,0 +1,157 @@
+import io
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from users.leaderboard import leaderboard
+from users.models import User
+from lessons.models import Lesson, Problem
+from lessons.services import record_activity
+from submissions.ledger import current_total_xp, fold_xp_events, rebuild_xp_totals, record_xp
+from submissions.models import XPEvent
+
+
+class XPLedgerTests(TestCase):
+    """XP is appended as events, read back as snapshot + pending, and folded/rebuilt offline."""
+
+    def setUp(self):
+        cache.clear()
+        leaderboard.clear()
+        self.user = User.objects.create(pk=1, username="demo", total_xp=50)
+        User.objects.create(pk=2, username="ana", total_xp=55)
+        self.lesson = Lesson.objects.create(title="Ledger")
+        self.p1 = Problem.objects.create(lesson=self.lesson, question_text="1 + 1 = ?", correct_value=2)
+        self.p2 = Problem.objects.create(lesson=self.lesson, question_text="2 + 2 = ?", correct_value=4)
+
+    def _submit(self, answers, attempt_id=None):
+        body = {"attempt_id": attempt_id or str(uuid.uuid4()), "answers": answers}
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        return r.json()
+
+    def test_submit_appends_events_and_reports_pending_total(self):
+        attempt_id = str(uuid.uuid4())
+        data = self._submit([{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}], attempt_id)
+
+        self.assertEqual(data["new_total_xp"], 70)
+        events = XPEvent.objects.filter(user_id=1).order_by("problem_id")
+        self.assertEqual(
+            [(e.problem_id, e.lesson_id, str(e.attempt_id), e.delta, e.applied) for e in events],
+            [(self.p1.id, self.lesson.id, attempt_id, 10, False), (self.p2.id, self.lesson.id, attempt_id, 10, False)],
+        )
+        # the snapshot is untouched until the folder runs; readers still see 70
+        self.assertEqual(User.objects.get(pk=1).total_xp, 50)
+        self.assertEqual(current_total_xp(1), 70)
+        self.assertEqual(self.client.get("/api/profile").json()["total_xp"], 70)
+        me = self.client.get("/api/leaderboard").json()["me"]
+        self.assertEqual((me["rank"], me["xp"]), (1, 70))
+
+        # re-solving awards nothing and appends nothing
+        self._submit([{"problem_id": self.p1.id, "value": 2}])
+        self.assertEqual(XPEvent.objects.filter(user_id=1).count(), 2)
+
+    def test_fold_moves_pending_into_snapshot(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}])
+        XPEvent.objects.create(user_id=2, delta=5)
+
+        self.assertEqual(fold_xp_events(batch_size=1), 1)
+        self.assertEqual(fold_xp_events(), 1)
+        self.assertEqual(fold_xp_events(), 0)
+
+        self.assertEqual(list(User.objects.order_by("pk").values_list("total_xp", flat=True)), [60, 60])
+        self.assertFalse(XPEvent.objects.filter(applied=False).exists())
+        self.assertEqual(current_total_xp(1), 60)
+
+    def test_rebuild_recomputes_totals_from_all_events(self):
+        XPEvent.objects.create(user_id=1, delta=50, applied=True)  # opening balance
+        self._submit([{"problem_id": self.p1.id, "value": 2}])
+        User.objects.filter(pk=1).update(total_xp=999)  # drifted snapshot
+
+        out = io.StringIO()
+        call_command("fold_xp_ledger", "--rebuild", stdout=out)
+        self.assertIn("Rebuilt XP totals for 2 users", out.getvalue())
+        # ana has no events, so her total becomes 0
+        self.assertEqual(list(User.objects.order_by("pk").values_list("total_xp", flat=True)), [60, 0])
+        self.assertEqual(current_total_xp(1), 60)
+
+    def test_rebuild_applies_pending_events(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}])
+        XPEvent.objects.create(user_id=2, delta=5)
+
+        self.assertEqual(rebuild_xp_totals(), 2)
+        self.assertEqual(list(User.objects.order_by("pk").values_list("total_xp", flat=True)), [20, 5])
+        self.assertFalse(XPEvent.objects.filter(applied=False).exists())
+        self.assertEqual(current_total_xp(2), 5)
+
+    def test_events_keep_ids_of_deleted_content(self):
+        self._submit([{"problem_id": self.p1.id, "value": 2}])
+        lesson_id, problem_id = self.lesson.id, self.p1.id
+        self.lesson.delete()
+        event = XPEvent.objects.get(user_id=1)
+        self.assertEqual((event.lesson_id, event.problem_id), (lesson_id, problem_id))
+        self.assertEqual(current_total_xp(1), 60)
+
+    def test_batch_records_events_per_attempt(self):
+        items = [
+            {"lesson_id": self.lesson.id, "attempt_id": str(uuid.uuid4()), "answers": [{"problem_id": self.p1.id, "value": 2}]},
+            {"lesson_id": self.lesson.id, "attempt_id": str(uuid.uuid4()),
+             "answers": [{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}]},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post("/api/submissions/batch", data={"items": items}, content_type="application/json")
+        results = r.json()["results"]
+        self.assertEqual([x["response"]["new_total_xp"] for x in results], [60, 70])
+        self.assertEqual(
+            sorted((str(e.attempt_id), e.problem_id) for e in XPEvent.objects.all()),
+            sorted([(items[0]["attempt_id"], self.p1.id), (items[1]["attempt_id"], self.p2.id)]),
+        )
+
+
+class ConcurrentXPTotalsTests(TransactionTestCase):
+    """Two submits for one user, on two connections, report totals that add up."""
+
+    def setUp(self):
+        leaderboard.clear()
+        # already active today, so neither submit writes (and row-locks) the user row
+        User.objects.create(pk=1, username="demo", current_streak=1, best_streak=1,
+                            last_activity_date=datetime.now(timezone.utc).date())
+
+    def test_second_submit_sees_first_commit(self):
+        totals = {}
+        first_read = threading.Event()
+        second_inserted = threading.Event()
+
+        def submit(name, before_commit=None, after_insert=None):
+            try:
+                with transaction.atomic():
+                    record_xp(1, [(None, None, None, 10)])
+                    if after_insert:
+                        after_insert.set()
+                    totals[name] = record_activity(1, 10)["new_total_xp"]
+                    if before_commit:
+                        before_commit()
+            finally:
+                connection.close()
+
+        def hold_until_second_waits():
+            first_read.set()
+            second_inserted.wait(5)
+            time.sleep(0.2)  # let the second submit reach its XP read
+
+        first = threading.Thread(target=submit, args=("first", hold_until_second_waits))
+        second = threading.Thread(target=submit, args=("second", None, second_inserted))
+        first.start()
+        first_read.wait(5)
+        second.start()
+        first.join(10)
+        second.join(10)
+
+        self.assertEqual(totals, {"first": 10, "second": 20})
+        self.assertEqual(current_total_xp(1), 20)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.urls import path
+from .admission import admitted
+from .views import BatchSubmitView, SubmissionExportView, SubmissionHistoryView
+
+batch_view = admitted(BatchSubmitView.as_view())
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    batch_view = async_views.batch_submit
+
+urlpatterns = [
+    path("", SubmissionHistoryView.as_view(), name="submissions-list"),
+    path("batch", batch_view, name="submissions-batch"),
+    path("export", SubmissionExportView.as_view(), name="submissions-export"),
+]
@@ -0,0 +1,71 @@
+# submissions/validation.py
+"""
+Single-pass validation of /submit bodies.
+
+SubmitSerializer builds a field tree per answer, which for large quizzes costs more
+than grading. validate_submit() checks the common well-formed shape directly and
+returns the same validated_data the serializer would. Anything it cannot vouch for
+(wrong types, oversized lists or strings, ids sent as strings) goes through
+SubmitSerializer, so errors, and the rarer inputs DRF accepts, are exactly as before.
+"""
+import uuid
+
+from django.conf import settings
+
+from lessons.matchers import MAX_ANSWER_LENGTH
+
+from .serializers import SubmitSerializer
+
+
+def _answer(item):
+    """Validated copy of one answer dict, or None to defer to the serializer."""
+    if type(item) is not dict or type(item.get("problem_id")) is not int:
+        return None
+    out = {"problem_id": item["problem_id"]}
+    if "option_id" in item:
+        if type(item["option_id"]) is not int:
+            return None
+        out["option_id"] = item["option_id"]
+    if "value" in item:
+        value = item["value"]
+        kind = type(value)
+        if kind is str:
+            value = value.strip()
+            if not value or len(value) > MAX_ANSWER_LENGTH:
+                return None
+        elif kind is int or kind is float:
+            value = float(value)  # OverflowError for huge ints is left to the serializer
+        else:
+            return None
+        out["value"] = value
+    return out
+
+
+def _fast_submit(data):
+    if type(data) is not dict:
+        return None
+    attempt_id, answers = data.get("attempt_id"), data.get("answers")
+    if type(attempt_id) is not str or type(answers) is not list or len(answers) > settings.SUBMIT_MAX_ANSWERS:
+        return None
+    try:
+        attempt_id = uuid.UUID(hex=attempt_id)
+        validated = [_answer(item) for item in answers]
+    except (ValueError, OverflowError):
+        return None
+    if None in validated:
+        return None
+    return {"attempt_id": attempt_id, "answers": validated}
+
+
+def validate_submit(data):
+    """
+    Returns (validated_data, None) for a valid body and (None, errors) otherwise,
+    errors being SubmitSerializer's. No database access either way.
+    """
+    validated = _fast_submit(data)
+    if validated is not None:
+        return validated, None
+    serializer = SubmitSerializer(data=data)
+    if serializer.is_valid():
+        return serializer.validated_data, None
+    return None, serializer.errors
@@ -2,15 +2,22 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 
 from users.models import User
-from lessons.models import Lesson, Problem
-from lessons.models import UserProblemProgress  # for progress calculation
+from lessons.models import Lesson
 from .models import SubmissionResult
-from .serializers import SubmitSerializer
-from lessons.services import evaluate_answers, compute_streak_and_update
+from .serializers import BatchSubmitSerializer, HistoryQuerySerializer
+from .services import grading_error, replay_response, stored_result, submit_batch
+from .export import CONTENT_TYPES, FORMATS, export_queryset, iter_export
+from .validation import validate_submit
+from lessons.services import evaluate_answers, record_activity, compute_lesson_progress
+from mathquest.metrics import phase
+from mathquest.pagination import keyset_page
 
 
 class LessonSubmitView(APIView):
@@ -22,92 +29,154 @@ class LessonSubmitView(APIView):
     """
 
     def post(self, request, id):
-        serializer = SubmitSerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response({"error": "Validation", "message": serializer.errors}, status=400)
+        data, errors = validate_submit(request.data)
+        if errors is not None:
+            return Response({"error": "Validation", "message": errors}, status=400)
 
-        data = serializer.validated_data
         attempt_id = data["attempt_id"]
         answers = data["answers"]
         if not answers:
             return Response({"error": "Validation", "message": "answers must be non-empty"}, status=400)
 
+        # If attempt already processed, return stored result (idempotent): one primary-key read
+        prev = stored_result(attempt_id)
+        if prev:
+            return Response(replay_response(prev), status=200)
+
         lesson = get_object_or_404(Lesson, pk=id)
         user = get_object_or_404(User, pk=1)  # demo user per spec
 
-        # If attempt already processed, return stored result (idempotent)
-        prev = SubmissionResult.objects.filter(pk=attempt_id).first()
-        if prev:
-            resp = {
-                "correct_count": prev.correct_count,
-                "earned_xp": prev.earned_xp,
-                "new_total_xp": user.total_xp,  # current total (no change on duplicate)
-                "streak": {"current": user.current_streak, "best": user.best_streak},
-                "lesson_progress": self._compute_progress(user, lesson),
-                "duplicate": True,
-            }
-            return Response(resp, status=200)
-
-        # Evaluate & apply within one transaction for safety
+        # Evaluate & apply within one transaction for safety. The user row is not locked:
+        # the solved-progress upsert decides which submit gets XP for a problem, XP goes to
+        # the append-only ledger, and only a new day's first submit updates the streak.
+        # Only the tail, from record_activity's XP read to commit, is serialized per user.
         with transaction.atomic():
-            # Lock user row to avoid race in XP/streak
-            user_locked = User.objects.select_for_update().get(pk=user.pk)
-
-            # Re-check idempotency inside the transaction
-            if SubmissionResult.objects.filter(pk=attempt_id).exists():
-                prev = SubmissionResult.objects.get(pk=attempt_id)
-                resp = {
-                    "correct_count": prev.correct_count,
-                    "earned_xp": prev.earned_xp,
-                    "new_total_xp": user_locked.total_xp,
-                    "streak": {"current": user_locked.current_streak, "best": user_locked.best_streak},
-                    "lesson_progress": self._compute_progress(user_locked, lesson),
-                    "duplicate": True,
-                }
-                return Response(resp, status=200)
-
-            # Evaluate (this also upgrades UserProblemProgress where appropriate)
+            # Claim the attempt before grading; a racing retry waits here and then replays
+            with phase("lock_wait"):
+                claimed = SubmissionResult.objects.claim(attempt_id, user.pk, lesson.pk)
+            if not claimed:
+                return Response(replay_response(stored_result(attempt_id)), status=200)
+
+            # Evaluate (this also upgrades UserProblemProgress and records XP events)
             try:
-                correct_count, earned_xp, details = evaluate_answers(user_locked, lesson, answers)
+                with phase("grading"):
+                    correct_count, earned_xp, details = evaluate_answers(user, lesson, answers, attempt_id)
             except ValueError as e:
-                msg = str(e)
-                if msg.startswith("InvalidProblem:"):
-                    pid = msg.split(":")[1]
-                    return Response({"error": "InvalidProblem", "message": f"Problem {pid} not found"}, status=422)
-                return Response({"error": "Validation", "message": msg}, status=400)
-
-            # Update streak & XP
-            streak_info = compute_streak_and_update(user_locked, earned_xp, commit=True)
-
-            # Persist attempt outcome for idempotency
-            SubmissionResult.objects.create(
-                attempt_id=attempt_id,
-                user=user_locked,
-                lesson=lesson,
+                # Release the claim so the client can retry the same attempt_id with fixed answers
+                transaction.set_rollback(True)
+                error_status, body = grading_error(e)
+                return Response(body, status=error_status)
+
+            # Update streak; new_total_xp includes this submit's pending XP
+            with phase("streak"):
+                streak_info = record_activity(user.pk, earned_xp)
+
+            with phase("progress"):
+                lesson_progress = self._compute_progress(user, lesson)
+
+            resp = {
+                "correct_count": correct_count,
+                "earned_xp": earned_xp,  # only newly-correct problems grant XP
+                "new_total_xp": streak_info["new_total_xp"],
+                "streak": {"current": streak_info["current"], "best": streak_info["best"]},
+                "lesson_progress": lesson_progress,
+            }
+
+            # Persist attempt outcome (and the response snapshot) for idempotency
+            SubmissionResult.objects.filter(pk=attempt_id).update(
                 correct_count=correct_count,
                 earned_xp=earned_xp,
                 details=details,
+                response=resp,
             )
 
-        resp = {
-            "correct_count": correct_count,
-            "earned_xp": earned_xp,  # only newly-correct problems grant XP
-            "new_total_xp": streak_info["new_total_xp"],
-            "streak": {"current": streak_info["current"], "best": streak_info["best"]},
-            "lesson_progress": self._compute_progress(user_locked, lesson),
-            "duplicate": False,
-        }
-        return Response(resp, status=200)
+        return Response({**resp, "duplicate": False}, status=200)
 
     def _compute_progress(self, user: User, lesson: Lesson) -> float:
-        """
-        Progress = (# problems solved_correctly for this lesson) / (total problems)
-        Rounded to 3 decimals.
-        """
-        total = lesson.problems.count()
-        if total == 0:
-            return 0.0
-        solved = UserProblemProgress.objects.filter(
-            user=user, problem__lesson=lesson, solved_correctly=True
-        ).count()
-        return round(min(1.0, solved / total), 3)
+        return compute_lesson_progress(user, lesson)
+
+
+class BatchSubmitView(APIView):
+    """
+    POST /api/submissions/batch
+    Body: { "items": [ {"lesson_id": int, "attempt_id": UUID, "answers": [ ... ]}, ... ] }
+    - For offline clients replaying queued attempts in one request
+    - Returns per-attempt outcomes in input order, each shaped like /submit
+    """
+
+    def post(self, request):
+        serializer = BatchSubmitSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": "Validation", "message": serializer.errors}, status=400)
+
+        items = serializer.validated_data["items"]
+        get_object_or_404(User, pk=1)  # demo user per spec
+        outcomes = submit_batch(items)
+        return Response({
+            "results": [
+                {"attempt_id": str(item["attempt_id"]), "status": item_status, "response": body}
+                for item, (item_status, body) in zip(items, outcomes)
+            ]
+        }, status=200)
+
+
+class SubmissionHistoryView(APIView):
+    """
+    GET /api/submissions/?lesson=&limit=20&compact=0&cursor=
+    - Newest first, keyset-paginated on (created_at, attempt_id); pass back `next` as cursor
+    - compact=1 omits details
+    """
+    FIELDS = ("attempt_id", "lesson_id", "correct_count", "earned_xp", "created_at")
+
+    def get(self, request):
+        query = HistoryQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": "Validation", "message": query.errors}, status=400)
+        params = query.validated_data
+
+        qs = SubmissionResult.objects.filter(user_id=1)
+        if "lesson" in params:
+            qs = qs.filter(lesson_id=params["lesson"])
+        fields = self.FIELDS if params["compact"] else self.FIELDS + ("details",)
+        try:
+            rows, next_cursor = keyset_page(
+                qs.values(*fields), ("created_at", "attempt_id"),
+                cursor=params.get("cursor"), limit=params["limit"], descending=True,
+            )
+        except ValueError:
+            return Response({"error": "Validation", "message": "cursor is invalid"}, status=400)
+        return Response({"results": rows, "next": next_cursor})
+
+
+class SubmissionExportView(APIView):
+    """
+    GET /api/submissions/export?format=ndjson|csv&user=&lesson=&since=&until=
+    - Admin only; streams rows from a server-side cursor in constant memory
+    - since (inclusive) / until (exclusive) are ISO datetimes
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        fmt = params.get("format", "ndjson")
+        if fmt not in FORMATS:
+            return Response({"error": "Validation", "message": f"format must be one of {', '.join(FORMATS)}"}, status=400)
+
+        filters = {}
+        try:
+            for param, key in (("user", "user_id"), ("lesson", "lesson_id")):
+                if params.get(param):
+                    filters[key] = int(params[param])
+        except ValueError:
+            return Response({"error": "Validation", "message": "user and lesson must be integers"}, status=400)
+        for name in ("since", "until"):
+            if params.get(name):
+                filters[name] = parse_datetime(params[name])
+                if filters[name] is None:
+                    return Response({"error": "Validation", "message": f"{name} must be an ISO datetime"}, status=400)
+
+        response = StreamingHttpResponse(
+            iter_export(fmt, export_queryset(**filters)), content_type=CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="submissions.{fmt}"'
+        return response
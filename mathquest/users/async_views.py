@@ -0,0 +1,16 @@
+# users/async_views.py
+"""Async-native profile view, routed instead of ProfileView when ASYNC_VIEWS is on."""
+from django.http import Http404, HttpResponseNotAllowed
+
+from lessons.catalog import cached_json_response
+
+from .profile import aprofile_payload
+
+
+async def profile(request):
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    payload = await aprofile_payload(1)
+    if payload is None:
+        raise Http404
+    return cached_json_response(request, payload)
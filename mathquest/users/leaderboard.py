@@ -0,0 +1,186 @@
+# users/leaderboard.py
+import threading
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Sum
+from sortedcontainers import SortedList
+
+from .models import User
+
+WINDOWS = ("all", "daily", "weekly")
+
+
+def window_start(window: str, today=None):
+    """UTC date the window began on (Monday for weekly); None for all-time."""
+    if window == "all":
+        return None
+    today = today or datetime.now(timezone.utc).date()
+    if window == "weekly":
+        return today - timedelta(days=today.weekday())
+    return today
+
+
+class RankIndex:
+    """
+    Sorted (-xp, user_id) keys plus {user_id: xp}.
+
+    Ties share a rank (rank = users with strictly more XP + 1), so a rank lookup is
+    a single bisect. The keys live in a SortedList, so an XP change (remove the old
+    key, add the new one) and positional reads are O(log n) however many users rank.
+    """
+
+    def __init__(self, scores=()):
+        self.xp = dict(scores)
+        self.keys = SortedList((-xp, uid) for uid, xp in self.xp.items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def set(self, user_id: int, xp: int):
+        old = self.xp.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            self.keys.remove((-old, user_id))
+        self.xp[user_id] = xp
+        self.keys.add((-xp, user_id))
+
+    def add(self, user_id: int, delta: int):
+        self.set(user_id, self.xp.get(user_id, 0) + delta)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        xp = self.xp.get(user_id)
+        if xp is None:
+            return None
+        return self.keys.bisect_left((-xp,)) + 1
+
+    def position(self, user_id: int) -> int:
+        """0-based list position of a ranked user."""
+        return self.keys.bisect_left((-self.xp[user_id], user_id))
+
+    def entries(self, start: int, stop: int):
+        """[(rank, user_id, xp)] for list positions start..stop."""
+        return [
+            (self.keys.bisect_left((key[0],)) + 1, key[1], -key[0])
+            for key in self.keys.islice(max(start, 0), max(stop, 0))
+        ]
+
+
+class Leaderboard:
+    """
+    Per-process leaderboards for the all-time, daily and weekly windows.
+
+    All-time ranks current XP (User.total_xp plus pending ledger events); daily/weekly rank the sum of SubmissionResult.earned_xp
+    since the window start (UTC). Each index is built from the DB on first use, kept
+    current by record() after an XP commit in this process, and rebuilt when its window
+    rolls over or after LEADERBOARD_REBUILD_SECONDS so other workers' writes show up.
+
+    A build may read its snapshot before or after a concurrent record()'s commit, so
+    users recorded while a build runs are re-read from the DB before it is installed.
+    """
+
+    def __init__(self, rebuild_seconds: Optional[int] = None):
+        self._rebuild_seconds = rebuild_seconds
+        self._indexes = {}  # window -> (window_start, built_at, RankIndex)
+        self._building = {}  # window -> [set of user_ids recorded during each running build]
+        self._lock = threading.Lock()
+
+    @property
+    def rebuild_seconds(self) -> int:
+        if self._rebuild_seconds is None:
+            return getattr(settings, "LEADERBOARD_REBUILD_SECONDS", 300)
+        return self._rebuild_seconds
+
+    def index(self, window: str) -> RankIndex:
+        start = window_start(window)
+        with self._lock:
+            entry = self._indexes.get(window)
+            if entry is not None and entry[0] == start and time.monotonic() - entry[1] < self.rebuild_seconds:
+                return entry[2]
+            recorded = set()
+            self._building.setdefault(window, []).append(recorded)
+        built_at = time.monotonic()
+        try:
+            index = RankIndex(self._load(window, start))
+            while True:
+                with self._lock:
+                    users = set(recorded)
+                    recorded.clear()
+                    if not users:
+                        self._indexes[window] = (start, built_at, index)
+                        return index
+                # Replay: set the racing users to their committed values
+                fresh = dict(self._load(window, start, user_ids=users))
+                for user_id in users:
+                    if user_id in fresh:
+                        index.set(user_id, fresh[user_id])
+        finally:
+            with self._lock:
+                self._building[window].remove(recorded)
+
+    def _load(self, window: str, start, user_ids=None):
+        if start is None:
+            from submissions.ledger import total_xp_expression
+
+            users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+            return users.annotate(xp=total_xp_expression()).values_list("id", "xp")
+        from submissions.models import SubmissionResult
+
+        since = datetime.combine(start, dtime.min, tzinfo=timezone.utc)
+        results = SubmissionResult.objects.filter(created_at__gte=since, earned_xp__gt=0)
+        if user_ids is not None:
+            results = results.filter(user_id__in=user_ids)
+        return results.values("user_id").annotate(xp=Sum("earned_xp")).values_list("user_id", "xp")
+
+    def record(self, user_id: int, earned_xp: int):
+        """
+        Apply committed XP to the indexes that are already built. It is a delta, not the
+        submit's total: totals read before commit can arrive out of order.
+        """
+        if not earned_xp:
+            return
+        with self._lock:
+            for window, (start, _, index) in self._indexes.items():
+                if window == "all" or start == window_start(window):
+                    index.add(user_id, earned_xp)
+            for builds in self._building.values():
+                for recorded in builds:
+                    recorded.add(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def standings(self, window: str, user_id: int, limit: int = 10, around: int = 2) -> dict:
+        """Top `limit` entries plus user_id's rank and `around` neighbours either side."""
+        index = self.index(window)
+        with self._lock:
+            top = index.entries(0, limit)
+            rank = index.rank(user_id)
+            me = None
+            if rank is not None:
+                pos = index.position(user_id)
+                me = {
+                    "rank": rank,
+                    "xp": index.xp[user_id],
+                    "neighbours": index.entries(pos - around, pos + around + 1),
+                }
+            total = len(index)
+
+        ids = {uid for _, uid, _ in top}
+        if me is not None:
+            ids.update(uid for _, uid, _ in me["neighbours"])
+        names = dict(User.objects.filter(pk__in=ids).values_list("id", "username"))
+
+        def rows(entries):
+            return [{"rank": r, "user_id": uid, "username": names.get(uid), "xp": xp} for r, uid, xp in entries]
+
+        if me is not None:
+            me["neighbours"] = rows(me["neighbours"])
+        return {"window": window, "total": total, "top": rows(top), "me": me}
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('current_streak__gt', 0)), fields=['last_activity_date', 'id'], name='user_active_streak_idx'),
+        ),
+    ]
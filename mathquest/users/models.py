@@ -7,5 +7,15 @@ class User(models.Model):
     best_streak = models.IntegerField(default=0)
     last_activity_date = models.DateField(null=True, blank=True)  # stored as UTC date
 
+    class Meta:
+        indexes = [
+            # streak rollover / "streak at risk" scans only touch users with a live streak
+            models.Index(
+                fields=["last_activity_date", "id"],
+                condition=models.Q(current_streak__gt=0),
+                name="user_active_streak_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.id})"
\ No newline at end of file
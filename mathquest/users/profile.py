@@ -0,0 +1,108 @@
+# users/profile.py
+"""
+Profile summary: the User row plus lessons completed, problems solved and recent XP,
+read in one query and cached per user as a rendered body with an ETag. total_xp
+includes XP still pending in the ledger (submissions/ledger.py).
+
+The entry is dropped after every XP/streak commit (record_activity) and by the
+streak rollover; PROFILE_CACHE_TIMEOUT bounds how long the sliding recent-XP window and
+catalog changes (a lesson gaining problems) can lag.
+"""
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from lessons.catalog import RenderedPayload, render_payload
+from mathquest.db_routers import fill_reads, replica_lag_window
+
+from .models import User
+from .serializers import ProfileSerializer
+
+RECENT_XP_DAYS = 7
+
+
+def profile_cache_key(user_id) -> str:
+    return f"profile:{user_id}"
+
+
+def changed_at_key(user_id) -> str:
+    return f"profile:changed_at:{user_id}"
+
+
+def profile_queryset():
+    """Users annotated with current_xp, problems_solved, lessons_completed and recent_xp (one query)."""
+    from lessons.models import UserLessonProgress
+    from submissions.ledger import total_xp_expression
+    from submissions.models import SubmissionResult
+
+    progress = UserLessonProgress.objects.filter(user=OuterRef("pk")).values("user")
+    solved = progress.annotate(n=Sum("solved_count")).values("n")
+    completed = (
+        progress.filter(lesson__problem_count__gt=0, solved_count__gte=F("lesson__problem_count"))
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    recent = (
+        SubmissionResult.objects.filter(
+            user=OuterRef("pk"), created_at__gte=timezone.now() - timedelta(days=RECENT_XP_DAYS)
+        )
+        .values("user")
+        .annotate(n=Sum("earned_xp"))
+        .values("n")
+    )
+    return User.objects.annotate(
+        current_xp=total_xp_expression(),
+        problems_solved=Coalesce(Subquery(solved, output_field=IntegerField()), 0),
+        lessons_completed=Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+        recent_xp=Coalesce(Subquery(recent, output_field=IntegerField()), 0),
+    )
+
+
+def _payload(user) -> RenderedPayload:
+    return render_payload(ProfileSerializer(user).data)
+
+
+# Fills follow the replica router (the writer itself is pinned to the primary by its
+# cookie), except within the lag window after the user's last change, so a lagging
+# replica cannot re-cache pre-submit stats for everyone.
+
+def profile_payload(user_id) -> Optional[RenderedPayload]:
+    """Returns None when the user does not exist (misses are not cached)."""
+    key = profile_cache_key(user_id)
+    found = cache.get_many([key, changed_at_key(user_id)])
+    payload = found.get(key)
+    if payload is None:
+        with fill_reads(found.get(changed_at_key(user_id))):
+            user = profile_queryset().filter(pk=user_id).first()
+        if user is None:
+            return None
+        payload = _payload(user)
+        cache.set(key, payload, settings.PROFILE_CACHE_TIMEOUT)
+    return payload
+
+
+async def aprofile_payload(user_id) -> Optional[RenderedPayload]:
+    """Async variant of profile_payload for the ASGI read path."""
+    key = profile_cache_key(user_id)
+    found = await cache.aget_many([key, changed_at_key(user_id)])
+    payload = found.get(key)
+    if payload is None:
+        with fill_reads(found.get(changed_at_key(user_id))):
+            user = await profile_queryset().filter(pk=user_id).afirst()
+        if user is None:
+            return None
+        payload = _payload(user)
+        await cache.aset(key, payload, settings.PROFILE_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_profiles(user_ids):
+    cache.delete_many([profile_cache_key(user_id) for user_id in user_ids])
+    now = time.time()
+    cache.set_many({changed_at_key(user_id): now for user_id in user_ids}, replica_lag_window() + 1)
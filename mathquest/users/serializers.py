@@ -1,7 +1,23 @@
 from rest_framework import serializers
+from .leaderboard import WINDOWS
 from .models import User
 
 class ProfileSerializer(serializers.ModelSerializer):
+    # annotated by users.profile.profile_queryset()
+    total_xp = serializers.IntegerField(source="current_xp", read_only=True)
+    lessons_completed = serializers.IntegerField(read_only=True)
+    problems_solved = serializers.IntegerField(read_only=True)
+    recent_xp = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = User
-        fields = ("id", "username", "total_xp", "current_streak", "best_streak", "last_activity_date")
+        fields = (
+            "id", "username", "total_xp", "current_streak", "best_streak", "last_activity_date",
+            "lessons_completed", "problems_solved", "recent_xp",
+        )
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    window = serializers.ChoiceField(choices=WINDOWS, default="all")
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    around = serializers.IntegerField(min_value=0, max_value=10, default=2)
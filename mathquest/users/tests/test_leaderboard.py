@@ -0,0 +1,110 @@
+import uuid
+from django.test import TestCase
+
+from users.leaderboard import Leaderboard, RankIndex, leaderboard
+from users.models import User
+from lessons.models import Lesson, Problem
+
+
+class RankIndexTests(TestCase):
+    """Ordering, shared ranks on ties and moves on update."""
+
+    def test_ties_share_rank_and_updates_reorder(self):
+        index = RankIndex({1: 50, 2: 80, 3: 50, 4: 10}.items())
+        self.assertEqual([index.rank(u) for u in (2, 1, 3, 4)], [1, 2, 2, 4])
+        index.set(4, 90)
+        self.assertEqual(index.rank(4), 1)
+        self.assertEqual(index.rank(2), 2)
+        index.add(1, 1)
+        self.assertEqual(index.entries(0, 4), [(1, 4, 90), (2, 2, 80), (3, 1, 51), (4, 3, 50)])
+        self.assertIsNone(index.rank(99))
+
+
+class LeaderboardRebuildRaceTests(TestCase):
+    def test_record_during_build_is_replayed(self):
+        User.objects.create(pk=1, username="demo", total_xp=40)
+        User.objects.create(pk=2, username="ana", total_xp=100)
+        board = Leaderboard()
+        load = board._load
+
+        def stale_load(window, start, user_ids=None):
+            rows = list(load(window, start, user_ids))
+            if user_ids is None:
+                # another request commits XP after the build read its snapshot
+                User.objects.filter(pk=1).update(total_xp=500)
+                board.record(1, 460)
+            return rows
+
+        board._load = stale_load
+        index = board.index("all")
+        self.assertEqual((index.rank(1), index.xp[1]), (1, 500))
+        self.assertEqual(board._building["all"], [])
+
+    def test_records_apply_as_deltas_in_any_order(self):
+        User.objects.create(pk=1, username="demo", total_xp=40)
+        board = Leaderboard()
+        board.index("all")
+        # two concurrent submits' hooks, whichever commits first: 40 + 10 + 20
+        board.record(1, 20)
+        board.record(1, 10)
+        board.record(1, 0)  # streak-only submit
+        self.assertEqual(board.index("all").xp[1], 70)
+
+
+class LeaderboardEndpointTests(TestCase):
+    """Covers /api/leaderboard windows, neighbours and incremental updates from /submit."""
+
+    def setUp(self):
+        leaderboard.clear()
+        self.addCleanup(leaderboard.clear)
+        self.user = User.objects.create(pk=1, username="demo", total_xp=40)
+        User.objects.create(pk=2, username="ana", total_xp=100)
+        User.objects.create(pk=3, username="budi", total_xp=60)
+        User.objects.create(pk=4, username="citra", total_xp=10)
+        self.lesson = Lesson.objects.create(title="Leaderboard Lesson")
+        self.problems = [
+            Problem.objects.create(lesson=self.lesson, question_text=f"{i} + 1 = ?", correct_value=i + 1)
+            for i in range(3)
+        ]
+
+    def submit(self, problems):
+        body = {
+            "attempt_id": str(uuid.uuid4()),
+            "answers": [{"problem_id": p.id, "value": p.correct_value} for p in problems],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/lessons/{self.lesson.id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+
+    def test_all_time_top_and_me(self):
+        r = self.client.get("/api/leaderboard?limit=2&around=1")
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertEqual(data["total"], 4)
+        self.assertEqual([(e["rank"], e["username"], e["xp"]) for e in data["top"]], [(1, "ana", 100), (2, "budi", 60)])
+        self.assertEqual(data["me"]["rank"], 3)
+        self.assertEqual([e["username"] for e in data["me"]["neighbours"]], ["budi", "demo", "citra"])
+
+    def test_submit_updates_built_index_without_rebuild(self):
+        self.client.get("/api/leaderboard")
+        self.submit(self.problems)  # +30 -> 70, passes budi
+        with self.assertNumQueries(1):  # usernames only; ranks come from memory
+            data = self.client.get("/api/leaderboard").json()
+        self.assertEqual(data["me"]["rank"], 2)
+        self.assertEqual(data["me"]["xp"], 70)
+
+    def test_daily_window_ranks_only_todays_xp(self):
+        self.assertIsNone(self.client.get("/api/leaderboard?window=daily").json()["me"])
+        self.submit(self.problems[:1])
+        data = self.client.get("/api/leaderboard?window=weekly").json()
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["me"], {"rank": 1, "xp": 10, "neighbours": [
+            {"rank": 1, "user_id": 1, "username": "demo", "xp": 10},
+        ]})
+        self.submit(self.problems[1:])
+        self.assertEqual(self.client.get("/api/leaderboard?window=daily").json()["me"]["xp"], 30)
+
+    def test_invalid_window_is_400(self):
+        r = self.client.get("/api/leaderboard?window=monthly")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["error"], "Validation")
@@ -0,0 +1,68 @@
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import User
+from lessons.models import Lesson, Problem
+from submissions.models import SubmissionResult
+
+
+class ProfileSummaryTests(TestCase):
+    """Covers /api/profile summary stats, per-user caching, commit invalidation and ETags."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(pk=1, username="demo")
+        self.lesson = Lesson.objects.create(title="Two problems")
+        self.p1 = Problem.objects.create(lesson=self.lesson, question_text="1 + 1 = ?", correct_value=2)
+        self.p2 = Problem.objects.create(lesson=self.lesson, question_text="2 + 2 = ?", correct_value=4)
+        other = Lesson.objects.create(title="Other")
+        self.p3 = Problem.objects.create(lesson=other, question_text="3 + 3 = ?", correct_value=6)
+        self.other = other
+
+    def submit(self, lesson, answers):
+        body = {"attempt_id": str(uuid.uuid4()), "answers": answers}
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/lessons/{lesson.id}/submit", data=body, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+
+    def test_summary_counts_from_one_query(self):
+        self.submit(self.lesson, [{"problem_id": self.p1.id, "value": 2}, {"problem_id": self.p2.id, "value": 4}])
+        self.submit(self.other, [{"problem_id": self.p3.id, "value": 0}])
+        SubmissionResult.objects.create(
+            attempt_id=uuid.uuid4(), user=self.user, lesson=self.other, correct_count=1, earned_xp=50, details={},
+        )
+        SubmissionResult.objects.filter(earned_xp=50).update(created_at=timezone.now() - timedelta(days=8))
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            data = self.client.get("/api/profile").json()
+        self.assertEqual(data["total_xp"], 20)
+        self.assertEqual(data["lessons_completed"], 1)
+        self.assertEqual(data["problems_solved"], 2)
+        self.assertEqual(data["recent_xp"], 20)  # the 8-day-old 50 XP is outside the window
+
+    def test_cached_until_submission_commits(self):
+        first = self.client.get("/api/profile")
+        self.assertEqual(first.json()["problems_solved"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/profile").content, first.content)
+
+        self.submit(self.other, [{"problem_id": self.p3.id, "value": 6}])
+        data = self.client.get("/api/profile").json()
+        self.assertEqual((data["total_xp"], data["problems_solved"], data["recent_xp"]), (10, 1, 10))
+
+    def test_etag_revalidation(self):
+        r = self.client.get("/api/profile")
+        etag = r["ETag"]
+        r304 = self.client.get("/api/profile", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r304.status_code, 304)
+        self.submit(self.other, [{"problem_id": self.p3.id, "value": 6}])
+        self.assertEqual(self.client.get("/api/profile", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_user_is_404(self):
+        User.objects.filter(pk=1).delete()
+        self.assertEqual(self.client.get("/api/profile").status_code, 404)
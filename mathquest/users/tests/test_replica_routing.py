@@ -0,0 +1,162 @@
+import time
+import unittest
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from lessons.catalog import CHANGED_AT_KEY, invalidate_lessons
+from mathquest.db_routers import (
+    PrimaryReplicaRouter, allow_replica_reads, fill_reads, replica_health, replica_readable, replica_reads,
+    use_primary,
+)
+from lessons.models import Lesson
+from mathquest.middleware import ReplicaRoutingMiddleware
+from submissions.models import SubmissionResult
+from users.models import User
+from users.profile import changed_at_key, invalidate_profiles
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=["replica_x"], REPLICA_MAX_LAG_SECONDS=2, REPLICA_CHECK_SECONDS=5)
+class ReplicaRouterTests(TestCase):
+    """Routing decisions; replica lag is stubbed so no second server is needed."""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        replica_health.clear()
+        self.addCleanup(replica_health.clear)
+
+    def read_alias(self, lag=0.0, error=None):
+        # TestCase holds an atomic block on default, which would pin every read to it
+        with mock.patch.object(replica_health, "lag", return_value=lag, side_effect=error), \
+                mock.patch.object(connections["default"], "in_atomic_block", False):
+            return self.router.db_for_read(User)
+
+    def test_reads_stay_on_primary_unless_enabled(self):
+        self.assertEqual(self.read_alias(), "default")
+        with allow_replica_reads():
+            self.assertEqual(self.read_alias(), "replica_x")
+            with use_primary():
+                self.assertEqual(self.read_alias(), "default")
+        self.assertEqual(self.router.db_for_write(User), "default")
+
+    def test_reads_inside_primary_transaction_use_primary(self):
+        self.assertTrue(connections["default"].in_atomic_block)  # the TestCase transaction
+        with allow_replica_reads(), mock.patch.object(replica_health, "lag", return_value=0.0):
+            self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_lagging_or_unreachable_replica_falls_back(self):
+        with allow_replica_reads():
+            self.assertEqual(self.read_alias(lag=30.0), "default")
+            replica_health.clear()
+            self.assertEqual(self.read_alias(error=DatabaseError), "default")
+            # the failed check is remembered until REPLICA_CHECK_SECONDS pass
+            self.assertEqual(self.read_alias(lag=0.0), "default")
+
+    def test_attempt_claims_are_written_to_the_primary(self):
+        User.objects.create(pk=1, username="demo")
+        lesson = Lesson.objects.create(title="Claims")
+        first, second = uuid.uuid4(), uuid.uuid4()
+        with allow_replica_reads(), mock.patch.object(PrimaryReplicaRouter, "db_for_read", return_value="replica_x"):
+            self.assertTrue(SubmissionResult.objects.claim(first, 1, lesson.pk))
+            self.assertEqual(SubmissionResult.objects.claim_many(1, [(second, lesson.pk)]), {second})
+        self.assertEqual(SubmissionResult.objects.count(), 2)
+
+    def test_cache_fills_use_primary_only_within_the_lag_window(self):
+        with allow_replica_reads():
+            with fill_reads(None):
+                self.assertEqual(self.read_alias(), "replica_x")
+            with fill_reads(time.time() - 60):
+                self.assertEqual(self.read_alias(), "replica_x")
+            with fill_reads(time.time() - 3):  # lag 2s + check interval 5s not yet over
+                self.assertEqual(self.read_alias(), "default")
+            self.assertEqual(self.read_alias(), "replica_x")
+
+    def test_invalidation_marks_the_change(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_lessons([1])
+        invalidate_profiles([1])
+        with allow_replica_reads():
+            for key in (CHANGED_AT_KEY, changed_at_key(1)):
+                with fill_reads(cache.get(key)):
+                    self.assertEqual(self.read_alias(), "default")
+
+
+@override_settings(REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingMiddlewareTests(TestCase):
+    """Wrapped read views may use replicas; writes pin the client to the primary."""
+
+    def run_request(self, request, view=None):
+        seen = {}
+
+        def default_view(req):
+            seen["replica"] = replica_reads.get()
+            return HttpResponse("ok")
+
+        response = ReplicaRoutingMiddleware(view or replica_readable(default_view))(request)
+        return seen.get("replica"), response
+
+    def test_get_without_pin_may_use_replica(self):
+        replica, response = self.run_request(RequestFactory().get("/api/profile"))
+        self.assertTrue(replica)
+        self.assertNotIn(ReplicaRoutingMiddleware.COOKIE, response.cookies)
+        self.assertNotIn(ReplicaRoutingMiddleware.PIN_HEADER, response)
+        self.assertFalse(replica_reads.get())
+
+    def test_write_pins_client_by_cookie_and_header(self):
+        replica, response = self.run_request(RequestFactory().post("/api/lessons/1/submit"))
+        self.assertFalse(replica)
+        self.assertEqual(response.cookies[ReplicaRoutingMiddleware.COOKIE]["max-age"], 10)
+        self.assertEqual(response[ReplicaRoutingMiddleware.PIN_HEADER], "10")
+
+        request = RequestFactory().get("/api/profile")
+        request.COOKIES[ReplicaRoutingMiddleware.COOKIE] = "1"
+        self.assertFalse(self.run_request(request)[0])
+        # the cross-origin frontend echoes the pin as a header instead
+        self.assertFalse(self.run_request(RequestFactory().get("/api/profile", HTTP_X_MQ_PRIMARY="1"))[0])
+
+    def test_only_catalog_and_profile_views_use_replicas(self):
+        User.objects.create(pk=1, username="demo")
+        lesson = Lesson.objects.create(title="Routed")
+        cache.clear()  # nothing cached, and no recent change keeping fills on the primary
+
+        def replica_flags(url, **headers):
+            seen = []
+
+            def db_for_read(router, model, **hints):
+                seen.append(replica_reads.get())
+                return "default"
+
+            with mock.patch.object(PrimaryReplicaRouter, "db_for_read", autospec=True, side_effect=db_for_read):
+                self.assertEqual(self.client.get(url, **headers).status_code, 200, url)
+            return set(seen)
+
+        for url in ("/api/lessons/", f"/api/lessons/{lesson.id}/", "/api/profile"):
+            self.assertEqual(replica_flags(url), {True}, url)
+        cache.clear()
+        self.assertEqual(replica_flags("/api/profile", HTTP_X_MQ_PRIMARY="1"), {False})
+        self.assertEqual(replica_flags("/api/leaderboard"), {False})
+
+    def test_pin_header_is_exposed_to_cors_clients(self):
+        r = self.client.options(
+            "/api/profile", HTTP_ORIGIN="http://localhost:3000",
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD="GET", HTTP_ACCESS_CONTROL_REQUEST_HEADERS="x-mq-primary",
+        )
+        self.assertIn("x-mq-primary", r["Access-Control-Allow-Headers"])
+        r = self.client.get("/api/leaderboard", HTTP_ORIGIN="http://localhost:3000")
+        self.assertIn("X-MQ-Primary-Pin", r["Access-Control-Expose-Headers"])
+
+
+@unittest.skipUnless("replica_1" in connections, "set DATABASE_REPLICAS to run against a replica alias")
+class ReplicaAliasTests(TestCase):
+    """With DATABASE_REPLICAS=localhost:5432 the test replica mirrors default."""
+
+    databases = "__all__"
+
+    def test_lag_check_runs_on_replica(self):
+        replica_health.clear()
+        self.assertTrue(replica_health.healthy("replica_1"))
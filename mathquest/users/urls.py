@@ -1,6 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from .views import ProfileView
+from mathquest.db_routers import replica_readable
+from .views import LeaderboardView, ProfileView
+
+profile_view = ProfileView.as_view()
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    profile_view = async_views.profile
+
+profile_view = replica_readable(profile_view)
 
 urlpatterns = [
-    path("profile", ProfileView.as_view(), name="profile"),
+    path("profile", profile_view, name="profile"),
+    path("leaderboard", LeaderboardView.as_view(), name="leaderboard"),
 ]
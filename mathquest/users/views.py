@@ -1,10 +1,33 @@
+from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import User
-from .serializers import ProfileSerializer
+from lessons.catalog import cached_json_response
+from .leaderboard import leaderboard
+from .profile import profile_payload
+from .serializers import LeaderboardQuerySerializer
 
 class ProfileView(APIView):
+    """
+    GET /api/profile
+    - XP/streak fields plus lessons_completed, problems_solved and recent_xp (last 7 days)
+    - Cached per user; ETag / If-None-Match -> 304
+    """
     def get(self, request):
-        user = User.objects.get(pk=1)
-        ser = ProfileSerializer(user)
-        return Response(ser.data)
+        payload = profile_payload(1)
+        if payload is None:
+            raise Http404
+        return cached_json_response(request, payload)
+
+
+class LeaderboardView(APIView):
+    """
+    GET /api/leaderboard?window=all|daily|weekly&limit=10&around=2
+    - top: first `limit` users by XP in the window (ties share a rank)
+    - me: the demo user's rank, XP and `around` neighbours either side (null if unranked)
+    """
+    def get(self, request):
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": "Validation", "message": query.errors}, status=400)
+        params = query.validated_data
+        return Response(leaderboard.standings(params["window"], 1, limit=params["limit"], around=params["around"]))